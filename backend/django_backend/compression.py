@@ -0,0 +1,188 @@
+"""
+Content-negotiated response compression.
+
+``CompressionMiddleware`` picks the best encoding the client accepts from
+``COMPRESSION_ENCODINGS`` (zstd, brotli, gzip by default), and compresses
+responses above ``COMPRESSION_MIN_SIZE`` bytes, streamed ones included.
+brotli and zstd are optional: an encoding whose package isn't installed is
+skipped, and gzip always works.
+
+Only API-style content types are compressed. HTML (the browsable API) is
+left alone because it embeds the CSRF token, which is what BREACH-style
+attacks on compressed responses go after. For the same reason nothing under
+``COMPRESSION_EXCLUDE_PATHS`` is compressed: the auth endpoints return
+access and refresh tokens in JSON bodies.
+"""
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:  # pragma: no cover - optional dependency
+        zstd = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/calendar",
+    "text/css",
+    "text/csv",
+    "text/plain",
+)
+
+
+# ------------------------------
+# Codecs
+# ------------------------------
+class _Gzip:
+    name = "gzip"
+
+    def compressobj(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+        return compressor.compress, compressor.flush
+
+
+class _Brotli:
+    name = "br"
+
+    def compressobj(self):
+        # Quality 11 is for static assets; 4-5 is the sweet spot for responses.
+        compressor = brotli.Compressor(quality=4)
+        return compressor.process, compressor.finish
+
+
+class _Zstd:
+    name = "zstd"
+
+    def compressobj(self):
+        compressor = zstd.ZstdCompressor(level=3)
+        if hasattr(compressor, "compressobj"):  # the zstandard package
+            compressor = compressor.compressobj()
+        return compressor.compress, compressor.flush
+
+
+CODECS = {"gzip": _Gzip()}
+if brotli is not None:
+    CODECS["br"] = _Brotli()
+if zstd is not None:
+    CODECS["zstd"] = _Zstd()
+
+
+def compress(codec, data):
+    compress_chunk, finish = codec.compressobj()
+    return compress_chunk(data) + finish()
+
+
+def negotiate(accept_encoding, preferred):
+    """
+    Return the codec for the encoding the client rates highest in its
+    ``Accept-Encoding`` header, using the ``preferred`` order to break ties.
+    """
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for name in preferred:
+        quality = weights.get(name, weights.get("*", 0.0))
+        if name in CODECS and quality > best_quality:
+            best, best_quality = CODECS[name], quality
+    return best
+
+
+# ------------------------------
+# Middleware
+# ------------------------------
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    A content-negotiating ``GZipMiddleware``. Like it, this must sit above
+    any middleware that reads or rewrites the response body.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.preferred = getattr(
+            settings, "COMPRESSION_ENCODINGS", ["zstd", "br", "gzip"]
+        )
+        self.exclude_paths = tuple(getattr(settings, "COMPRESSION_EXCLUDE_PATHS", ()))
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or response.status_code == 206:
+            return response
+        if request.path_info.startswith(self.exclude_paths):
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codec = negotiate(request.headers.get("Accept-Encoding", ""), self.preferred)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(
+                    codec, response.streaming_content
+                )
+            else:
+                response.streaming_content = self._compress_sync(
+                    codec, response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(codec, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The body differs per encoding, so a strong ETag no longer holds.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codec.name
+        return response
+
+    @staticmethod
+    def _compress_sync(codec, chunks):
+        compress_chunk, finish = codec.compressobj()
+        for chunk in chunks:
+            if data := compress_chunk(chunk):
+                yield data
+        yield finish()
+
+    @staticmethod
+    async def _compress_async(codec, chunks):
+        compress_chunk, finish = codec.compressobj()
+        async for chunk in chunks:
+            if data := compress_chunk(chunk):
+                yield data
+        yield finish()
@@ -0,0 +1,148 @@
+"""
+Read-replica routing.
+
+Reads only go to a replica inside ``read_from_replica()``, which the safe
+viewset actions enter through ``ReadReplicaMixin``. Everything else reads
+and writes through ``default``, so writes, booking validation and anything
+running inside a transaction stay on the primary.
+
+Replicas whose replication lag exceeds ``REPLICA_MAX_LAG_SECONDS``, or that
+can't be reached, are skipped until the next lag check, and reads fall
+back to the primary.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_use_replica = ContextVar("use_read_replica", default=False)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+@contextmanager
+def read_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_reads(view):
+    """Decorator version of ``read_from_replica`` for sync or async views."""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with read_from_replica():
+                return await view(*args, **kwargs)
+
+    else:
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with read_from_replica():
+                return view(*args, **kwargs)
+
+    return wrapper
+
+
+class ReadReplicaMixin:
+    """Route the queries of read-only viewset actions to a replica."""
+
+    replica_actions = ("list", "retrieve", "search", "check_availability")
+
+    def dispatch(self, request, *args, **kwargs):
+        action_map = getattr(self, "action_map", None) or {}
+        if action_map.get(request.method.lower()) in self.replica_actions:
+            with read_from_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+# ------------------------------
+# Replica health
+# ------------------------------
+class ReplicaHealth:
+    """Caches each replica's lag for ``REPLICA_LAG_CHECK_INTERVAL`` seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}  # alias -> (monotonic time, lag in seconds)
+
+    def lag(self, alias):
+        interval = getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5)
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(alias)
+            if checked and now - checked[0] < interval:
+                return checked[1]
+
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError:
+            lag = float("inf")
+            connections[alias].close()
+
+        with self._lock:
+            self._checked[alias] = (now, lag)
+        return lag
+
+    def healthy(self, alias):
+        return self.lag(alias) <= getattr(settings, "REPLICA_MAX_LAG_SECONDS", 5)
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = [
+            alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS
+        ]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or not _use_replica.get():
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see its own writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        for _ in range(len(self.replicas)):
+            alias = next(self._cycle)
+            if health.healthy(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
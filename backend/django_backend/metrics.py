@@ -0,0 +1,278 @@
+"""
+Lightweight in-process request instrumentation.
+
+Every request records its latency per view. A sampled fraction of requests
+(``METRICS_SAMPLE_RATE``) also records query count, DB time and serializer
+time. Everything lands in fixed-bucket histograms kept in process memory and
+is exported in the Prometheus text format by ``metrics_view``.
+"""
+
+import hmac
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+METRICS = {
+    # name: (help text, buckets)
+    "request_latency_seconds": ("Total request latency.", LATENCY_BUCKETS),
+    "request_queries": ("Database queries per sampled request.", QUERY_BUCKETS),
+    "request_db_seconds": ("Database time per sampled request.", LATENCY_BUCKETS),
+    "request_serializer_seconds": (
+        "Serializer time per sampled request.",
+        LATENCY_BUCKETS,
+    ),
+}
+
+# Views beyond this many distinct names are folded into one series so that a
+# misbehaving client can't grow the registry without bound.
+MAX_VIEWS = 200
+OTHER_VIEW = "other"
+
+
+# ------------------------------
+# Histograms
+# ------------------------------
+class Histogram:
+    """A fixed-bucket histogram, cumulative on export like Prometheus expects."""
+
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (metric, view) -> Histogram
+        self._requests = {}  # view -> count, including unsampled requests
+        self._views = set()
+
+    def _view_label(self, view):
+        if view in self._views or len(self._views) < MAX_VIEWS:
+            self._views.add(view)
+            return view
+        return OTHER_VIEW
+
+    def record(self, view, latency, stats=None):
+        with self._lock:
+            view = self._view_label(view)
+            self._requests[view] = self._requests.get(view, 0) + 1
+            self._observe("request_latency_seconds", view, latency)
+            if stats is not None:
+                self._observe("request_queries", view, stats.queries)
+                self._observe("request_db_seconds", view, stats.db_time)
+                self._observe("request_serializer_seconds", view, stats.serializer_time)
+
+    def _observe(self, metric, view, value):
+        key = (metric, view)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(METRICS[metric][1])
+        histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+            self._views.clear()
+
+    def export(self, prefix="djangobnb"):
+        """Render all series in the Prometheus text exposition format."""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = {
+                key: (list(h.counts), h.sum, h.count)
+                for key, h in self._histograms.items()
+            }
+
+        lines = [
+            f"# HELP {prefix}_requests_total Requests seen, sampled or not.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for view, count in requests:
+            lines.append(f'{prefix}_requests_total{{view="{view}"}} {count}')
+
+        for metric, (help_text, buckets) in METRICS.items():
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (series, view), (counts, total, count) in sorted(histograms.items()):
+                if series != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{{view="{view}"}} {total}')
+                lines.append(f'{name}_count{{view="{view}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# ------------------------------
+# Per-request state
+# ------------------------------
+class RequestStats:
+    __slots__ = ("db_time", "queries", "serializer_depth", "serializer_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+_current_stats = ContextVar("request_stats", default=None)
+
+
+def _count_queries(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` on every connection while a sampled request runs. It
+    finds the request through a context variable, so it also sees queries
+    that async views run on the ORM's sync thread.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def count_queries(stack):
+    """
+    Wrap this thread's connections, opened or not, in ``_count_queries``
+    until ``stack`` closes. Connections are per thread, so async requests
+    call this on the thread their ORM calls run on.
+    """
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(_count_queries))
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Time serializer work for the current sampled request. Re-entrant: only the
+    outermost call is counted, so nested serializers are not double counted.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+
+    stats.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_depth -= 1
+        if stats.serializer_depth == 0:
+            stats.serializer_time += time.perf_counter() - start
+
+
+class InstrumentedSerializerMixin:
+    """Adds the time spent in ``to_representation`` to the request metrics."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+# ------------------------------
+# Middleware & export view
+# ------------------------------
+class MetricsMiddleware:
+    """Records latency for every request and full stats for a sampled subset."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "METRICS_SAMPLE_RATE", 1.0)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start, token = self.start()
+        try:
+            with ExitStack() as stack:
+                if _current_stats.get() is not None:
+                    count_queries(stack)
+                return self.get_response(request)
+        finally:
+            self.finish(request, start, token)
+
+    async def __acall__(self, request):
+        start, token = self.start()
+        stack = ExitStack()
+        sampled = _current_stats.get() is not None
+        try:
+            if sampled:
+                # The thread-sensitive thread, where the ORM runs its queries.
+                await sync_to_async(count_queries)(stack)
+            return await self.get_response(request)
+        finally:
+            if sampled:
+                await sync_to_async(stack.close)()
+            self.finish(request, start, token)
+
+    def start(self):
+        stats = RequestStats() if random.random() < self.sample_rate else None
+        return time.perf_counter(), _current_stats.set(stats)
+
+    def finish(self, request, start, token):
+        stats = _current_stats.get()
+        _current_stats.reset(token)
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        registry.record(view, time.perf_counter() - start, stats)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; staff sessions or the bearer token only."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    authorization = request.headers.get("Authorization", "")
+    if not (
+        (
+            token
+            and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+        )
+        or (request.user.is_authenticated and request.user.is_staff)
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.export(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
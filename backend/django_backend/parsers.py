@@ -0,0 +1,23 @@
+"""orjson-backed JSON parser for DRF."""
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # orjson only reads UTF-8; anything else goes through the stdlib.
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8").lower()
+        if encoding.replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,25 @@
+"""
+Ownership scoping for writes.
+
+Ownership is decided on the foreign key id (``owner_id == request.user.id``),
+which needs neither the related user nor, with ``OwnerWritesFilter``, the
+object itself: the ownership test is part of the query that finds it.
+"""
+
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+
+class OwnerWritesFilter(BaseFilterBackend):
+    """
+    For unsafe methods, narrow the queryset to rows whose ``view.owner_field``
+    is the request user. Another user's object then isn't found at all (404)
+    by ``get_object``, and nothing a write does through the queryset can
+    reach it. Views without ``owner_field`` are left alone.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, "owner_field", None)
+        if field is None or request.method in SAFE_METHODS:
+            return queryset
+        return queryset.filter(**{f"{field}_id": request.user.id})
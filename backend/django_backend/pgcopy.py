@@ -0,0 +1,97 @@
+"""
+Thin helpers around PostgreSQL ``COPY`` for bulk loads and dumps.
+
+Works with both psycopg2 (``copy_expert``) and psycopg 3 (``cursor.copy``),
+so callers don't care which driver the connection was configured with.
+"""
+
+import csv
+import io
+import tempfile
+
+from django.db import connections
+
+# Rows are buffered into chunks of this many bytes before being sent, which
+# keeps memory flat no matter how many rows the iterable yields.
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def copy_from_rows(table, columns, rows, using="default"):
+    """
+    Load an iterable of tuples into ``table`` with ``COPY ... FROM STDIN``.
+    ``None`` values are written as SQL NULL. Returns the number of rows sent.
+    """
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        _quote(table), ", ".join(_quote(c) for c in columns)
+    )
+    count = 0
+    buffer = io.StringIO()
+    # QUOTE_NOTNULL leaves only None unquoted, which COPY reads as NULL.
+    writer = csv.writer(buffer, lineterminator="\n", quoting=csv.QUOTE_NOTNULL)
+
+    with connections[using].cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+                if buffer.tell() >= COPY_BUFFER_SIZE:
+                    _flush_psycopg2(raw, sql, buffer)
+            _flush_psycopg2(raw, sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+                    if buffer.tell() >= COPY_BUFFER_SIZE:
+                        copy.write(buffer.getvalue())
+                        buffer.seek(0)
+                        buffer.truncate()
+                copy.write(buffer.getvalue())
+    return count
+
+
+def _flush_psycopg2(raw, sql, buffer):
+    if not buffer.tell():
+        return
+    buffer.seek(0)
+    raw.copy_expert(sql, buffer)
+    buffer.seek(0)
+    buffer.truncate()
+
+
+def copy_to_chunks(sql, params=(), using="default"):
+    """
+    Run ``COPY (<sql>) TO STDOUT`` as CSV and yield the output in bytes
+    chunks. ``params`` are bound client side, as COPY takes no parameters.
+
+    psycopg 3 streams the rows straight from the server. psycopg2 can only
+    copy into a file, so the output is spooled to a temporary file (on disk
+    past ``COPY_BUFFER_SIZE``) and read back from there.
+    """
+    connection = connections[using]
+    query = connection.ops.compose_sql(sql, params)
+    copy_sql = f"COPY ({query}) TO STDOUT WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            with tempfile.SpooledTemporaryFile(max_size=COPY_BUFFER_SIZE) as spool:
+                raw.copy_expert(copy_sql, spool)
+                spool.seek(0)
+                while chunk := spool.read(COPY_BUFFER_SIZE):
+                    yield chunk
+        else:  # psycopg 3
+            # COPY hands out one row at a time; batch them up before yielding.
+            buffer = bytearray()
+            with raw.copy(copy_sql) as copy:
+                for row in copy:
+                    buffer += row
+                    if len(buffer) >= COPY_BUFFER_SIZE:
+                        yield bytes(buffer)
+                        buffer.clear()
+            if buffer:
+                yield bytes(buffer)
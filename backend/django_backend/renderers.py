@@ -0,0 +1,69 @@
+"""
+orjson-backed JSON renderer for DRF.
+
+Compact responses are rendered with orjson, at a fraction of the CPU cost;
+pretty-printed ones (the browsable API, ``; indent=N``) still go through
+``rest_framework.renderers.JSONRenderer``. Values are encoded as DRF's
+``JSONEncoder`` encodes them, so a response has the same JSON types
+whichever renderer served it. In particular a ``Decimal`` in the data is a
+number: serializer ``DecimalField``s have already made theirs strings if
+``COERCE_DECIMAL_TO_STRING`` is on, and only other decimals (aggregates
+put in the response directly) reach the renderer.
+
+The text itself can differ: orjson writes floats in their shortest form
+(``1e16``, not ``1e+16``), and it rejects integers beyond 64 bits.
+"""
+
+import datetime
+import decimal
+
+import orjson
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def default(obj):
+    """Types orjson doesn't know, encoded the way DRF's JSONEncoder does."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):  # lazy translation strings
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__getitem__") and hasattr(obj, "keys"):
+        return dict(obj)
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """Compact JSON bytes, safe to embed in JavaScript."""
+    ret = orjson.dumps(data, default=default, option=OPTIONS)
+    if b"\xe2\x80" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return ret
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        # Pretty printing (the browsable API, `; indent=N`) is rare enough to
+        # leave to the stdlib renderer.
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
@@ -84,6 +84,37 @@ if ENVIRONMENT == "local" and not CSRF_TRUSTED_ORIGINS:
     ]
 
 
+# ==============================================================================
+# INSTRUMENTATION & PROFILING
+# ==============================================================================
+
+# In-process metrics (see django_backend/metrics.py), scraped from /metrics/
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1.0"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Silk writes every intercepted request to the database, so it stays a
+# local / opt-in tool. SILKY_INTERCEPT_PERCENT samples when it is enabled.
+SILK_ENABLED = os.getenv("SILK_ENABLED", str(DEBUG)).lower() == "true"
+SILKY_INTERCEPT_PERCENT = int(os.getenv("SILKY_INTERCEPT_PERCENT", "100"))
+
+
+# ==============================================================================
+# RESPONSE COMPRESSION
+# ==============================================================================
+
+# zstd and brotli need the "compression" extra; gzip always works.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [
+    name.strip()
+    for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if name.strip()
+]
+# Responses that carry tokens in the body are never compressed (BREACH)
+COMPRESSION_EXCLUDE_PATHS = ["/api/v1/auth/"]
+
+
 # ==============================================================================
 # INSTALLED APPS
 # ==============================================================================
@@ -95,6 +126,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # Trigram/opclass index support (useraccount search)
+    "django.contrib.postgres",
     # Your apps
     "useraccount.apps.UseraccountConfig",
     "property.apps.PropertyConfig",
@@ -105,8 +138,6 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt.token_blacklist",
     "django_filters",
     "corsheaders",
-    "django_extensions",
-    "silk",
     # Allauth & dj-rest-auth
     "django.contrib.sites",
     "allauth",
@@ -116,11 +147,15 @@ INSTALLED_APPS = [
     "dj_rest_auth.registration",
 ]
 
+# Dev-only apps stay out of production workers, which import every installed
+# app at startup (see `manage.py benchmark_startup`).
 if DEBUG:
-    INSTALLED_APPS += ["debug_toolbar", "django_browser_reload"]
+    INSTALLED_APPS += ["django_extensions", "debug_toolbar", "django_browser_reload"]
+
+if SILK_ENABLED:
+    INSTALLED_APPS += ["silk"]
 
 MIDDLEWARE = [
-    "silk.middleware.SilkyMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -132,6 +167,16 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+if SILK_ENABLED:
+    MIDDLEWARE.insert(0, "silk.middleware.SilkyMiddleware")
+
+# Above everything that reads or rewrites the body, Silk included
+if COMPRESSION_ENABLED:
+    MIDDLEWARE.insert(0, "django_backend.compression.CompressionMiddleware")
+
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "django_backend.metrics.MetricsMiddleware")
+
 if DEBUG:
     MIDDLEWARE += [
         "debug_toolbar.middleware.DebugToolbarMiddleware",
@@ -143,6 +188,11 @@ if DEBUG:
 
 ROOT_URLCONF = "django_backend.urls"
 WSGI_APPLICATION = "django_backend.wsgi.application"
+ASGI_APPLICATION = "django_backend.asgi.application"
+
+# Serve the hot property read endpoints from native async views (property/
+# async_views.py). Only worth enabling when running under an ASGI server.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "false").lower() == "true"
 
 
 TEMPLATES = [
@@ -170,13 +220,69 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
-DATABASES = {
-    "default": dj_database_url.config(
-        default=DATABASE_URL,
-        conn_max_age=600,
+# Connection pooling needs psycopg 3 (`pip install ".[pool]"`). A pool
+# replaces persistent connections, so CONN_MAX_AGE must be 0 when it's on.
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+
+
+def database_config(url, **options):
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DB_POOL else 600,
         ssl_require=(ENVIRONMENT == "prod"),
     )
-}
+    config.setdefault("OPTIONS", {}).update(options)
+    if DB_POOL:
+        config["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+    return config
+
+
+DATABASES = {"default": database_config(DATABASE_URL)}
+
+# Optional read replicas, e.g. DATABASE_REPLICA_URLS=postgres://...,postgres://...
+# Safe viewset actions read from them (see django_backend/db_routers.py).
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    # A short connect timeout so an unreachable replica falls back quickly
+    DATABASES[f"replica_{index}"] = database_config(url, connect_timeout=2)
+    DATABASES[f"replica_{index}"]["TEST"] = {"MIRROR": "default"}
+
+if DATABASE_REPLICA_URLS:
+    DATABASE_ROUTERS = ["django_backend.db_routers.ReplicaRouter"]
+
+# Replicas lagging further behind than this are skipped until the next check
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+# Shared across processes when REDIS_URL is set (needs the "cache" extra);
+# otherwise each process keeps its own in-memory cache.
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Rendered .ics feeds are keyed by a version stamp that every booking change
+# bumps. Without a shared cache, other processes only notice once this expires.
+CALENDAR_CACHE_TIMEOUT = int(os.getenv("CALENDAR_CACHE_TIMEOUT", "300"))
 
 # ==============================================================================
 # AUTHENTICATION & API CONFIGURATION
@@ -195,15 +301,43 @@ ACCOUNT_EMAIL_VERIFICATION = "none"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
+        "useraccount.authentication.JWTCookieTokenUserAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
+    # Sliding-window limits for the actions views list in throttle_scopes
+    # (django_backend/throttling.py): "<scope>.user" per user, "<scope>.anon"
+    # per client IP.
+    "DEFAULT_THROTTLE_CLASSES": ("django_backend.throttling.ActionRateThrottle",),
+    "DEFAULT_THROTTLE_RATES": {
+        "search.user": os.getenv("THROTTLE_SEARCH_USER", "120/min"),
+        "search.anon": os.getenv("THROTTLE_SEARCH_ANON", "30/min"),
+        "availability.user": os.getenv("THROTTLE_AVAILABILITY_USER", "300/min"),
+        "availability.anon": os.getenv("THROTTLE_AVAILABILITY_ANON", "60/min"),
+        "booking.user": os.getenv("THROTTLE_BOOKING_USER", "30/min"),
+    },
+    # Proxies in front of the app, so the client IP is read from
+    # X-Forwarded-For rather than the proxy's address.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
     "DEFAULT_PAGINATION_CLASS": "useraccount.pagination.SmallResultsSetPagination",
     "PAGE_SIZE": 2,  # optional fallback, but not needed if your class sets page_size
-    "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
+    "DEFAULT_FILTER_BACKENDS": (
+        "django_filters.rest_framework.DjangoFilterBackend",
+        # Unsafe requests only see the user's own rows (views with owner_field)
+        "django_backend.permissions.OwnerWritesFilter",
+    ),
+    # orjson-backed JSON; same output as DRF's renderer, much less CPU
+    "DEFAULT_RENDERER_CLASSES": (
+        "django_backend.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "django_backend.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 # ==============================================================================
@@ -219,6 +353,11 @@ SIMPLE_JWT = {
     # Removed cookie settings since dj-rest-auth handles them
 }
 
+# Build request.user from the access token's claims instead of loading it
+# per request (useraccount/authentication.py). Claims, and deactivation,
+# catch up at the next refresh.
+JWT_TOKEN_USER = os.getenv("JWT_TOKEN_USER", "false").lower() == "true"
+
 # ==============================================================================
 # JWT COOKIES CONFIG FOR LOCAL AND PROD (fixed)
 # ==============================================================================
@@ -232,6 +371,8 @@ REST_AUTH = {
     "JWT_AUTH_HTTPONLY": True,
     "SIGNUP_FIELDS": {"email": {"required": True}, "username": {"required": True}},
     "JWT_AUTH_REFRESH_COOKIE_MAX_AGE": 7 * 24 * 60 * 60,  # 7 days
+    # Tokens carry username and is_staff for JWT_TOKEN_USER
+    "JWT_TOKEN_CLAIMS_SERIALIZER": "useraccount.authentication.TokenClaimsSerializer",
 }
 
 
@@ -0,0 +1,121 @@
+"""
+Streamed JSON responses for result sets too large to build in memory.
+
+Rows are read from a server-side cursor with ``QuerySet.iterator()`` and
+serialized ``chunk_size`` at a time, so memory stays flat however many rows
+match. The output is either one JSON array or newline-delimited JSON.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import PermissionDenied
+
+from .renderers import dumps
+
+CHUNK_SIZE = 500
+
+
+def iter_json(
+    queryset, serializer_class, *, context=None, chunk_size=CHUNK_SIZE, ndjson=False
+):
+    """Yield the serialized queryset as JSON, one bytes chunk per batch."""
+    context = context or {}
+    if not ndjson:
+        yield b"["
+    first = True
+    batch = []
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        batch.append(instance)
+        if len(batch) < chunk_size:
+            continue
+        yield _encode(batch, serializer_class, context, ndjson, first)
+        first, batch = False, []
+    if batch:
+        yield _encode(batch, serializer_class, context, ndjson, first)
+    if not ndjson:
+        yield b"]"
+
+
+def _encode(batch, serializer_class, context, ndjson, first):
+    rows = [
+        dumps(row) for row in serializer_class(batch, many=True, context=context).data
+    ]
+    if ndjson:
+        return b"\n".join(rows) + b"\n"
+    return (b"" if first else b",") + b",".join(rows)
+
+
+async def _aiter(iterator):
+    # Every step runs on the request's sync thread, which owns the cursor.
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(iterator, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(iterator.close)()
+
+
+class StreamingChunksResponse(StreamingHttpResponse):
+    """
+    Streams ``chunks``, a sync iterator of bytes that may touch the database.
+    Under ASGI a sync iterator would be read into memory in one go, so there
+    it is handed over as an async iterator instead.
+    """
+
+    def __init__(self, request, chunks, **kwargs):
+        if isinstance(getattr(request, "_request", request), ASGIRequest):
+            chunks = _aiter(chunks)
+        super().__init__(chunks, **kwargs)
+
+
+class StreamingJSONResponse(StreamingChunksResponse):
+    def __init__(
+        self,
+        request,
+        queryset,
+        serializer_class,
+        *,
+        context=None,
+        chunk_size=CHUNK_SIZE,
+        ndjson=False,
+        **kwargs,
+    ):
+        # The body is produced after the view returns, so pin the database
+        # chosen now (e.g. a replica inside ``read_from_replica``).
+        chunks = iter_json(
+            queryset.using(queryset.db),
+            serializer_class,
+            context=context,
+            chunk_size=chunk_size,
+            ndjson=ndjson,
+        )
+        kwargs.setdefault(
+            "content_type", "application/x-ndjson" if ndjson else "application/json"
+        )
+        super().__init__(request, chunks, **kwargs)
+
+
+class StreamingListMixin:
+    """
+    ``?stream=true`` on a list action returns every matching row as one
+    streamed JSON array instead of a page. Limited to staff, as it is meant
+    for exports and admin-style views.
+    """
+
+    stream_param = "stream"
+    stream_chunk_size = CHUNK_SIZE
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_param, "").lower() not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+        if not request.user.is_staff:
+            raise PermissionDenied("Streaming lists is limited to staff.")
+
+        return StreamingJSONResponse(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+            chunk_size=self.stream_chunk_size,
+        )
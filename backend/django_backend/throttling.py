@@ -0,0 +1,186 @@
+"""
+Rate limits per viewset action, counted with a sliding window.
+
+A view opts in with ``throttle_scopes``, a map of action name to scope.
+Rates come from ``DEFAULT_THROTTLE_RATES`` as ``"<scope>.user"`` (per
+authenticated user) and ``"<scope>.anon"`` (per client IP); a scope without
+a rate isn't limited.
+
+Rather than DRF's list of request timestamps per client, each client has
+one counter per fixed window. The count over the last ``duration`` seconds
+is estimated as the current window's count plus the previous window's,
+weighted by how much of it the sliding window still covers. That is a
+``get_many`` and an ``incr`` per request, in the default cache: per process
+with the local-memory cache, shared between workers with Redis.
+"""
+
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+KEY_PREFIX = "throttle"
+
+
+def parse_rate(rate):
+    """``"60/min"`` -> ``(60, 60)``; see DRF's SimpleRateThrottle."""
+    return SimpleRateThrottle.parse_rate(None, rate)
+
+
+def _wait(previous, current, elapsed, limit, duration):
+    """Seconds until the sliding count drops below ``limit``; None if it is."""
+    if previous * (1 - elapsed / duration) + current < limit:
+        return None
+    if current >= limit:
+        # Not before the next window, and then until its previous-window
+        # share (this window's count) has shrunk below the limit.
+        return (duration - elapsed) + duration * (1 - limit / current)
+    return duration * (1 - (limit - current) / previous) - elapsed
+
+
+def _keys(key, duration, now):
+    window = int(now // duration)
+    return (
+        f"{KEY_PREFIX}:{key}:{window - 1}",
+        f"{KEY_PREFIX}:{key}:{window}",
+        now - window * duration,
+    )
+
+
+def hit(key, limit, duration, now=None):
+    """
+    Count a request for ``key`` if it is within ``limit`` per ``duration``
+    seconds. Returns None if it was allowed, otherwise seconds to wait.
+    """
+    now = time.time() if now is None else now
+    previous_key, current_key, elapsed = _keys(key, duration, now)
+    counts = cache.get_many([previous_key, current_key])
+    current = counts.get(current_key, 0)
+    wait = _wait(counts.get(previous_key, 0), current, elapsed, limit, duration)
+    if wait is not None:
+        return wait
+    # The window's key outlives it, as the next window's previous count.
+    if not (current == 0 and cache.add(current_key, 1, 2 * duration)):
+        try:
+            cache.incr(current_key)
+        except ValueError:  # expired in between
+            cache.add(current_key, 1, 2 * duration)
+    return None
+
+
+async def ahit(key, limit, duration, now=None):
+    """``hit`` for async views."""
+    now = time.time() if now is None else now
+    previous_key, current_key, elapsed = _keys(key, duration, now)
+    counts = await cache.aget_many([previous_key, current_key])
+    current = counts.get(current_key, 0)
+    wait = _wait(counts.get(previous_key, 0), current, elapsed, limit, duration)
+    if wait is not None:
+        return wait
+    if not (current == 0 and await cache.aadd(current_key, 1, 2 * duration)):
+        try:
+            await cache.aincr(current_key)
+        except ValueError:
+            await cache.aadd(current_key, 1, 2 * duration)
+    return None
+
+
+def scope_rate(scope, authenticated):
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(
+        f"{scope}.{'user' if authenticated else 'anon'}"
+    )
+    return parse_rate(rate) if rate else None
+
+
+class ActionRateThrottle(BaseThrottle):
+    """DRF throttle for the actions a view lists in ``throttle_scopes``."""
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+        if scope is None:
+            return True
+        authenticated = request.user and request.user.is_authenticated
+        rate = scope_rate(scope, authenticated)
+        if rate is None:
+            return True
+        ident = f"user:{request.user.pk}" if authenticated else self.get_ident(request)
+        self.wait_seconds = hit(f"{scope}:{ident}", *rate)
+        return self.wait_seconds is None
+
+    def wait(self):
+        return max(1, math.ceil(self.wait_seconds))
+
+
+def _client(request):
+    """``(authenticated, ident)`` of a plain Django request, as DRF sees it."""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        user = drf_request.user
+    except APIException:  # bad credentials count against the client IP
+        user = None
+    if user is not None and user.is_authenticated:
+        return True, f"user:{user.pk}"
+    return False, BaseThrottle().get_ident(request)
+
+
+def throttle_scope(scope):
+    """
+    Apply ``scope``'s rates to a plain (sync or async) Django view, per user
+    or per IP as ``ActionRateThrottle`` does; over the limit it returns 429
+    with ``Retry-After``, as DRF does.
+    """
+
+    def too_many(wait):
+        wait = max(1, math.ceil(wait))
+        response = JsonResponse(
+            {"detail": f"Request was throttled. Expected available in {wait} seconds."},
+            status=429,
+        )
+        response["Retry-After"] = str(wait)
+        return response
+
+    def limited():
+        return scope_rate(scope, True) or scope_rate(scope, False)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if limited():
+                    # Authentication may query the user or the session.
+                    authenticated, ident = await sync_to_async(_client)(request)
+                    rate = scope_rate(scope, authenticated)
+                    if rate is not None:
+                        wait = await ahit(f"{scope}:{ident}", *rate)
+                        if wait is not None:
+                            return too_many(wait)
+                return await view(request, *args, **kwargs)
+
+        else:
+
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if limited():
+                    authenticated, ident = _client(request)
+                    rate = scope_rate(scope, authenticated)
+                    if rate is not None:
+                        wait = hit(f"{scope}:{ident}", *rate)
+                        if wait is not None:
+                            return too_many(wait)
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
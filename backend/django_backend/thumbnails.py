@@ -0,0 +1,84 @@
+"""
+Small cached thumbnails of uploaded images, for admin previews.
+
+Thumbnails are cropped to size, saved as WebP next to the media under
+``thumbnails/<w>x<h>/`` and named after the original, so a replaced image
+gets a new one. They are made on first use, when the admin shows them, so
+uploads through the API don't wait for them. A cache entry remembers
+which exist, so rendering a changelist doesn't touch storage per row.
+PIL is imported only when a thumbnail has to be made.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.utils.html import format_html
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = "thumbnails"
+QUALITY = 80
+PREVIEW_SIZE = 50  # CSS pixels
+
+
+def thumbnail_name(name, size):
+    root, _ = posixpath.splitext(name)
+    return f"{THUMBNAIL_DIR}/{size[0]}x{size[1]}/{root}.webp"
+
+
+def make_thumbnail(field_file, size):
+    """Crop and scale ``field_file`` to ``size`` and store it; returns its name."""
+    name = thumbnail_name(field_file.name, size)
+    storage = field_file.storage
+    if storage.exists(name):
+        return name
+    from PIL import Image, ImageOps
+
+    with field_file.open("rb"), Image.open(field_file) as image:
+        image = ImageOps.fit(ImageOps.exif_transpose(image), size)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=QUALITY)
+    storage.save(name, ContentFile(buffer.getvalue()))
+    return name
+
+
+def thumbnail_url(field_file, size):
+    """URL of ``field_file``'s thumbnail, made on first use; None if it can't be."""
+    if not field_file:
+        return None
+    name = thumbnail_name(field_file.name, size)
+    key = f"thumbnail:{name}"
+    if not cache.get(key):
+        from PIL import Image
+
+        try:
+            make_thumbnail(field_file, size)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning("Could not make a thumbnail of %s", field_file.name)
+            return None
+        cache.set(key, True, None)
+    return field_file.storage.url(name)
+
+
+def preview_url(field_file, size=PREVIEW_SIZE):
+    """Thumbnail URL for a ``size`` px preview, twice that for high-DPI screens."""
+    return thumbnail_url(field_file, (size * 2, size * 2))
+
+
+def admin_thumbnail(field_file, size=PREVIEW_SIZE, empty="No Image"):
+    """A lazily loaded ``<img>`` preview of ``field_file``."""
+    url = preview_url(field_file, size)
+    if url is None:
+        return empty
+    return format_html(
+        '<img src="{}" width="{}" height="{}" loading="lazy" decoding="async" '
+        'style="object-fit:cover; border-radius:5px;" alt="" />',
+        url,
+        size,
+        size,
+    )
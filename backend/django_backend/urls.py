@@ -16,10 +16,12 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.static import static
 from django.conf import settings
 from django.http import JsonResponse
+from django_backend.metrics import metrics_view
+from useraccount.views import TokenClaimsRefreshView
 # from useraccount.views import BackendLogoutView
 
 
@@ -32,6 +34,12 @@ def api_root(request):
 # API v1 URLs
 api_urlpatterns = [
     # Auth endpoints
+    # Ahead of dj-rest-auth's own, and matching its optional slash
+    re_path(
+        r"^auth/token/refresh/?$",
+        TokenClaimsRefreshView.as_view(),
+        name="token_refresh",
+    ),
     path("auth/", include("dj_rest_auth.urls")),
     path("auth/registration/", include("dj_rest_auth.registration.urls")),
     # App endpoints
@@ -49,6 +57,8 @@ urlpatterns = [
     path("api/v1/", include(api_urlpatterns)),
     # DRF browsable API login/logout
     path("api-auth/", include("rest_framework.urls")),
+    # Prometheus scrape endpoint
+    path("metrics/", metrics_view, name="metrics"),
     # path("api/v1/auth/logout/", BackendLogoutView.as_view(), name="backend_logout"),
 ]
 
@@ -56,8 +66,10 @@ if settings.DEBUG:
     import debug_toolbar
 
     urlpatterns += [
-        path("silk/", include("silk.urls", namespace="silk")),
         path("__debug__/", include(debug_toolbar.urls)),
         path("__reload__/", include("django_browser_reload.urls")),
     ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.SILK_ENABLED:
+    urlpatterns += [path("silk/", include("silk.urls", namespace="silk"))]
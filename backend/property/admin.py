@@ -1,5 +1,10 @@
 from django.contrib import admin
+from django_backend.admin_utils import EstimatedCountPaginator, TopValuesListFilter
+from django_backend.thumbnails import admin_thumbnail
 from .models import (
+    CalendarFeed,
+    DailyOccupancy,
+    PriceRule,
     Property,
     PropertyImage,
     Booking,
@@ -31,13 +36,45 @@ class AmenityAdmin(admin.ModelAdmin):
 class PropertyImageInline(admin.TabularInline):
     model = PropertyImage
     extra = 1
-    readonly_fields = ()
-    fields = ("image",)
+    readonly_fields = ("preview",)
+    fields = ("preview", "image")
+
+    def preview(self, obj):
+        return admin_thumbnail(obj.image)
+
+
+# ------------------------------
+# Price Rule Inline
+# ------------------------------
+class PriceRuleInline(admin.TabularInline):
+    model = PriceRule
+    extra = 0
+    fields = (
+        "name",
+        "start_date",
+        "end_date",
+        "price_per_night",
+        "weekend_price",
+        "min_nights",
+        "priority",
+    )
 
 
 # ------------------------------
 # Property Admin
 # ------------------------------
+class CityFilter(TopValuesListFilter):
+    title = "city"
+    parameter_name = "city"
+    field_name = "city"
+
+
+class CountryFilter(TopValuesListFilter):
+    title = "country"
+    parameter_name = "country"
+    field_name = "country"
+
+
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
     list_display = (
@@ -49,11 +86,15 @@ class PropertyAdmin(admin.ModelAdmin):
         "is_active",
         "created_at",
     )
-    list_filter = ("city", "country", "is_active", "category")
+    list_filter = (CityFilter, CountryFilter, "is_active", "category")
+    list_select_related = ("owner",)
     search_fields = ("title", "address", "city", "country", "owner__username")
-    inlines = [PropertyImageInline]
+    autocomplete_fields = ("owner", "category")
+    inlines = [PropertyImageInline, PriceRuleInline]
     filter_horizontal = ("amenities",)
     ordering = ("-created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 # ------------------------------
@@ -73,9 +114,13 @@ class BookingAdmin(admin.ModelAdmin):
         "total_price",
         "created_at",
     )
-    list_filter = ("start_date", "end_date")
+    list_filter = ("is_block", "start_date", "end_date")
+    list_select_related = ("property", "guest")
     search_fields = ("property__title", "guest__username")
+    autocomplete_fields = ("property", "guest")
     ordering = ("-created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # 2. Add this to make the total_price field non-editable in the admin form
     readonly_fields = ("total_price",)
@@ -94,9 +139,63 @@ class BookingAdmin(admin.ModelAdmin):
 # ------------------------------
 # Review Admin
 # ------------------------------
+class RatingFilter(admin.SimpleListFilter):
+    """Fixed 1-5 choices, so the filter doesn't DISTINCT the whole table."""
+
+    title = "rating"
+    parameter_name = "rating"
+
+    def lookups(self, request, model_admin):
+        return [(str(stars), "★" * stars) for stars in range(5, 0, -1)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(rating=self.value())
+        return queryset
+
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ("property", "author", "rating", "created_at")
-    list_filter = ("rating",)
+    list_filter = (RatingFilter,)
+    list_select_related = ("property", "author")
     search_fields = ("property__title", "author__username")
+    autocomplete_fields = ("property", "author")
     ordering = ("-created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+# ------------------------------
+# Calendar Feed Admin
+# ------------------------------
+@admin.register(CalendarFeed)
+class CalendarFeedAdmin(admin.ModelAdmin):
+    list_display = ("property", "name", "url", "is_active", "last_synced_at")
+    list_filter = ("is_active",)
+    list_select_related = ("property",)
+    search_fields = ("name", "url", "property__title")
+    raw_id_fields = ("property",)
+    readonly_fields = ("etag", "last_modified", "last_synced_at", "last_error")
+
+
+# ------------------------------
+# Daily Occupancy Admin (read-only rollup)
+# ------------------------------
+@admin.register(DailyOccupancy)
+class DailyOccupancyAdmin(admin.ModelAdmin):
+    list_display = ("date", "property", "booking", "is_block", "revenue")
+    # A date_hierarchy would run a DISTINCT over every night on each page.
+    list_filter = ("is_block", "date")
+    list_select_related = ("property", "booking__property", "booking__guest")
+    raw_id_fields = ("property", "booking")
+    ordering = ("-date",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Rebuilt by the rollup_bookings command; edits would be overwritten.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
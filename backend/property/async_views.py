@@ -0,0 +1,267 @@
+"""
+Native async versions of the read-heavy property endpoints.
+
+Under ASGI these skip the sync thread adapter that every DRF view needs and
+use Django's async ORM instead. They return the same payloads as the
+``PropertyViewSet`` actions they shadow, and they are only routed when
+``ASYNC_READ_VIEWS`` is enabled (see ``property/urls.py``). Any other method
+on a shadowed URL is handed to the DRF view, so writes behave as before.
+"""
+
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.paginator import InvalidPage
+from django.db.models import F, Prefetch
+from django.http import HttpResponse
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+from django_backend.db_routers import replica_reads
+from django_backend.renderers import dumps
+from django_backend.throttling import throttle_scope
+from useraccount.pagination import SmallResultsSetPagination as DefaultPagination
+
+from . import lookups
+from .filters import PropertyFilter
+from .models import Booking, Property, Review
+from .pagination import SmallResultsSetPagination
+from .serializers import (
+    AmenitySerializer,
+    CategorySerializer,
+    PropertyDetailSerializer,
+    PropertyListSerializer,
+)
+from .views import AmenityViewSet, CategoryViewSet, PropertyViewSet
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+def _json(data, status=200):
+    """Rendered exactly like DRF's default renderer renders it."""
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def _not_found():
+    return _json({"detail": "No Property matches the given query."}, status=404)
+
+
+async def _paginated(request, queryset, serializer_class, pagination_class):
+    """Async counterpart of ``PageNumberPagination.paginate_queryset``."""
+    paginator = pagination_class()
+    paginator.request = Request(request)
+    page_size = paginator.get_page_size(paginator.request)
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    django_paginator.count = await queryset.acount()  # primes the cached count
+    page_number = paginator.get_page_number(paginator.request, django_paginator)
+    try:
+        paginator.page = django_paginator.page(page_number)
+    except InvalidPage:
+        return _json({"detail": str(paginator.invalid_page_message)}, status=404)
+
+    objects = [obj async for obj in paginator.page.object_list]
+    paginator.page.object_list = objects
+    serializer = serializer_class(
+        objects, many=True, context={"request": paginator.request}
+    )
+    return _json(
+        {
+            "count": django_paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": serializer.data,
+        }
+    )
+
+
+async def _list(queryset):
+    return [obj async for obj in queryset]
+
+
+def with_sync_fallback(async_view, sync_view):
+    """Serve safe methods from ``async_view`` and everything else from DRF."""
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await async_view(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    # DRF enforces CSRF itself for session-authenticated requests.
+    return csrf_exempt(view)
+
+
+# ------------------------------
+# Views
+# ------------------------------
+@replica_reads
+async def property_list(request):
+    queryset = (
+        Property.objects.filter(is_active=True)
+        .select_related("owner", "category")
+        .order_by("-created_at", "-id")
+    )
+    filterset = PropertyFilter(request.GET, queryset=queryset)
+    if not filterset.is_valid():
+        return _json(translate_validation(filterset.errors).detail, status=400)
+    queryset = filterset.qs  # lazy; the stay filters are all SQL
+    return await _paginated(
+        request, queryset, PropertyListSerializer, SmallResultsSetPagination
+    )
+
+
+@replica_reads
+async def property_detail(request, pk):
+    # As PropertyViewSet.retrieve: the prefetches run in the same thread hop
+    # as the property query, so one await serves the whole detail page.
+    prop = await (
+        Property.objects.filter(is_active=True, pk=pk)
+        .select_related("owner", "category")
+        .prefetch_related(
+            "images",
+            "amenities",
+            Prefetch("reviews", Review.objects.select_related("author")),
+            "bookings",
+        )
+        .afirst()
+    )
+    if prop is None:
+        return _not_found()
+
+    serializer = PropertyDetailSerializer(prop, context={"request": Request(request)})
+    return _json(serializer.data)
+
+
+@throttle_scope("search")
+@replica_reads
+async def property_search(request):
+    query = request.GET.get("q", None)
+    if not query:
+        return _json({"error": "Query parameter 'q' is required."}, status=400)
+
+    search_query = SearchQuery(query)
+    queryset = (
+        Property.objects.annotate(rank=SearchRank(F("search_vector"), search_query))
+        .filter(search_vector=search_query, is_active=True)
+        .select_related("owner")
+        .order_by("-rank")[:20]
+    )
+    serializer = PropertyListSerializer(
+        await _list(queryset), many=True, context={"request": Request(request)}
+    )
+    return _json(serializer.data)
+
+
+@throttle_scope("availability")
+@replica_reads
+async def property_check_availability(request, pk):
+    start_date_str = request.GET.get("start_date")
+    end_date_str = request.GET.get("end_date")
+
+    if not await Property.objects.filter(pk=pk, is_active=True).aexists():
+        return _not_found()
+
+    if not start_date_str or not end_date_str:
+        return _json({"error": "start_date and end_date are required."}, status=400)
+    try:
+        start_date = date.fromisoformat(start_date_str)
+        end_date = date.fromisoformat(end_date_str)
+    except ValueError:
+        return _json({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+    overlapping_bookings = await Booking.objects.filter(
+        property_id=pk, start_date__lt=end_date, end_date__gt=start_date
+    ).aexists()
+
+    if overlapping_bookings:
+        return _json(
+            {"is_available": False, "message": "These dates are not available."}
+        )
+
+    return _json({"is_available": True, "message": "Dates are available!"})
+
+
+async def _lookup_list(request, table, serializer_class):
+    """``LookupTableViewSet.list``: the table's cached rows, paginated."""
+    # Checking the table's version may reload it, which is sync ORM work.
+    data = await sync_to_async(table.serialized)(serializer_class)
+    paginator = DefaultPagination()
+    try:
+        page = paginator.paginate_queryset(data, Request(request))
+    except NotFound as exc:
+        return _json({"detail": str(exc.detail)}, status=404)
+    return _json(
+        {
+            "count": paginator.page.paginator.count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": page,
+        }
+    )
+
+
+async def category_list(request):
+    return await _lookup_list(request, lookups.categories, CategorySerializer)
+
+
+async def amenity_list(request):
+    return await _lookup_list(request, lookups.amenities, AmenitySerializer)
+
+
+# Same paths and names the router generates, listed ahead of it in
+# property/urls.py.
+urlpatterns = [
+    path(
+        "properties/",
+        with_sync_fallback(
+            property_list, PropertyViewSet.as_view({"get": "list", "post": "create"})
+        ),
+        name="property-list",
+    ),
+    path(
+        "properties/search/",
+        with_sync_fallback(property_search, PropertyViewSet.as_view({"get": "search"})),
+        name="property-search",
+    ),
+    path(
+        "properties/<int:pk>/",
+        with_sync_fallback(
+            property_detail,
+            PropertyViewSet.as_view(
+                {
+                    "get": "retrieve",
+                    "put": "update",
+                    "patch": "partial_update",
+                    "delete": "destroy",
+                }
+            ),
+        ),
+        name="property-detail",
+    ),
+    path(
+        "properties/<int:pk>/check_availability/",
+        with_sync_fallback(
+            property_check_availability,
+            PropertyViewSet.as_view({"get": "check_availability"}),
+        ),
+        name="property-check-availability",
+    ),
+    path(
+        "categories/",
+        with_sync_fallback(category_list, CategoryViewSet.as_view({"get": "list"})),
+        name="category-list",
+    ),
+    path(
+        "amenities/",
+        with_sync_fallback(amenity_list, AmenityViewSet.as_view({"get": "list"})),
+        name="amenity-list",
+    ),
+]
@@ -0,0 +1,174 @@
+"""
+Many bookings or calendar blocks in one atomic request.
+
+All items are checked against existing bookings with a single query that
+joins the requested ranges (passed as arrays and ``unnest``-ed) against the
+booking table, and against each other with a sort per property. Nothing is
+written unless every item is free; otherwise each conflicting item is
+reported with what it collides with.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from .ical import bump_calendar_versions
+from .models import Booking, PriceRule, Property
+from .pricing import quote_stay
+
+OVERLAP_SQL = f"""
+    SELECT item.idx - 1, b.id, b.start_date, b.end_date, b.is_block
+    FROM unnest(%s::bigint[], %s::date[], %s::date[])
+        WITH ORDINALITY AS item(property_id, start_date, end_date, idx)
+    JOIN {Booking._meta.db_table} b
+        ON b.property_id = item.property_id
+        AND b.start_date < item.end_date
+        AND b.end_date > item.start_date
+    ORDER BY 1, b.start_date
+"""
+
+
+@dataclass
+class BulkResult:
+    bookings: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)  # item index -> field errors
+    conflicts: dict = field(default_factory=dict)  # item index -> [conflict]
+
+    def conflict_list(self):
+        return [
+            {"index": index, "conflicts_with": conflicts}
+            for index, conflicts in sorted(self.conflicts.items())
+        ]
+
+
+def find_conflicts(items):
+    """
+    Map item index -> conflicts, for ``items`` of dicts with ``property``
+    (an id), ``start_date`` and ``end_date``. Ranges are half-open, so a
+    stay may start on the day another ends.
+    """
+    conflicts = defaultdict(list)
+    if not items:
+        return conflicts
+
+    # Against each other: sort per property, compare with the furthest end.
+    by_property = defaultdict(list)
+    for index, item in enumerate(items):
+        by_property[item["property"]].append(index)
+    for indexes in by_property.values():
+        indexes.sort(key=lambda i: items[i]["start_date"])
+        latest = None  # the index whose range ends last so far
+        for index in indexes:
+            if (
+                latest is not None
+                and items[index]["start_date"] < items[latest]["end_date"]
+            ):
+                conflicts[index].append({"item": latest})
+                conflicts[latest].append({"item": index})
+            if latest is None or items[index]["end_date"] > items[latest]["end_date"]:
+                latest = index
+
+    # Against existing bookings: one query for every item.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            OVERLAP_SQL,
+            [
+                [item["property"] for item in items],
+                [item["start_date"] for item in items],
+                [item["end_date"] for item in items],
+            ],
+        )
+        for index, booking_id, start_date, end_date, is_block in cursor.fetchall():
+            conflicts[index].append(
+                {
+                    "booking": booking_id,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "is_block": is_block,
+                }
+            )
+    return conflicts
+
+
+def create_bookings(user, items):
+    """
+    Validate and insert ``items`` for ``user`` in one transaction. Items
+    with ``block`` set reserve the owner's own property at no charge; the
+    rest are stays booked by ``user`` and priced with the listing's rules.
+    """
+    result = BulkResult()
+    with transaction.atomic():
+        # Lock the properties so concurrent bulk requests for them queue up
+        # behind this one instead of passing the same overlap check.
+        properties = {
+            prop.id: prop
+            for prop in Property.objects.select_for_update()
+            .filter(id__in={item["property"] for item in items}, is_active=True)
+            .order_by("id")
+            .only(
+                "id",
+                "owner_id",
+                "title",
+                "price_per_night",
+                "weekend_price",
+                "min_nights",
+            )
+        }
+        # Every rule any item could touch, in one query
+        rules = defaultdict(list)
+        for rule in PriceRule.objects.filter(
+            property_id__in=properties,
+            start_date__lt=max(item["end_date"] for item in items),
+            end_date__gt=min(item["start_date"] for item in items),
+        ):
+            rules[rule.property_id].append(rule)
+
+        totals = {}
+        for index, item in enumerate(items):
+            prop = properties.get(item["property"])
+            if prop is None:
+                result.errors[index] = {"property_id": ["Property not found."]}
+            elif item["block"]:
+                if prop.owner_id != user.id:
+                    result.errors[index] = {
+                        "block": ["Only the owner can block a property's dates."]
+                    }
+                totals[index] = Decimal(0)
+            else:
+                quote = quote_stay(
+                    prop, item["start_date"], item["end_date"], rules[prop.id]
+                )
+                if not quote.meets_min_nights:
+                    result.errors[index] = {
+                        "end_date": [
+                            (
+                                f"This property requires at least {quote.min_nights} "
+                                "nights for these dates."
+                            )
+                        ]
+                    }
+                totals[index] = quote.total
+        if result.errors:
+            return result
+
+        result.conflicts = dict(find_conflicts(items))
+        if result.conflicts:
+            return result
+
+        result.bookings = Booking.objects.bulk_create(
+            Booking(
+                property=properties[item["property"]],
+                guest=user,
+                start_date=item["start_date"],
+                end_date=item["end_date"],
+                is_block=item["block"],
+                total_price=totals[index],
+            )
+            for index, item in enumerate(items)
+        )
+        # bulk_create sends no post_save, so invalidate the calendars here.
+        property_ids = set(properties)
+        transaction.on_commit(lambda: bump_calendar_versions(property_ids))
+    return result
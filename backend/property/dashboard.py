@@ -0,0 +1,118 @@
+"""
+Owner dashboard figures.
+
+Everything is aggregated in the database across all of an owner's
+listings: one query each for the listing counts, the nights booked in the
+occupancy window, the monthly revenue, the rating and the next check-ins.
+The cost doesn't grow with the number of properties.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Avg, Count, F, Q, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncMonth
+from django.utils import timezone
+
+from .models import Booking, Property, Review
+
+UPCOMING_LIMIT = 10
+
+
+def _overlap_nights(start, end):
+    """Nights of each booking that fall within ``[start, end)``."""
+    return Least("end_date", Value(end)) - Greatest("start_date", Value(start))
+
+
+def occupancy(owner_id, start, end, listings):
+    """
+    Booked share of the nights the owner's ``listings`` active listings
+    were open in ``[start, end)``. Owner blocks count as closed, not vacant.
+    """
+    days = (end - start).days
+    nights = Booking.objects.filter(
+        property__owner_id=owner_id,
+        property__is_active=True,
+        start_date__lt=end,
+        end_date__gt=start,
+    ).aggregate(
+        booked=Sum(_overlap_nights(start, end), filter=Q(is_block=False)),
+        blocked=Sum(_overlap_nights(start, end), filter=Q(is_block=True)),
+    )
+    booked = nights["booked"].days if nights["booked"] else 0
+    blocked = nights["blocked"].days if nights["blocked"] else 0
+    available = max(listings * days - blocked, 0)
+    return {
+        "start": start,
+        "end": end,
+        "booked_nights": booked,
+        "blocked_nights": blocked,
+        "available_nights": available,
+        "rate": round(booked / available, 4) if available else None,
+    }
+
+
+def revenue_by_month(owner_id, start):
+    """Bookings and revenue per check-in month, from ``start`` on."""
+    rows = (
+        Booking.objects.filter(
+            property__owner_id=owner_id, is_block=False, start_date__gte=start
+        )
+        .annotate(month=TruncMonth("start_date"))
+        .values("month")
+        .annotate(bookings=Count("id"), revenue=Sum("total_price"))
+        .order_by("month")
+    )
+    return [
+        {
+            "month": f"{row['month']:%Y-%m}",
+            "bookings": row["bookings"],
+            "revenue": row["revenue"],
+        }
+        for row in rows
+    ]
+
+
+def owner_dashboard(owner_id, days=30, months=12):
+    """
+    The dashboard payload: listing counts, occupancy over the last ``days``
+    days, revenue by check-in month from ``months`` months back (this one
+    included, later bookings too), average rating and the next check-ins.
+    """
+    today = timezone.localdate()
+    first_month = today.replace(day=1)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    listings = Property.objects.filter(owner_id=owner_id).aggregate(
+        total=Count("id"), active=Count("id", filter=Q(is_active=True))
+    )
+    rating = Review.objects.filter(property__owner_id=owner_id).aggregate(
+        average=Avg("rating"), count=Count("id")
+    )
+    if rating["average"] is not None:
+        rating["average"] = round(rating["average"], 2)
+    upcoming = (
+        Booking.objects.filter(
+            property__owner_id=owner_id, is_block=False, start_date__gte=today
+        )
+        .order_by("start_date", "id")
+        .values(
+            "id",
+            "property_id",
+            "start_date",
+            "end_date",
+            "total_price",
+            property_title=F("property__title"),
+            guest_username=F("guest__username"),
+        )[:UPCOMING_LIMIT]
+    )
+    return {
+        "owner": owner_id,
+        "properties": listings,
+        "occupancy": occupancy(
+            owner_id, today - timedelta(days=days), today, listings["active"]
+        ),
+        "revenue_by_month": revenue_by_month(owner_id, first_month),
+        "rating": rating,
+        "upcoming_check_ins": list(upcoming),
+    }
@@ -0,0 +1,146 @@
+"""
+Full dumps of properties, bookings and reviews as CSV or NDJSON.
+
+CSV goes through ``COPY ... TO STDOUT`` and NDJSON through a server-side
+cursor, so both stream in chunks and memory stays flat however many rows
+are exported. Used by ``ExportView`` and the ``export_data`` command.
+"""
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, time, timedelta
+
+from django.db.models import DateTimeField
+
+from django_backend.pgcopy import copy_to_chunks
+from django_backend.renderers import dumps
+
+from .models import Booking, Property, Review
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+NDJSON_CHUNK_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class Export:
+    model: type
+    # (output name, ORM lookup) pairs, in output order
+    columns: tuple
+    # Lookup from the exported row to the owning user's id
+    owner_lookup: str
+    # Field that ``since``/``until`` filter on
+    date_field: str
+
+    @property
+    def headers(self):
+        return [name for name, _ in self.columns]
+
+    @property
+    def lookups(self):
+        return [lookup for _, lookup in self.columns]
+
+
+EXPORTS = {
+    "properties": Export(
+        model=Property,
+        columns=(
+            ("id", "id"),
+            ("owner_id", "owner_id"),
+            ("owner", "owner__username"),
+            ("title", "title"),
+            ("address", "address"),
+            ("city", "city"),
+            ("country", "country"),
+            ("category", "category__slug"),
+            ("price_per_night", "price_per_night"),
+            ("cleaning_fee", "cleaning_fee"),
+            ("service_fee_percent", "service_fee_percent"),
+            ("num_guests", "num_guests"),
+            ("num_bedrooms", "num_bedrooms"),
+            ("num_bathrooms", "num_bathrooms"),
+            ("is_active", "is_active"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+        owner_lookup="owner_id",
+        date_field="created_at",
+    ),
+    "bookings": Export(
+        model=Booking,
+        columns=(
+            ("id", "id"),
+            ("property_id", "property_id"),
+            ("property", "property__title"),
+            ("guest_id", "guest_id"),
+            ("guest", "guest__username"),
+            ("start_date", "start_date"),
+            ("end_date", "end_date"),
+            ("total_price", "total_price"),
+            ("created_at", "created_at"),
+        ),
+        owner_lookup="property__owner_id",
+        date_field="start_date",
+    ),
+    "reviews": Export(
+        model=Review,
+        columns=(
+            ("id", "id"),
+            ("property_id", "property_id"),
+            ("author_id", "author_id"),
+            ("author", "author__username"),
+            ("rating", "rating"),
+            ("comment", "comment"),
+            ("created_at", "created_at"),
+        ),
+        owner_lookup="property__owner_id",
+        date_field="created_at",
+    ),
+}
+
+
+def export_queryset(export, owner_id=None, since=None, until=None):
+    """
+    Rows of ``export`` ordered by id, optionally limited to one owner's
+    listings and to ``since <= date_field <= until`` (both dates inclusive).
+    """
+    queryset = export.model.objects.order_by("id")
+    if owner_id is not None:
+        queryset = queryset.filter(**{export.owner_lookup: owner_id})
+
+    # Half-open [start, end) range; DateTimeFields compare whole UTC days.
+    start, end = since, until and until + timedelta(days=1)
+    if isinstance(export.model._meta.get_field(export.date_field), DateTimeField):
+        start = start and datetime.combine(start, time.min, tzinfo=UTC)
+        end = end and datetime.combine(end, time.min, tzinfo=UTC)
+    if start:
+        queryset = queryset.filter(**{f"{export.date_field}__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{export.date_field}__lt": end})
+    return queryset.values_list(*export.lookups)
+
+
+def iter_csv(export, queryset):
+    """Yield the header line, then the rows as CSV straight from ``COPY``."""
+    yield (",".join(export.headers) + "\n").encode()
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    yield from copy_to_chunks(sql, params, using=queryset.db)
+
+
+def iter_ndjson(export, queryset, chunk_size=NDJSON_CHUNK_SIZE):
+    """Yield one JSON object per row, read through a server-side cursor."""
+    headers = export.headers
+    buffer = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(dumps(dict(zip(headers, row))))
+        if len(buffer) >= chunk_size:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+
+def iter_export(export, queryset, fmt):
+    # Rows are read after the caller returns; keep the database chosen now.
+    queryset = queryset.using(queryset.db)
+    if fmt == "csv":
+        return iter_csv(export, queryset)
+    return iter_ndjson(export, queryset)
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import django_filters
+from django import forms
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    Func,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, NullIf
+
+from .models import PriceRule, Property
+from .pricing import WEEKEND, count_weekend_nights
+
+MAX_STAY_NIGHTS = 365
+# Postgres numbers the days of the week from Monday = 1.
+ISO_WEEKEND = ", ".join(str(day + 1) for day in sorted(WEEKEND))
+
+
+class StayForm(forms.Form):
+    def clean(self):
+        data = super().clean()
+        check_in, check_out = data.get("check_in"), data.get("check_out")
+        if check_in and check_out:
+            if check_out <= check_in:
+                self.add_error("check_out", "Must be after check_in.")
+            elif (check_out - check_in).days > MAX_STAY_NIGHTS:
+                self.add_error(
+                    "check_out", f"Stays are at most {MAX_STAY_NIGHTS} nights."
+                )
+        return data
+
+
+class PropertyFilter(django_filters.FilterSet):
+    # With check_in and check_out, only listings whose minimum stay allows
+    # it. The price range is then the average nightly price of that exact
+    # stay, rules and weekends included; otherwise the base price_per_night.
+    min_price = django_filters.NumberFilter(method="filter_noop")
+    max_price = django_filters.NumberFilter(method="filter_noop")
+    check_in = django_filters.DateFilter(method="filter_noop")
+    check_out = django_filters.DateFilter(method="filter_noop")
+
+    class Meta:
+        model = Property
+        fields = []
+        form = StayForm
+
+    def filter_noop(self, queryset, name, value):
+        return queryset  # applied together in filter_queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        low, high = data.get("min_price"), data.get("max_price")
+        check_in, check_out = data.get("check_in"), data.get("check_out")
+        if check_in and check_out:
+            return filter_stay(queryset, check_in, check_out, low, high)
+
+        if low is not None:
+            queryset = queryset.filter(price_per_night__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price_per_night__lte=high)
+        return queryset
+
+
+class RuledStayTotal(Func):
+    """
+    The total of the nights ``[start, end)`` at each listing, priced night by
+    night in SQL as ``quote_stay`` would: the highest priority (then newest)
+    rule covering a night sets its rate, the base rates cover the rest.
+    """
+
+    output_field = DecimalField(max_digits=12, decimal_places=2)
+    template = f"""(
+        SELECT sum(CASE
+            WHEN extract(isodow FROM night) IN ({ISO_WEEKEND})
+            THEN coalesce(r.weekend_price, r.price_per_night, {{weekend}})
+            ELSE coalesce(r.price_per_night, {{base}})
+        END)
+        FROM generate_series(%s::date, %s::date, interval '1 day') AS night
+        LEFT JOIN LATERAL (
+            SELECT price_per_night, weekend_price
+            FROM {PriceRule._meta.db_table}
+            WHERE property_id = {{pk}} AND start_date <= night AND end_date > night
+            ORDER BY priority DESC, id DESC
+            LIMIT 1
+        ) AS r ON true
+    )"""
+
+    def __init__(self, start, end):
+        super().__init__(
+            F("pk"), F("price_per_night"), Coalesce("weekend_price", "price_per_night")
+        )
+        self.start, self.end = start, end
+
+    def as_sql(self, compiler, connection, **extra_context):
+        (pk, pk_params), (base, base_params), (weekend, weekend_params) = (
+            compiler.compile(expression) for expression in self.get_source_expressions()
+        )
+        sql = self.template.format(pk=pk, base=base, weekend=weekend)
+        params = (
+            *weekend_params,
+            *base_params,
+            self.start,
+            self.end - timedelta(days=1),
+            *pk_params,
+        )
+        return sql, params
+
+
+def filter_stay(queryset, start, end, low=None, high=None):
+    """
+    Keep listings that take a ``[start, end)`` stay and, with ``low`` or
+    ``high``, whose average nightly price for it lies in ``[low, high]``.
+    The minimum stay is the check-in night's rule's, else the listing's.
+
+    Everything is one query. A listing without rules in the stay is priced
+    from its two base rates, since the weekend and weekday night counts are
+    the same for every listing; only listings with overlapping rules are
+    priced night by night.
+    """
+    nights = (end - start).days
+    rules = PriceRule.objects.filter(property=OuterRef("pk"))
+    check_in_rule = rules.filter(start_date__lte=start, end_date__gt=start).order_by(
+        "-priority", "-pk"
+    )
+    queryset = queryset.alias(
+        _min_nights=Coalesce(
+            NullIf(Subquery(check_in_rule.values("min_nights")[:1]), Value(0)),
+            "min_nights",
+        )
+    ).filter(_min_nights__lte=nights)
+    if low is None and high is None:
+        return queryset
+
+    weekend = count_weekend_nights(start, end)
+    queryset = queryset.alias(
+        _stay_total=Case(
+            When(
+                Exists(rules.filter(start_date__lt=end, end_date__gt=start)),
+                then=RuledStayTotal(start, end),
+            ),
+            default=(nights - weekend) * F("price_per_night")
+            + weekend * Coalesce("weekend_price", "price_per_night"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+    )
+    # Scale the bounds rather than divide every row's total.
+    if low is not None:
+        queryset = queryset.filter(_stay_total__gte=low * nights)
+    if high is not None:
+        queryset = queryset.filter(_stay_total__lte=high * nights)
+    return queryset
@@ -0,0 +1,359 @@
+"""
+iCalendar (.ics) export and import for property calendars.
+
+Export: ``property_calendar`` renders a property's upcoming bookings as
+all-day events. The output is cached under the property's calendar version,
+a stamp that every booking change bumps, so unchanged calendars are served
+from cache and can answer conditional requests with a 304.
+
+Import: ``sync_feed`` fetches an external feed (http(s):// or file://),
+parses it with a deliberately small parser that only reads what we use
+(UID, DTSTART, DTEND, STATUS) and diffs its events against the blocks
+imported from that feed earlier. Only new, moved and vanished events are
+written. Owners choose feed URLs, so http(s) fetches only ever connect to
+public addresses, redirects included.
+"""
+
+import http.client
+import ipaddress
+import socket
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking
+
+PRODID = "-//djangobnb//property calendar//EN"
+FETCH_TIMEOUT = 10
+MAX_FEED_BYTES = 5 * 1024 * 1024
+
+
+# ------------------------------
+# Version stamps
+# ------------------------------
+def _version_key(property_id):
+    return f"ical:version:{property_id}"
+
+
+def calendar_version(property_id):
+    return cache.get_or_set(_version_key(property_id), lambda: uuid.uuid4().hex, None)
+
+
+def bump_calendar_versions(property_ids):
+    """Invalidate the cached calendars of ``property_ids``."""
+    cache.set_many({_version_key(pk): uuid.uuid4().hex for pk in property_ids}, None)
+
+
+# ------------------------------
+# Export
+# ------------------------------
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets, as RFC 5545 requires."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while (data[cut] & 0xC0) == 0x80:  # don't split a character
+            cut -= 1
+        parts.append(data[:cut].decode())
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    parts.append(data.decode())
+    return "\r\n ".join(parts)
+
+
+def render_calendar(prop, bookings, stamp):
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(prop.title)}",
+    ]
+    for booking in bookings:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:booking-{booking.id}@djangobnb",
+            f"DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}",
+            f"DTSTART;VALUE=DATE:{booking.start_date:%Y%m%d}",
+            # DTEND is exclusive, like our end_date
+            f"DTEND;VALUE=DATE:{booking.end_date:%Y%m%d}",
+            "SUMMARY:" + ("Not available" if booking.is_block else "Reserved"),
+            "TRANSP:OPAQUE",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+
+
+def property_calendar(prop):
+    """
+    Return ``(version, ics bytes)`` for ``prop``'s current and upcoming
+    bookings. The version doubles as an ETag.
+    """
+    today = timezone.localdate()
+    version = f"{calendar_version(prop.pk)}-{today:%Y%m%d}"
+    key = f"ical:feed:{prop.pk}:{version}"
+    content = cache.get(key)
+    if content is None:
+        bookings = (
+            Booking.objects.filter(property=prop, end_date__gt=today)
+            .order_by("start_date")
+            .only("id", "start_date", "end_date", "is_block")
+        )
+        content = render_calendar(prop, bookings, timezone.now())
+        cache.set(key, content, settings.CALENDAR_CACHE_TIMEOUT)
+    return version, content
+
+
+# ------------------------------
+# Import
+# ------------------------------
+def _unfold(text):
+    lines = []
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+
+def _parse_date(value):
+    # DATE (20250101) or DATE-TIME (20250101T140000[Z]); only the day matters
+    return datetime.strptime(value[:8], "%Y%m%d").date()
+
+
+def parse_ical(text):
+    """
+    Return ``{uid: (start_date, end_date)}`` for the VEVENTs in ``text``,
+    skipping cancelled events. ``end_date`` is exclusive; an event without
+    DTEND lasts one day. Raises ``ValueError`` if ``text`` isn't a calendar,
+    so an error page can't read as "every event was cancelled".
+    """
+    lines = _unfold(text)
+    if not lines or lines[0].strip().upper() != "BEGIN:VCALENDAR":
+        raise ValueError("Not an iCalendar feed.")
+
+    events = {}
+    event = None
+    for line in lines:
+        name_params, _, value = line.partition(":")
+        name = name_params.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {}
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            if (
+                event.get("UID")
+                and event.get("DTSTART")
+                and event.get("STATUS", "").upper() != "CANCELLED"
+            ):
+                try:
+                    start = _parse_date(event["DTSTART"])
+                    end = (
+                        _parse_date(event["DTEND"])
+                        if event.get("DTEND")
+                        else start + timedelta(days=1)
+                    )
+                except ValueError:
+                    pass  # unparseable dates; skip the event
+                else:
+                    if end <= start:  # a timed event ending the same day
+                        end = start + timedelta(days=1)
+                    events[event["UID"][:255]] = (start, end)
+            event = None
+        elif event is not None and name in ("UID", "DTSTART", "DTEND", "STATUS"):
+            event[name] = value.strip()
+    return events
+
+
+class FeedNotModified(Exception):
+    pass
+
+
+def _read(source):
+    # A truncated feed would look like cancelled events, so refuse it whole.
+    data = source.read(MAX_FEED_BYTES + 1)
+    if len(data) > MAX_FEED_BYTES:
+        raise ValueError(f"Feed is larger than {MAX_FEED_BYTES} bytes.")
+    return data
+
+
+def _is_public(address):
+    # Scope ids ("fe80::1%eth0") aren't part of the address.
+    return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+
+
+def check_feed_url(url):
+    """
+    Raise ``ValueError`` unless ``url`` is http(s) and its host only
+    resolves to public addresses, so owners can't point feeds at the
+    server's own network (loopback, private ranges, cloud metadata).
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("Use an http:// or https:// URL.")
+    try:
+        infos = socket.getaddrinfo(parsed.hostname, None, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise ValueError(f"Cannot resolve {parsed.hostname}.") from None
+    if not all(_is_public(info[4][0]) for info in infos):
+        raise ValueError("Feed URLs must point to a public address.")
+
+
+def _public_connection(address, *args, **kwargs):
+    # Checked on the connected socket, so neither a redirect nor a DNS
+    # answer that changed since check_feed_url can reach a private address.
+    sock = socket.create_connection(address, *args, **kwargs)
+    if not _is_public(sock.getpeername()[0]):
+        sock.close()
+        raise OSError(f"{address[0]} is not a public address.")
+    return sock
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _public_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+# No proxies: the address checked must be the feed's own.
+_opener = urllib.request.build_opener(
+    urllib.request.ProxyHandler({}), _PublicHTTPHandler, _PublicHTTPSHandler
+)
+
+
+def fetch_feed(feed):
+    """Return the feed's text, raising ``FeedNotModified`` on a 304."""
+    parsed = urlparse(feed.url)
+    if parsed.scheme == "file":
+        with open(urllib.request.url2pathname(parsed.path), "rb") as source:
+            return _read(source).decode("utf-8", "replace")
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported feed URL scheme {parsed.scheme!r}.")
+    check_feed_url(feed.url)
+
+    request = urllib.request.Request(feed.url, headers={"Accept": "text/calendar"})
+    if feed.etag:
+        request.add_header("If-None-Match", feed.etag)
+    if feed.last_modified:
+        request.add_header("If-Modified-Since", feed.last_modified)
+    try:
+        with _opener.open(request, timeout=FETCH_TIMEOUT) as response:
+            feed.etag = response.headers.get("ETag", "")
+            feed.last_modified = response.headers.get("Last-Modified", "")
+            charset = response.headers.get_content_charset() or "utf-8"
+            return _read(response).decode(charset, "replace")
+    except HTTPError as exc:
+        if exc.code == 304:
+            raise FeedNotModified from None
+        raise
+
+
+@dataclass
+class SyncResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    not_modified: bool = False
+
+    @property
+    def changed(self):
+        return bool(self.created or self.updated or self.deleted)
+
+
+def apply_events(feed, events):
+    """Write the difference between ``events`` and the feed's blocks."""
+    result = SyncResult()
+    with transaction.atomic():
+        existing = {
+            booking.external_uid: booking
+            for booking in Booking.objects.select_for_update().filter(feed=feed)
+        }
+        to_create, to_update = [], []
+        for uid, (start, end) in events.items():
+            booking = existing.pop(uid, None)
+            if booking is None:
+                to_create.append(
+                    Booking(
+                        property_id=feed.property_id,
+                        guest_id=feed.property.owner_id,
+                        start_date=start,
+                        end_date=end,
+                        total_price=0,
+                        is_block=True,
+                        feed=feed,
+                        external_uid=uid,
+                    )
+                )
+            elif (booking.start_date, booking.end_date) != (start, end):
+                booking.start_date, booking.end_date = start, end
+                booking.updated_at = timezone.now()  # bulk_update skips auto_now
+                to_update.append(booking)
+
+        Booking.objects.bulk_create(to_create)
+        Booking.objects.bulk_update(to_update, ["start_date", "end_date", "updated_at"])
+        if existing:
+            Booking.objects.filter(pk__in=[b.pk for b in existing.values()]).delete()
+
+        result.created, result.updated = len(to_create), len(to_update)
+        result.deleted = len(existing)
+        if result.changed:
+            transaction.on_commit(lambda: bump_calendar_versions([feed.property_id]))
+    return result
+
+
+def sync_feed(feed):
+    """Fetch, parse and apply one feed, recording the outcome on it."""
+    try:
+        events = parse_ical(fetch_feed(feed))
+    except FeedNotModified:
+        result = SyncResult(not_modified=True)
+        feed.last_error = ""
+    except (OSError, ValueError) as exc:
+        feed.last_error = str(exc)[:1000]
+        feed.save(update_fields=["last_error"])
+        raise
+    else:
+        result = apply_events(feed, events)
+        feed.last_error = ""
+    feed.last_synced_at = timezone.now()
+    feed.save(update_fields=["etag", "last_modified", "last_synced_at", "last_error"])
+    return result
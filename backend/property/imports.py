@@ -0,0 +1,280 @@
+"""
+Bulk import of listings.
+
+Rows are validated in batches by ``PropertyImportRowSerializer`` and
+``COPY``-ed into temporary staging tables. Category slugs, amenity names and
+owner usernames are then resolved with joins against the staging tables,
+rows whose image already belongs to a listing (or to an earlier row) are
+rejected, and every row that resolves is inserted with one ``INSERT ... SELECT``
+(plus one for the amenity links and one ``UPDATE`` for ``search_vector``).
+Rows that fail either step are reported by row number and skipped; the
+rest are imported.
+"""
+
+from dataclasses import dataclass, field
+from itertools import batched
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+
+from django_backend.pgcopy import copy_from_rows
+
+from .models import Amenity, Category, Property
+from .serializers import PropertyImportRowSerializer
+from .signals import property_search_vector
+
+STAGING = "property_import_staging"
+STAGING_AMENITIES = "property_import_staging_amenities"
+BATCH_SIZE = 1000
+
+# Staged columns, in COPY order
+COLUMNS = [
+    "row_number",
+    "owner_id",
+    "owner_username",
+    "title",
+    "description",
+    "address",
+    "city",
+    "country",
+    "price_per_night",
+    "cleaning_fee",
+    "service_fee_percent",
+    "num_guests",
+    "num_bedrooms",
+    "num_bathrooms",
+    "category_slug",
+    "main_image",
+    "is_active",
+]
+
+CREATE_STAGING = f"""
+    DROP TABLE IF EXISTS {STAGING}, {STAGING_AMENITIES};
+    CREATE TEMPORARY TABLE {STAGING} (
+        row_number integer PRIMARY KEY,
+        id bigint,
+        owner_id bigint,
+        owner_username text,
+        title text NOT NULL,
+        description text NOT NULL,
+        address text NOT NULL,
+        city text NOT NULL,
+        country text NOT NULL,
+        price_per_night numeric(10, 2) NOT NULL,
+        cleaning_fee numeric(10, 2) NOT NULL,
+        service_fee_percent integer NOT NULL,
+        num_guests integer NOT NULL,
+        num_bedrooms integer NOT NULL,
+        num_bathrooms integer NOT NULL,
+        category_slug text NOT NULL,
+        category_id bigint,
+        main_image text NOT NULL,
+        is_active boolean NOT NULL
+    ) ON COMMIT DROP;
+    CREATE TEMPORARY TABLE {STAGING_AMENITIES} (
+        row_number integer NOT NULL,
+        name text NOT NULL,
+        amenity_id bigint
+    ) ON COMMIT DROP;
+"""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: dict = field(default_factory=dict)  # row number -> field errors
+
+    def error_list(self):
+        return [
+            {"row": number, "errors": errors}
+            for number, errors in sorted(self.errors.items())
+        ]
+
+
+def normalize_row(row):
+    """
+    Accept CSV-shaped rows too: blank cells count as missing and amenities
+    may be one ``|``-separated string.
+    """
+    if not isinstance(row, dict):
+        return row  # the serializer reports it
+    row = {key: value for key, value in row.items() if value not in ("", None)}
+    amenities = row.get("amenities")
+    if isinstance(amenities, str):
+        row["amenities"] = [name.strip() for name in amenities.split("|") if name]
+    return row
+
+
+def import_properties(
+    rows, owner_id=None, allow_owner_column=False, batch_size=BATCH_SIZE, dry_run=False
+):
+    """
+    Import an iterable of row dicts. Rows belong to ``owner_id`` unless
+    ``allow_owner_column`` is set and the row names an ``owner`` username.
+    With ``dry_run`` everything is validated and resolved, then rolled back.
+    """
+    result = ImportResult()
+    row_serializer = PropertyImportRowSerializer()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING)
+
+        for batch in batched(enumerate(rows, start=1), batch_size):
+            valid = []
+            for number, row in batch:
+                try:
+                    data = row_serializer.run_validation(normalize_row(row))
+                except ValidationError as exc:
+                    result.errors[number] = exc.detail
+                    continue
+                if not allow_owner_column:
+                    data.pop("owner", None)
+                if owner_id is None and "owner" not in data:
+                    result.errors[number] = {"owner": ["This field is required."]}
+                    continue
+                valid.append((number, data))
+            _stage(valid, owner_id)
+
+        with connection.cursor() as cursor:
+            _resolve(cursor, result)
+            result.created = _insert(cursor)
+
+        if dry_run:
+            transaction.set_rollback(True)
+    return result
+
+
+# ------------------------------
+# Steps
+# ------------------------------
+def _stage(valid, owner_id):
+    copy_from_rows(
+        STAGING,
+        COLUMNS,
+        (
+            (
+                number,
+                None if "owner" in data else owner_id,
+                data.get("owner"),
+                data["title"],
+                data["description"],
+                data["address"],
+                data["city"],
+                data["country"],
+                data["price_per_night"],
+                data["cleaning_fee"],
+                data["service_fee_percent"],
+                data["num_guests"],
+                data["num_bedrooms"],
+                data["num_bathrooms"],
+                data["category"],
+                data["main_image"],
+                data["is_active"],
+            )
+            for number, data in valid
+        ),
+    )
+    copy_from_rows(
+        STAGING_AMENITIES,
+        ["row_number", "name"],
+        (
+            (number, name)
+            for number, data in valid
+            for name in dict.fromkeys(data["amenities"])
+        ),
+    )
+
+
+def _resolve(cursor, result):
+    """
+    Fill in foreign keys by joining on the lookups, then drop failed rows.
+    Images must be unclaimed: deleting a listing deletes its image file.
+    """
+    user_table = get_user_model()._meta.db_table
+    category_table = Category._meta.db_table
+    amenity_table = Amenity._meta.db_table
+    property_table = Property._meta.db_table
+
+    cursor.execute(
+        f"""
+        UPDATE {STAGING} s SET owner_id = u.id
+        FROM {user_table} u WHERE u.username = s.owner_username;
+        UPDATE {STAGING} s SET category_id = c.id
+        FROM {category_table} c WHERE c.slug = s.category_slug;
+        UPDATE {STAGING_AMENITIES} sa SET amenity_id = a.id
+        FROM (
+            SELECT DISTINCT ON (lower(name)) id, lower(name) AS name
+            FROM {amenity_table} ORDER BY lower(name), id
+        ) a
+        WHERE a.name = lower(sa.name);
+        """
+    )
+    cursor.execute(
+        f"""
+        SELECT row_number, 'owner', 'Unknown user "' || owner_username || '".'
+        FROM {STAGING} WHERE owner_id IS NULL
+        UNION ALL
+        SELECT row_number, 'category', 'Unknown category "' || category_slug || '".'
+        FROM {STAGING} WHERE category_id IS NULL
+        UNION ALL
+        SELECT row_number, 'amenities', 'Unknown amenity "' || name || '".'
+        FROM {STAGING_AMENITIES} WHERE amenity_id IS NULL
+        UNION ALL
+        SELECT row_number, 'main_image', 'Image "' || main_image || '" is in use.'
+        FROM {STAGING} s
+        WHERE main_image IN (SELECT main_image FROM {property_table})
+        OR EXISTS (
+            SELECT 1 FROM {STAGING} t
+            WHERE t.main_image = s.main_image AND t.row_number < s.row_number
+        )
+        ORDER BY 1
+        """
+    )
+    failed = set()
+    for number, name, message in cursor.fetchall():
+        result.errors.setdefault(number, {}).setdefault(name, []).append(message)
+        failed.add(number)
+
+    if failed:
+        cursor.execute(
+            f"DELETE FROM {STAGING} WHERE row_number = ANY(%s)", [sorted(failed)]
+        )
+
+
+def _insert(cursor):
+    """Insert every staged row and its amenity links; returns the row count."""
+    table = Property._meta.db_table
+    through = Property.amenities.through._meta.db_table
+    # Ids are drawn up front so the amenity links can join on them.
+    cursor.execute(
+        f"""
+        UPDATE {STAGING}
+        SET id = nextval(pg_get_serial_sequence('{table}', 'id'));
+        INSERT INTO {table} (
+            id, owner_id, title, description, address, city, country,
+            price_per_night, cleaning_fee, service_fee_percent, num_guests,
+            num_bedrooms, num_bathrooms, category_id, main_image, is_active,
+            created_at, updated_at
+        )
+        SELECT
+            id, owner_id, title, description, address, city, country,
+            price_per_night, cleaning_fee, service_fee_percent, num_guests,
+            num_bedrooms, num_bathrooms, category_id, main_image, is_active,
+            now(), now()
+        FROM {STAGING} ORDER BY row_number;
+        INSERT INTO {through} (property_id, amenity_id)
+        SELECT DISTINCT s.id, sa.amenity_id
+        FROM {STAGING_AMENITIES} sa JOIN {STAGING} s USING (row_number);
+        """
+    )
+    cursor.execute(f"SELECT count(*) FROM {STAGING}")
+    created = cursor.fetchone()[0]
+
+    # A subquery rather than a list of ids, so this stays one statement.
+    Property.objects.filter(id__in=RawSQL(f"SELECT id FROM {STAGING}", [])).update(
+        search_vector=property_search_vector()
+    )
+    return created
@@ -0,0 +1,133 @@
+"""
+Process-wide caches of the small lookup tables, categories and amenities.
+
+Every property write validates a category id and a list of amenity ids,
+which ``PrimaryKeyRelatedField`` does with a query per id. These tables are
+tiny and rarely change, so each process keeps all their rows in memory and
+``CachedPrimaryKeyRelatedField`` validates against that, with no query.
+
+A table is reloaded when its version stamp in the cache changes, which any
+save or delete of its rows does (see signals.py). The stamp is checked at
+most every ``CHECK_INTERVAL`` seconds, so ids in one request share a check;
+the process that made the change reloads at once. Without a shared cache,
+other processes never see the new stamp, so a table is also reloaded once
+it is ``MAX_AGE`` seconds old.
+
+Each load is a snapshot, and callers read from the snapshot they were
+handed, so a concurrent reload can't pull the rows out from under them.
+The rows are shared between requests: treat them as read-only.
+"""
+
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import router
+from rest_framework import serializers
+
+from .models import Amenity, Category
+
+CHECK_INTERVAL = 1.0  # seconds
+MAX_AGE = 300.0  # seconds
+
+
+@dataclass
+class Snapshot:
+    version: str
+    rows: dict  # pk -> row
+    loaded_at: float
+    data: dict = field(default_factory=dict)  # serializer class -> serialized rows
+
+
+class LookupTable:
+    """All rows of ``model`` by pk, plus their serialized form."""
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"lookups:version:{model._meta.label_lower}"
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0.0
+
+    def _sync(self):
+        """The current snapshot, reloaded first if it is out of date."""
+        snapshot = self.snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and now - self.checked_at < CHECK_INTERVAL
+            and now - snapshot.loaded_at < MAX_AGE
+        ):
+            return snapshot
+        version = cache.get_or_set(self.version_key, lambda: uuid.uuid4().hex, None)
+        with self.lock:
+            snapshot = self.snapshot
+            if (
+                snapshot is None
+                or snapshot.version != version
+                or time.monotonic() - snapshot.loaded_at >= MAX_AGE
+            ):
+                # From the primary: a lagging replica would pin stale rows.
+                queryset = self.model._default_manager.using(
+                    router.db_for_write(self.model)
+                ).order_by("pk")
+                snapshot = Snapshot(
+                    version, {row.pk: row for row in queryset}, time.monotonic()
+                )
+                self.snapshot = snapshot
+            self.checked_at = time.monotonic()
+        return snapshot
+
+    def get(self, pk):
+        """The row with ``pk``; None if there is none."""
+        return self._sync().rows.get(pk)
+
+    def serialized(self, serializer_class):
+        """``serializer_class(many=True).data`` of all rows, computed once."""
+        snapshot = self._sync()
+        data = snapshot.data.get(serializer_class)
+        if data is None:
+            data = serializer_class(snapshot.rows.values(), many=True).data
+            snapshot.data[serializer_class] = data
+        return data
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are copied per serializer; they share the table.
+        return self
+
+    def bump(self):
+        """Invalidate the table here and, through the cache, elsewhere."""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        with self.lock:
+            self.snapshot = None
+
+
+categories = LookupTable(Category)
+amenities = LookupTable(Amenity)
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    ``PrimaryKeyRelatedField`` that validates against a ``LookupTable``:
+    ``CachedPrimaryKeyRelatedField(table=amenities, many=True)``.
+    """
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        kwargs.setdefault("queryset", table.model._default_manager.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = self.table.model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        row = self.table.get(pk)
+        if row is None:
+            self.fail("does_not_exist", pk_value=data)
+        return row
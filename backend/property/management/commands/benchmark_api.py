@@ -0,0 +1,274 @@
+import json
+import platform
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from property.models import Booking, Property, Review
+from useraccount.models import Useraccount
+
+DEFAULT_OUTPUT = settings.BASE_DIR / "benchmarks" / "api.json"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+# ------------------------------
+# Scenarios
+# ------------------------------
+# Each scenario takes the fixture context and the iteration number and returns
+# (method, url, data). Writes run inside a transaction that is rolled back.
+def scenario_list(ctx, i):
+    return "get", reverse("property-list") + "?page_size=20", None
+
+
+def scenario_detail(ctx, i):
+    return "get", reverse("property-detail", args=[ctx["property"].pk]), None
+
+
+def scenario_search(ctx, i):
+    return "get", reverse("property-search") + f"?q={ctx['property'].city}", None
+
+
+def scenario_availability(ctx, i):
+    start = date.today() + timedelta(days=i % 60)
+    url = reverse("property-check-availability", args=[ctx["property"].pk])
+    return "get", f"{url}?start_date={start}&end_date={start + timedelta(days=3)}", None
+
+
+def scenario_booking_create(ctx, i):
+    # Far in the future and three days apart, so every iteration is valid.
+    start = date.today() + timedelta(days=3650 + 3 * i)
+    return (
+        "post",
+        reverse("booking-list"),
+        {
+            "property_id": ctx["property"].pk,
+            "start_date": str(start),
+            "end_date": str(start + timedelta(days=2)),
+        },
+    )
+
+
+def _useraccount_search(ctx, term):
+    return "get", reverse("useraccount-list") + f"?search={term}", None
+
+
+def scenario_useraccount_exact(ctx, i):
+    return _useraccount_search(ctx, ctx["useraccount"].useraccount_id)
+
+
+def scenario_useraccount_name(ctx, i):
+    return _useraccount_search(ctx, ctx["useraccount"].name[1:5] or "a")
+
+
+def scenario_useraccount_creator(ctx, i):
+    return _useraccount_search(ctx, ctx["user"].username[:6])
+
+
+SCENARIOS = {
+    "property_list": scenario_list,
+    "property_detail": scenario_detail,
+    "property_search": scenario_search,
+    "check_availability": scenario_availability,
+    "booking_create": scenario_booking_create,
+    "useraccount_exact": scenario_useraccount_exact,
+    "useraccount_name": scenario_useraccount_name,
+    "useraccount_creator": scenario_useraccount_creator,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot API endpoints through the Django test client and "
+        "record per-endpoint p50/p99 latency and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help="Comma separated subset of: " + ", ".join(SCENARIOS),
+        )
+        parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+        parser.add_argument(
+            "--compare", help="A previous JSON result to print deltas against."
+        )
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["scenarios"].split(",") if n.strip()]
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        if "silk" in settings.INSTALLED_APPS:
+            self.stderr.write(
+                self.style.WARNING(
+                    "Silk is enabled and records every request; set "
+                    "SILK_ENABLED=false for representative numbers."
+                )
+            )
+
+        ctx = self.fixture_context()
+        results = {}
+        # Measure the endpoints, not the rate limits: booking_create alone
+        # sends more requests than its per-user rate allows.
+        no_throttling = override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_CLASSES": (),
+                "DEFAULT_THROTTLE_RATES": {},
+            }
+        )
+        try:
+            with no_throttling, transaction.atomic():
+                for name in names:
+                    results[name] = self.run_scenario(
+                        SCENARIOS[name], ctx, options["iterations"], options["warmup"]
+                    )
+                    self.report(name, results[name])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "iterations": options["iterations"],
+                "dataset": {
+                    "properties": Property.objects.count(),
+                    "bookings": Booking.objects.count(),
+                    "reviews": Review.objects.count(),
+                    "useraccounts": Useraccount.objects.count(),
+                },
+            },
+            "endpoints": results,
+        }
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options["compare"]:
+            self.compare(json.loads(Path(options["compare"]).read_text()), report)
+
+    def fixture_context(self):
+        """Pick a representative property and a user to act as the client."""
+        prop = (
+            Property.objects.filter(is_active=True)
+            .annotate(n=Count("bookings"))
+            .order_by("-n", "id")
+            .first()
+        )
+        if prop is None:
+            raise CommandError(
+                "No properties found. Run `manage.py generate_synthetic_data` first."
+            )
+        # The tenant with the most useraccounts, so account search is measured
+        # against the largest table a client sees.
+        user = (
+            get_user_model()
+            .objects.exclude(pk=prop.owner_id)
+            .annotate(n=Count("useraccounts"))
+            .order_by("-n", "id")
+            .first()
+            or prop.owner
+        )
+        useraccount = (
+            Useraccount.objects.filter(creator=user).order_by("-created_at").first()
+        )
+        if useraccount is None:
+            raise CommandError(
+                f"{user} has no useraccounts. Run `manage.py generate_synthetic_data` "
+                "first."
+            )
+
+        host = (settings.ALLOWED_HOSTS or ["localhost"])[0]
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        return {
+            "property": prop,
+            "user": user,
+            "useraccount": useraccount,
+            "client": client,
+        }
+
+    def run_scenario(self, scenario, ctx, iterations, warmup):
+        client = ctx["client"]
+        secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+        timings, queries, statuses = [], [], set()
+
+        for i in range(warmup + iterations):
+            method, url, data = scenario(ctx, i)
+            kwargs = {"secure": secure}
+            if data is not None:
+                kwargs.update(data=data, content_type="application/json")
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = getattr(client, method)(url, **kwargs)
+                elapsed = time.perf_counter() - start
+            if not 200 <= response.status_code < 300:
+                raise CommandError(
+                    f"{method.upper()} {url} returned {response.status_code}: "
+                    f"{response.content[:200]!r}"
+                )
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(len(captured))
+                statuses.add(response.status_code)
+
+        timings.sort()
+        return {
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(sum(timings) / len(timings), 3) if timings else 0.0,
+            "queries": max(queries) if queries else 0,
+            "status": sorted(statuses),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<22} p50={result['p50_ms']:>9.2f}ms "
+            f"p99={result['p99_ms']:>9.2f}ms queries={result['queries']:<3} "
+            f"status={result['status']}"
+        )
+
+    def compare(self, baseline, current):
+        self.stdout.write("\nChange against baseline (negative is faster):")
+        for name, result in current["endpoints"].items():
+            before = baseline.get("endpoints", {}).get(name)
+            if not before:
+                self.stdout.write(f"{name:<22} (no baseline)")
+                continue
+            deltas = []
+            for key in ("p50_ms", "p99_ms"):
+                if before[key]:
+                    change = (result[key] - before[key]) / before[key] * 100
+                    deltas.append(f"{key[:3]} {change:+6.1f}%")
+            deltas.append(f"queries {result['queries'] - before['queries']:+d}")
+            self.stdout.write(f"{name:<22} " + "  ".join(deltas))
@@ -0,0 +1,86 @@
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django_backend.parsers import ORJSONParser
+from django_backend.renderers import ORJSONRenderer
+from property.models import Property
+from property.serializers import PropertyDetailSerializer, PropertyListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson-backed ones on "
+        "realistic property payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        payloads = self.payloads()
+        iterations = options["iterations"]
+        stdlib, fast = JSONRenderer(), ORJSONRenderer()
+
+        for name, data in payloads.items():
+            expected = stdlib.render(data)
+            if json.loads(fast.render(data)) != json.loads(expected):
+                raise CommandError(f"Renderers disagree on the {name} payload.")
+
+            self.stdout.write(f"{name} ({len(expected) / 1024:.1f} KiB)")
+            self.compare(
+                "render",
+                lambda data=data: stdlib.render(data),
+                lambda data=data: fast.render(data),
+                iterations,
+            )
+            self.compare(
+                "parse",
+                lambda body=expected: JSONParser().parse(io.BytesIO(body)),
+                lambda body=expected: ORJSONParser().parse(io.BytesIO(body)),
+                iterations,
+            )
+
+    def payloads(self):
+        detail = (
+            Property.objects.filter(is_active=True)
+            .annotate(n=Count("bookings"))
+            .order_by("-n")
+            .select_related("owner", "category")
+            .prefetch_related("images", "amenities", "reviews__author", "bookings")
+            .first()
+        )
+        if detail is None:
+            raise CommandError(
+                "No properties found. Run `manage.py generate_synthetic_data` first."
+            )
+        page = Property.objects.filter(is_active=True).select_related("owner")[:100]
+        return {
+            "property detail": PropertyDetailSerializer(detail).data,
+            "property list (100 rows)": {
+                "count": 100,
+                "next": None,
+                "previous": None,
+                "results": PropertyListSerializer(page, many=True).data,
+            },
+        }
+
+    def compare(self, label, baseline, candidate, iterations):
+        before = self.time(baseline, iterations)
+        after = self.time(candidate, iterations)
+        self.stdout.write(
+            f"  {label:<7} stdlib {before * 1e6:9.1f}us  "
+            f"orjson {after * 1e6:9.1f}us  x{before / after:5.1f}"
+        )
+
+    def time(self, func, iterations):
+        func()  # warm up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,162 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+DEFAULT_OUTPUT = settings.BASE_DIR / "benchmarks" / "startup.json"
+IMPORTTIME_RUNS = 3
+
+# What a worker does before its first request: set up the apps, build the
+# WSGI handler (which loads the middleware) and import every URLconf and view.
+BOOT = """
+import time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+print(time.perf_counter() - start)
+"""
+
+
+def import_times(stderr):
+    """Self time in seconds per top-level package, from ``-X importtime``."""
+    totals = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure a cold worker start: the wall time of fresh interpreters "
+        "that set up Django and import every URLconf, and the import time "
+        "per package from `python -X importtime`, recorded as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--env",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Set in the child processes, e.g. --env ENVIRONMENT=prod.",
+        )
+        parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+        parser.add_argument(
+            "--compare", help="A previous JSON result to print deltas against."
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)  # with DJANGO_SETTINGS_MODULE, as manage.py set it
+        for item in options["env"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--env takes NAME=VALUE, not {item!r}.")
+            env[name] = value
+
+        self.run(env)  # warm the OS page cache and the .pyc files
+        wall, setup = [], []
+        for _ in range(options["runs"]):
+            elapsed, boot, _stderr = self.run(env)
+            wall.append(elapsed)
+            setup.append(boot)
+        # Per package, the best of a few profiles; one alone is noisy.
+        profiles = [
+            import_times(self.run(env, "-X", "importtime")[2])
+            for _ in range(IMPORTTIME_RUNS)
+        ]
+        packages = Counter(
+            {
+                name: min(profile.get(name, 0) for profile in profiles)
+                for name in set().union(*profiles)
+            }
+        )
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "runs": options["runs"],
+                "env": options["env"],
+            },
+            # Best of the runs: the slower ones mostly measure other load.
+            "wall_ms": round(min(wall) * 1000, 1),
+            "wall_median_ms": round(statistics.median(wall) * 1000, 1),
+            "setup_ms": round(min(setup) * 1000, 1),
+            "import_ms": round(sum(packages.values()) * 1000, 1),
+            "packages_ms": {
+                name: round(seconds * 1000, 1)
+                for name, seconds in packages.most_common()
+            },
+        }
+        self.report(report, options["top"])
+
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options["compare"]:
+            self.compare(
+                json.loads(Path(options["compare"]).read_text()), report, options["top"]
+            )
+
+    def run(self, env, *flags):
+        """Boot a fresh interpreter; returns (wall, setup, stderr)."""
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, *flags, "-c", BOOT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            raise CommandError(f"The worker failed to start:\n{result.stderr}")
+        return elapsed, float(result.stdout.split()[-1]), result.stderr
+
+    def report(self, report, top):
+        self.stdout.write(
+            f"wall {report['wall_ms']:.0f}ms (median {report['wall_median_ms']:.0f}ms)"
+            f"  setup {report['setup_ms']:.0f}ms  imports {report['import_ms']:.0f}ms"
+            f"  best of {report['meta']['runs']}"
+        )
+        for name, ms in list(report["packages_ms"].items())[:top]:
+            self.stdout.write(f"  {name:<28} {ms:8.1f}ms")
+
+    def compare(self, baseline, report, top):
+        self.stdout.write("\nChange against baseline:")
+        for key in ("wall_ms", "setup_ms", "import_ms"):
+            before, after = baseline[key], report[key]
+            self.stdout.write(
+                f"  {key:<10} {before:8.1f} -> {after:8.1f}ms "
+                f"({(after - before) / before * 100:+.0f}%)"
+            )
+        # The packages whose import time changed most; 0 means not imported.
+        before, after = baseline["packages_ms"], report["packages_ms"]
+        changes = sorted(
+            set(before) | set(after),
+            key=lambda name: -abs(after.get(name, 0) - before.get(name, 0)),
+        )
+        for name in changes[:top]:
+            self.stdout.write(
+                f"  {name:<28} {before.get(name, 0):8.1f} -> "
+                f"{after.get(name, 0):8.1f}ms"
+            )
@@ -0,0 +1,53 @@
+import sys
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from property.exports import EXPORTS, FORMATS, export_queryset, iter_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Dump properties, bookings or reviews as CSV (via COPY) or NDJSON "
+        "(via a server-side cursor), streamed to a file or stdout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument(
+            "--owner", help="Only rows for this owner's listings (username or id)."
+        )
+        parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument("--output", default="-", help="File path, or - for stdout.")
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["kind"]]
+        owner_id = self.owner_id(options["owner"]) if options["owner"] else None
+        queryset = export_queryset(export, owner_id, options["since"], options["until"])
+        chunks = iter_export(export, queryset, options["format"])
+
+        if options["output"] == "-":
+            self.write(chunks, sys.stdout.buffer)
+        else:
+            with open(options["output"], "wb") as output:
+                size = self.write(chunks, output)
+            self.stderr.write(f"Wrote {size} bytes to {options['output']}")
+
+    def owner_id(self, owner):
+        User = get_user_model()
+        lookup = {"pk": owner} if owner.isdigit() else {"username": owner}
+        try:
+            return User.objects.values_list("pk", flat=True).get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"No user {owner!r}.")
+
+    def write(self, chunks, output):
+        size = 0
+        for chunk in chunks:
+            output.write(chunk)
+            size += len(chunk)
+        output.flush()
+        return size
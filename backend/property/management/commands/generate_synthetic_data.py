@@ -0,0 +1,325 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from django_backend.pgcopy import copy_from_rows
+from property.models import Amenity, Booking, Category, Property, Review
+from property.reviews import recount_ratings
+from property.signals import property_search_vector
+from useraccount.models import Useraccount
+
+CATEGORIES = [
+    ("Beachfront", "beachfront"),
+    ("Cabins", "cabins"),
+    ("City", "city"),
+    ("Countryside", "countryside"),
+    ("Lakefront", "lakefront"),
+    ("Mansions", "mansions"),
+    ("Tiny homes", "tiny-homes"),
+]
+AMENITIES = [
+    "Wifi",
+    "Kitchen",
+    "Washer",
+    "Air conditioning",
+    "Heating",
+    "Free parking",
+    "Pool",
+    "Hot tub",
+    "Workspace",
+    "TV",
+]
+PLACES = [
+    ("Lisbon", "Portugal"),
+    ("Porto", "Portugal"),
+    ("Madrid", "Spain"),
+    ("Barcelona", "Spain"),
+    ("Paris", "France"),
+    ("Lyon", "France"),
+    ("Berlin", "Germany"),
+    ("Rome", "Italy"),
+    ("New York", "United States"),
+    ("Austin", "United States"),
+    ("Sao Paulo", "Brazil"),
+    ("Rio de Janeiro", "Brazil"),
+    ("Tokyo", "Japan"),
+    ("Sydney", "Australia"),
+]
+ADJECTIVES = ["Cozy", "Bright", "Modern", "Rustic", "Quiet", "Spacious", "Charming"]
+KINDS = ["apartment", "loft", "cottage", "villa", "studio", "cabin", "house"]
+STREETS = ["Main St", "Oak Ave", "Rua Augusta", "Calle Mayor", "Harbour Rd"]
+COMMENTS = [
+    "Great stay, would book again.",
+    "Exactly like the photos.",
+    "Host was very responsive.",
+    "A bit noisy at night but good location.",
+    "",
+]
+
+
+def base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    out = ""
+    while True:
+        number, rest = divmod(number, 36)
+        out = digits[rest] + out
+        if not number:
+            return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a realistic synthetic dataset (users, useraccounts, properties, "
+        "bookings and reviews) for load tests and benchmarks. Properties, bookings "
+        "and reviews are streamed in with COPY, users with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--properties", type=int, default=10_000)
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=None,
+            help="Defaults to one user per ten properties.",
+        )
+        parser.add_argument("--useraccounts-per-user", type=int, default=1)
+        parser.add_argument("--bookings-per-property", type=int, default=3)
+        parser.add_argument("--reviews-per-property", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        n_properties = options["properties"]
+        n_users = options["users"] or max(n_properties // 10, 1)
+        batch_size = options["batch_size"]
+        if n_properties < 0 or n_users < 1 or batch_size < 1:
+            raise CommandError("Counts must be positive.")
+        if options["reviews_per_property"] > n_users:
+            raise CommandError("Need at least as many users as reviews per property.")
+
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+
+        categories, amenities = self.create_lookups()
+        user_ids = self.create_users(n_users, batch_size)
+        self.create_useraccounts(user_ids, options["useraccounts_per_user"], batch_size)
+
+        created = 0
+        while created < n_properties:
+            size = min(batch_size, n_properties - created)
+            with transaction.atomic():
+                property_ids = self.create_properties(
+                    size, user_ids, categories, amenities
+                )
+                self.create_bookings(property_ids, user_ids, options)
+                self.create_reviews(property_ids, user_ids, options)
+                Property.objects.filter(id__in=[pk for pk, _ in property_ids]).update(
+                    search_vector=property_search_vector()
+                )
+            created += size
+            self.stdout.write(f"  properties: {created}/{n_properties}")
+
+        with connection.cursor() as cursor:
+            for model in (Property, Booking, Review, Useraccount):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+        self.stdout.write(self.style.SUCCESS("Synthetic dataset generated."))
+
+    # ------------------------------
+    # Lookup tables & users
+    # ------------------------------
+    def create_lookups(self):
+        for name, slug in CATEGORIES:
+            Category.objects.get_or_create(slug=slug, defaults={"name": name})
+        for name in AMENITIES:
+            if not Amenity.objects.filter(name=name).exists():
+                Amenity.objects.create(name=name)
+        return (
+            list(Category.objects.values_list("id", flat=True)),
+            list(Amenity.objects.values_list("id", flat=True)),
+        )
+
+    def create_users(self, count, batch_size):
+        User = get_user_model()
+        # Hashing is deliberately slow, so every synthetic user shares one hash.
+        password = make_password("synthetic-password")
+        start = (User.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+        tag = base36(self.random.getrandbits(32))
+
+        ids = []
+        for offset in range(0, count, batch_size):
+            users = [
+                User(
+                    username=f"syn_{tag}_{start + i}",
+                    email=f"syn_{tag}_{start + i}@example.com",
+                    password=password,
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            ids.extend(u.id for u in User.objects.bulk_create(users))
+        self.stdout.write(f"  users: {len(ids)}")
+        return ids
+
+    def create_useraccounts(self, user_ids, per_user, batch_size):
+        start = (Useraccount.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+        batch = []
+        total = 0
+        for user_id in user_ids:
+            for _ in range(per_user):
+                number = start + total
+                batch.append(
+                    Useraccount(
+                        # "s" + base36 keeps ids unique and within max_length=10
+                        useraccount_id="s" + base36(number).rjust(9, "0"),
+                        name=f"Branch {number}",
+                        creator_id=user_id,
+                    )
+                )
+                total += 1
+                if len(batch) >= batch_size:
+                    Useraccount.objects.bulk_create(batch)
+                    batch = []
+        Useraccount.objects.bulk_create(batch)
+        self.stdout.write(f"  useraccounts: {total}")
+
+    # ------------------------------
+    # COPY-loaded tables
+    # ------------------------------
+    def create_properties(self, count, user_ids, categories, amenities):
+        """COPY one batch of properties and return their (id, price) pairs."""
+        rnd = self.random
+        first_id = (Property.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+
+        def rows():
+            for _ in range(count):
+                city, country = rnd.choice(PLACES)
+                kind = rnd.choice(KINDS)
+                bedrooms = rnd.randint(1, 5)
+                yield (
+                    rnd.choice(user_ids),
+                    f"{rnd.choice(ADJECTIVES)} {kind} in {city}",
+                    f"A {kind} with {bedrooms} bedrooms close to the centre of {city}.",
+                    f"{rnd.randint(1, 999)} {rnd.choice(STREETS)}",
+                    city,
+                    country,
+                    Decimal(rnd.randint(3_000, 60_000)) / 100,
+                    Decimal(rnd.choice([0, 20, 35, 50])),
+                    rnd.choice([5, 10, 12, 15]),
+                    bedrooms * 2,
+                    bedrooms,
+                    rnd.randint(1, 3),
+                    rnd.choice(categories) if categories else None,
+                    "property_images/placeholder.jpg",
+                    rnd.random() > 0.05,
+                    self.now,
+                    self.now,
+                )
+
+        copy_from_rows(
+            Property._meta.db_table,
+            [
+                "owner_id",
+                "title",
+                "description",
+                "address",
+                "city",
+                "country",
+                "price_per_night",
+                "cleaning_fee",
+                "service_fee_percent",
+                "num_guests",
+                "num_bedrooms",
+                "num_bathrooms",
+                "category_id",
+                "main_image",
+                "is_active",
+                "created_at",
+                "updated_at",
+            ],
+            rows(),
+        )
+        property_ids = list(
+            Property.objects.filter(id__gte=first_id)
+            .order_by("id")
+            .values_list("id", "price_per_night")
+        )
+
+        if amenities:
+            through = Property.amenities.through
+            copy_from_rows(
+                through._meta.db_table,
+                ["property_id", "amenity_id"],
+                (
+                    (pk, amenity_id)
+                    for pk, _ in property_ids
+                    for amenity_id in rnd.sample(
+                        amenities, rnd.randint(1, min(len(amenities), 6))
+                    )
+                ),
+            )
+        return property_ids
+
+    def create_bookings(self, property_ids, user_ids, options):
+        rnd = self.random
+        per_property = options["bookings_per_property"]
+        today = date.today()
+
+        def rows():
+            for pk, price in property_ids:
+                # Consecutive, non-overlapping stays around today.
+                start = today - timedelta(days=rnd.randint(0, 180))
+                for _ in range(per_property):
+                    start += timedelta(days=rnd.randint(1, 30))
+                    nights = rnd.randint(1, 14)
+                    end = start + timedelta(days=nights)
+                    yield (
+                        pk,
+                        rnd.choice(user_ids),
+                        start,
+                        end,
+                        price * nights,
+                        self.now,
+                    )
+                    start = end
+
+        copy_from_rows(
+            Booking._meta.db_table,
+            [
+                "property_id",
+                "guest_id",
+                "start_date",
+                "end_date",
+                "total_price",
+                "created_at",
+            ],
+            rows(),
+        )
+
+    def create_reviews(self, property_ids, user_ids, options):
+        rnd = self.random
+        per_property = options["reviews_per_property"]
+
+        def rows():
+            for pk, _ in property_ids:
+                for author_id in rnd.sample(user_ids, per_property):
+                    yield (
+                        pk,
+                        author_id,
+                        rnd.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 8, 12])[0],
+                        rnd.choice(COMMENTS),
+                        self.now,
+                    )
+
+        copy_from_rows(
+            Review._meta.db_table,
+            ["property_id", "author_id", "rating", "comment", "created_at"],
+            rows(),
+        )
+        recount_ratings(pk for pk, _ in property_ids)
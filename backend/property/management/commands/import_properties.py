@@ -0,0 +1,64 @@
+import csv
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from property.imports import BATCH_SIZE, import_properties
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import listings from a CSV, JSON (a list of rows) or NDJSON "
+        "file. Rows may name an `owner` username; --owner covers the rest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--owner", help="Username owning rows without one.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and resolve every row, then roll back.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        owner_id = None
+        if options["owner"]:
+            User = get_user_model()
+            try:
+                owner_id = User.objects.get(username=options["owner"]).pk
+            except User.DoesNotExist:
+                raise CommandError(f"No user {options['owner']!r}.")
+
+        with path.open(encoding="utf-8-sig", newline="") as source:
+            result = import_properties(
+                self.rows(path, source),
+                owner_id=owner_id,
+                allow_owner_column=True,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+
+        for error in result.error_list():
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {result.created} listings")
+            + f", {len(result.errors)} rows rejected."
+        )
+
+    def rows(self, path, source):
+        if path.suffix == ".csv":
+            return csv.DictReader(source)
+        if path.suffix in (".ndjson", ".jsonl"):
+            return (json.loads(line) for line in source if line.strip())
+        if path.suffix == ".json":
+            return json.load(source)
+        raise CommandError("Expected a .csv, .json or .ndjson file.")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from property.rollups import rollup_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the DailyOccupancy rollup with bookings changed since the last "
+        "run (run nightly, or more often). --full rebuilds it from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rebuild everything.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = rollup_bookings(full=options["full"], batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Rebuilt' if result.full else 'Updated'} {result.nights} nights "
+                f"from {result.bookings} bookings in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
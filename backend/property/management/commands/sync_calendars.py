@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from property.ical import sync_feed
+from property.models import CalendarFeed
+
+
+class Command(BaseCommand):
+    help = (
+        "Import external iCal feeds as blocked dates. Meant to run on a "
+        "schedule; only events that changed since the last sync are written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--feed", type=int, action="append", help="Feed id(s).")
+        parser.add_argument("--property", type=int, help="Only this property's feeds.")
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=0,
+            help="Skip feeds synced within this many minutes.",
+        )
+
+    def handle(self, *args, **options):
+        feeds = CalendarFeed.objects.filter(is_active=True).select_related("property")
+        if options["feed"]:
+            feeds = feeds.filter(pk__in=options["feed"])
+        if options["property"]:
+            feeds = feeds.filter(property_id=options["property"])
+        if options["stale_minutes"]:
+            cutoff = timezone.now() - timedelta(minutes=options["stale_minutes"])
+            feeds = feeds.filter(
+                Q(last_synced_at__isnull=True) | Q(last_synced_at__lt=cutoff)
+            )
+
+        failed = 0
+        for feed in feeds.order_by("id"):
+            try:
+                result = sync_feed(feed)
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"feed {feed.pk}: {exc}")
+                continue
+            if result.not_modified:
+                self.stdout.write(f"feed {feed.pk}: not modified")
+            else:
+                self.stdout.write(
+                    f"feed {feed.pk}: +{result.created} ~{result.updated} "
+                    f"-{result.deleted}"
+                )
+        if failed:
+            self.stderr.write(self.style.WARNING(f"{failed} feed(s) failed."))
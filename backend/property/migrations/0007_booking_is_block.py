@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("property", "0006_property_property_search_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="is_block",
+            field=models.BooleanField(
+                default=False,
+                help_text="Dates the owner blocked (maintenance, another calendar), not a stay.",
+            ),
+        ),
+    ]
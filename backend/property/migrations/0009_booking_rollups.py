@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:29
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("property", "0008_calendar_feeds"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("watermark", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_default=django.db.models.functions.datetime.Now(),
+            ),
+        ),
+        migrations.CreateModel(
+            name="DailyOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("is_block", models.BooleanField(default=False)),
+                ("revenue", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_occupancy",
+                        to="property.booking",
+                    ),
+                ),
+                (
+                    "property",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_occupancy",
+                        to="property.property",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily occupancy",
+                "indexes": [
+                    models.Index(
+                        fields=["property", "date"], name="occupancy_property_date"
+                    ),
+                    models.Index(fields=["date"], name="occupancy_date"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("booking", "date"), name="unique_booking_night"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so the tables stay writable; that can't run in a
+    # transaction.
+    atomic = False
+
+    dependencies = [
+        ("property", "0010_price_rules"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(fields=["start_date"], name="booking_start_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(fields=["end_date"], name="booking_end_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="booking_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="property",
+            index=models.Index(fields=["city"], name="property_city_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="property",
+            index=models.Index(fields=["country"], name="property_country_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="property",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="property_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="review",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="review_created_idx"
+            ),
+        ),
+    ]
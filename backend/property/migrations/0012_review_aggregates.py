@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:57
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # For the concurrent index build, so each operation commits on its own
+    atomic = False
+
+    dependencies = [
+        ("property", "0011_admin_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="rating_sum",
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="review_count",
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(
+                fields=["guest", "property", "end_date"], name="booking_guest_stay_idx"
+            ),
+        ),
+        # Backfill the aggregates from the existing reviews
+        migrations.RunSQL(
+            """
+            UPDATE property_property p
+            SET review_count = r.n, rating_sum = r.total
+            FROM (
+                SELECT property_id, count(*) AS n, sum(rating) AS total
+                FROM property_review GROUP BY property_id
+            ) r
+            WHERE p.id = r.property_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
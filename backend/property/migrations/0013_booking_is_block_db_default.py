@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("property", "0012_review_aggregates"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="booking",
+            name="is_block",
+            field=models.BooleanField(
+                db_default=False,
+                default=False,
+                help_text="Dates the owner blocked (maintenance, another calendar), not a stay.",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("property", "0013_booking_is_block_db_default"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="booking",
+            name="external_uid",
+            field=models.CharField(blank=True, db_default="", max_length=255),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:35
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built concurrently so bookings stay writable; that can't run in a
+    # transaction.
+    atomic = False
+
+    dependencies = [
+        ("property", "0014_booking_external_uid_db_default"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="booking",
+            index=models.Index(fields=["updated_at"], name="booking_updated_idx"),
+        ),
+        # Databases that ran 0009 when it still indexed the column inline
+        migrations.RunSQL(
+            "DROP INDEX CONCURRENTLY IF EXISTS property_booking_updated_at_370f5e02",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
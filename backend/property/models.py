@@ -2,9 +2,11 @@ from django.contrib.postgres.search import SearchVectorField
 from django.contrib.postgres.indexes import GinIndex
 
 from django.db import models
+from django.db.models.functions import Now
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from PIL import Image
+
+from .pricing import quote_stay
 
 
 # ------------------------------
@@ -15,6 +17,8 @@ def validate_image(image):
     if image.size > max_size:
         raise ValidationError("The image file is too large. Maximum size is 2 MB.")
 
+    from PIL import Image  # imported here, not at startup
+
     try:
         img = Image.open(image)
         if img.format not in ["JPEG", "PNG"]:
@@ -64,6 +68,11 @@ class Property(models.Model):
     city = models.CharField(max_length=100)
     country = models.CharField(max_length=100)
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+    # Friday and Saturday nights; price_per_night when unset
+    weekend_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    min_nights = models.PositiveSmallIntegerField(default=1, db_default=1)
     cleaning_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     service_fee_percent = models.PositiveIntegerField(
         default=10, help_text="Service fee as a percentage (e.g., 10 for 10%)"
@@ -84,6 +93,9 @@ class Property(models.Model):
         help_text="Upload a JPEG or PNG image (max 2MB)",
     )
     is_active = models.BooleanField(default=True)
+    # Rating aggregates, kept up to date by property/reviews.py
+    review_count = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, db_default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -92,11 +104,21 @@ class Property(models.Model):
         # 2. ADD THIS INDEXES OPTION
         indexes = [
             GinIndex(fields=["search_vector"], name="property_search_idx"),
+            # Admin filters, and its default ordering with the pk tiebreaker
+            models.Index(fields=["city"], name="property_city_idx"),
+            models.Index(fields=["country"], name="property_country_idx"),
+            models.Index(fields=["-created_at", "-id"], name="property_created_idx"),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.city}, {self.country})"
 
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
 
 # ------------------------------
 # Models for gallery, bookings, and reviews
@@ -123,7 +145,45 @@ class Booking(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    is_block = models.BooleanField(
+        default=False,
+        db_default=False,
+        help_text="Dates the owner blocked (maintenance, another calendar), not a stay.",
+    )
+    # Set on blocks imported from an external calendar (see property/ical.py)
+    feed = models.ForeignKey(
+        "CalendarFeed",
+        related_name="bookings",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    external_uid = models.CharField(max_length=255, blank=True, db_default="")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Watermark for the analytics rollup (see property/rollups.py); writers
+    # that skip save() must set it themselves.
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["feed", "external_uid"],
+                condition=models.Q(feed__isnull=False),
+                name="unique_feed_event",
+            ),
+        ]
+        indexes = [
+            # Admin filters, and its default ordering with the pk tiebreaker
+            models.Index(fields=["start_date"], name="booking_start_idx"),
+            models.Index(fields=["end_date"], name="booking_end_idx"),
+            models.Index(fields=["-created_at", "-id"], name="booking_created_idx"),
+            # Bookings changed since the rollup's watermark
+            models.Index(fields=["updated_at"], name="booking_updated_idx"),
+            # Whether a guest has stayed at a property (reviews)
+            models.Index(
+                fields=["guest", "property", "end_date"], name="booking_guest_stay_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Booking for {self.property.title} by {self.guest.username}"
@@ -131,11 +191,15 @@ class Booking(models.Model):
     # ADD THIS METHOD
     def save(self, *args, **kwargs):
         # Calculate the number of nights
-        if self.start_date and self.end_date and self.property:
+        if self.is_block:
+            self.total_price = 0
+        elif self.start_date and self.end_date and self.property:
             nights = (self.end_date - self.start_date).days
             if nights > 0:
-                # Calculate and set the total price
-                self.total_price = nights * self.property.price_per_night
+                # Price the stay night by night, honouring price rules
+                self.total_price = quote_stay(
+                    self.property, self.start_date, self.end_date
+                ).total
 
         # Call the original save method to save the object to the database
         super().save(*args, **kwargs)
@@ -157,6 +221,127 @@ class Review(models.Model):
             "property",
             "author",
         )  # A user can only write one review per property
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="review_created_idx"),
+        ]
 
     def __str__(self):
         return f"Review for {self.property.title} by {self.author.username}"
+
+
+# ------------------------------
+# Dynamic pricing
+# ------------------------------
+class PriceRule(models.Model):
+    """
+    A nightly rate for a date range: a season, or a single date such as a
+    holiday. Where rules overlap the highest priority wins. See
+    property/pricing.py.
+    """
+
+    property = models.ForeignKey(
+        Property, related_name="price_rules", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=100, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField(help_text="First night the rule no longer applies.")
+    price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
+    weekend_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    min_nights = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="For stays that start within the rule."
+    )
+    priority = models.IntegerField(
+        default=0, help_text="Higher wins; give one-off dates more than seasons."
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__gt=models.F("start_date")),
+                name="price_rule_end_after_start",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["property", "start_date", "end_date"],
+                name="price_rule_property_dates",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name or f"{self.start_date} – {self.end_date}"
+
+
+# ------------------------------
+# External calendars
+# ------------------------------
+class CalendarFeed(models.Model):
+    """An external iCal feed whose events block dates on a property."""
+
+    property = models.ForeignKey(
+        Property, related_name="calendar_feeds", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=100, blank=True)
+    url = models.CharField(
+        max_length=500, help_text="An http(s):// or file:// URL of an .ics feed."
+    )
+    is_active = models.BooleanField(default=True)
+    # HTTP validators from the last fetch, so unchanged feeds cost a 304
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name or self.url
+
+
+# ------------------------------
+# Analytics rollups
+# ------------------------------
+class DailyOccupancy(models.Model):
+    """
+    One row per booked (or blocked) night, maintained incrementally by the
+    ``rollup_bookings`` command. Reports read day ranges from here instead
+    of expanding every booking's dates.
+    """
+
+    property = models.ForeignKey(
+        Property, related_name="daily_occupancy", on_delete=models.CASCADE
+    )
+    booking = models.ForeignKey(
+        Booking, related_name="daily_occupancy", on_delete=models.CASCADE
+    )
+    date = models.DateField()
+    is_block = models.BooleanField(default=False)
+    # The booking's total spread over its nights; sums back to total_price
+    revenue = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["booking", "date"], name="unique_booking_night"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["property", "date"], name="occupancy_property_date"),
+            models.Index(fields=["date"], name="occupancy_date"),
+        ]
+        verbose_name_plural = "daily occupancy"
+
+    def __str__(self):
+        return f"{self.property_id} on {self.date}"
+
+
+class RollupWatermark(models.Model):
+    """How far each rollup has processed its source rows."""
+
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
@@ -0,0 +1,127 @@
+"""
+Stay pricing with seasonal and per-date rules.
+
+A listing has a base nightly rate, an optional weekend rate (Friday and
+Saturday nights) and a minimum stay. ``PriceRule`` rows override all three
+for a date range. A stay is split into segments, each priced by one rule
+or by the base rates, and each segment is totalled in constant time by
+counting its weekend nights arithmetically. So pricing costs O(number of
+segments), however long the stay.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from itertools import pairwise
+
+WEEKEND = frozenset({4, 5})  # date.weekday() of Friday and Saturday nights
+
+
+def count_weekend_nights(start, end):
+    """Friday and Saturday nights in ``[start, end)``."""
+    full_weeks, rest = divmod((end - start).days, 7)
+    first = start.weekday()
+    return full_weeks * len(WEEKEND) + sum(
+        1 for offset in range(rest) if (first + offset) % 7 in WEEKEND
+    )
+
+
+@dataclass
+class Segment:
+    start: date
+    end: date
+    price_per_night: Decimal
+    weekend_price: Decimal
+    rule_id: int | None = None
+
+    @property
+    def nights(self):
+        return (self.end - self.start).days
+
+    @property
+    def total(self):
+        weekend = count_weekend_nights(self.start, self.end)
+        return (
+            self.nights - weekend
+        ) * self.price_per_night + weekend * self.weekend_price
+
+
+@dataclass
+class Quote:
+    start: date
+    end: date
+    min_nights: int
+    segments: list = field(default_factory=list)
+
+    @property
+    def nights(self):
+        return (self.end - self.start).days
+
+    @property
+    def total(self):
+        return sum((segment.total for segment in self.segments), Decimal(0))
+
+    @property
+    def meets_min_nights(self):
+        return self.nights >= self.min_nights
+
+
+def _base_segment(prop, start, end):
+    return Segment(
+        start,
+        end,
+        prop.price_per_night,
+        prop.weekend_price or prop.price_per_night,
+    )
+
+
+def _rule_segment(rule, start, end):
+    return Segment(
+        start,
+        end,
+        rule.price_per_night,
+        rule.weekend_price or rule.price_per_night,
+        rule.pk,
+    )
+
+
+def quote_stay(prop, start, end, rules=None):
+    """
+    Price the nights ``[start, end)`` at ``prop``. ``rules`` are the
+    listing's price rules, at least those overlapping the stay; they are
+    queried when not given.
+    """
+    if rules is None:
+        rules = (
+            prop.price_rules.filter(start_date__lt=end, end_date__gt=start)
+            if prop.pk
+            else []
+        )
+    rules = sorted(
+        (rule for rule in rules if rule.start_date < end and rule.end_date > start),
+        key=lambda rule: (-rule.priority, -(rule.pk or 0)),
+    )
+
+    # Every rule edge inside the stay starts a new segment.
+    bounds = {start, end}
+    for rule in rules:
+        bounds.update(
+            day for day in (rule.start_date, rule.end_date) if start < day < end
+        )
+
+    quote = Quote(start, end, prop.min_nights)
+    for seg_start, seg_end in pairwise(sorted(bounds)):
+        rule = next(
+            (r for r in rules if r.start_date <= seg_start and r.end_date >= seg_end),
+            None,
+        )
+        last = quote.segments[-1] if quote.segments else None
+        if last is not None and last.rule_id == (rule and rule.pk):
+            last.end = seg_end  # the same rate carries on
+        elif rule is None:
+            quote.segments.append(_base_segment(prop, seg_start, seg_end))
+        else:
+            quote.segments.append(_rule_segment(rule, seg_start, seg_end))
+        if seg_start == start and rule is not None and rule.min_nights:
+            quote.min_nights = rule.min_nights  # the check-in night's rule
+    return quote
@@ -0,0 +1,91 @@
+"""
+Review writes and the rating aggregates kept on ``Property``.
+
+``review_count`` and ``rating_sum`` let listings show an average rating
+without aggregating reviews. A review is written with ``upsert_review``:
+one ``INSERT ... ON CONFLICT`` statement that creates or replaces the
+author's review of the property and adjusts the aggregates with the
+difference. The property row is locked first, so concurrent reviews of
+one property apply one after the other and each sees the last's result.
+
+Writes through the ORM (admin edits, deletes, cascades) recount the
+property instead; see the receivers in property/signals.py.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Booking, Property, Review
+
+PROPERTY_TABLE = Property._meta.db_table
+REVIEW_TABLE = Review._meta.db_table
+
+UPSERT_SQL = f"""
+    WITH previous AS (
+        SELECT rating FROM {REVIEW_TABLE}
+        WHERE property_id = %(property)s AND author_id = %(author)s
+    ), review AS (
+        INSERT INTO {REVIEW_TABLE} AS r
+            (property_id, author_id, rating, comment, created_at)
+        VALUES (%(property)s, %(author)s, %(rating)s, %(comment)s, %(now)s)
+        ON CONFLICT (property_id, author_id) DO UPDATE
+            SET rating = EXCLUDED.rating, comment = EXCLUDED.comment
+        RETURNING r.id, r.rating, (r.xmax = 0) AS created
+    )
+    UPDATE {PROPERTY_TABLE} p
+    SET review_count = p.review_count + CASE WHEN review.created THEN 1 ELSE 0 END,
+        rating_sum = p.rating_sum + review.rating
+            - COALESCE((SELECT rating FROM previous), 0)
+    FROM review
+    WHERE p.id = %(property)s
+    RETURNING review.id, review.created
+"""
+
+RECOUNT_SQL = f"""
+    UPDATE {PROPERTY_TABLE} p
+    SET review_count = (SELECT count(*) FROM {REVIEW_TABLE} WHERE property_id = p.id),
+        rating_sum = (
+            SELECT COALESCE(sum(rating), 0) FROM {REVIEW_TABLE}
+            WHERE property_id = p.id
+        )
+"""
+
+
+def has_completed_stay(user_id, property_id, today=None):
+    """Whether the user has a booking there that has ended; one index probe."""
+    return Booking.objects.filter(
+        guest_id=user_id,
+        property_id=property_id,
+        end_date__lte=today or timezone.localdate(),
+        is_block=False,
+    ).exists()
+
+
+def upsert_review(property_id, author_id, rating, comment=""):
+    """
+    Create or replace ``author_id``'s review of ``property_id``. Returns
+    ``(review id, created)``; the property must exist.
+    """
+    with transaction.atomic():
+        Property.objects.select_for_update().filter(pk=property_id).exists()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                UPSERT_SQL,
+                {
+                    "property": property_id,
+                    "author": author_id,
+                    "rating": rating,
+                    "comment": comment,
+                    "now": timezone.now(),
+                },
+            )
+            return cursor.fetchone()
+
+
+def recount_ratings(property_ids=None):
+    """Recompute the aggregates of ``property_ids``, or of every property."""
+    with connection.cursor() as cursor:
+        if property_ids is None:
+            cursor.execute(RECOUNT_SQL)
+        else:
+            cursor.execute(f"{RECOUNT_SQL} WHERE p.id = ANY(%s)", [list(property_ids)])
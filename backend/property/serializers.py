@@ -1,48 +1,67 @@
 from rest_framework import serializers
+from django_backend.metrics import InstrumentedSerializerMixin
 from .models import (
     Property,
+    CalendarFeed,
+    PriceRule,
     Category,
     Amenity,
     PropertyImage,
     Booking,
     Review,
 )
+import posixpath
 from datetime import timedelta
+from . import lookups
+from .ical import check_feed_url
+from .lookups import CachedPrimaryKeyRelatedField
+from .pricing import quote_stay
 
 
 # --- Amenity ---
-class AmenitySerializer(serializers.ModelSerializer):
+class AmenitySerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Amenity
         fields = ["id", "name"]
 
 
 # --- Category ---
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "slug"]
 
 
 # --- Property Images ---
-class PropertyImageSerializer(serializers.ModelSerializer):
+class PropertyImageSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = PropertyImage
         fields = ["id", "image"]
 
 
 # --- Reviews ---
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source="author.username")
     rating = serializers.IntegerField(min_value=1, max_value=5)
+    # Needed to create through /reviews/; the nested endpoint takes the URL's
+    property_id = serializers.PrimaryKeyRelatedField(
+        queryset=Property.objects.filter(is_active=True),
+        source="property",
+        write_only=True,
+        required=False,
+    )
 
     class Meta:
         model = Review
-        fields = ["id", "rating", "comment", "author", "created_at"]
+        fields = ["id", "rating", "comment", "author", "created_at", "property_id"]
+
+    def update(self, instance, validated_data):
+        validated_data.pop("property", None)  # a review stays on its property
+        return super().update(instance, validated_data)
 
 
 # --- Property List Serializer ---
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     """A serializer for the list view of properties (summary)."""
 
     owner = serializers.ReadOnlyField(source="owner.username")
@@ -57,11 +76,15 @@ class PropertyListSerializer(serializers.ModelSerializer):
             "price_per_night",
             "main_image",
             "owner",
+            "review_count",
+            "average_rating",
         ]
 
 
 # --- Property Detail Serializer (READ ONLY) ---
-class PropertyDetailSerializer(serializers.ModelSerializer):
+class PropertyDetailSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
     """For GET requests - detailed view with nested data."""
 
     owner = serializers.ReadOnlyField(source="owner.username")
@@ -69,6 +92,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     amenities = AmenitySerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     reviews = ReviewSerializer(many=True, read_only=True)
+    average_rating = serializers.ReadOnlyField()
     booked_dates = serializers.SerializerMethodField()
 
     class Meta:
@@ -88,7 +112,9 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
 
 # --- Property Create Serializer ---
 # --- Property Create Serializer ---
-class PropertyCreateSerializer(serializers.ModelSerializer):
+class PropertyCreateSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
     """For POST requests - creating new properties with gallery images."""
 
     # Accept list of image files
@@ -99,15 +125,13 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
         allow_empty=True,
     )
 
-    # Accept list of amenity IDs
-    amenities = serializers.PrimaryKeyRelatedField(
-        queryset=Amenity.objects.all(), many=True, required=False
+    # Accept list of amenity IDs (validated against the cached table)
+    amenities = CachedPrimaryKeyRelatedField(
+        table=lookups.amenities, many=True, required=False
     )
 
     # Accept category ID
-    category = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(), required=True
-    )
+    category = CachedPrimaryKeyRelatedField(table=lookups.categories, required=True)
 
     class Meta:
         model = Property
@@ -118,6 +142,8 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
             "city",
             "country",
             "price_per_night",
+            "weekend_price",
+            "min_nights",
             "cleaning_fee",
             "service_fee_percent",
             "num_guests",
@@ -135,7 +161,7 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
         amenities = validated_data.pop("amenities", [])
 
         # Set the owner from request context
-        validated_data["owner"] = self.context["request"].user
+        validated_data["owner_id"] = self.context["request"].user.id
 
         # Create the property
         property_instance = Property.objects.create(**validated_data)
@@ -155,7 +181,9 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
 
 
 # --- Property Update Serializer ---
-class PropertyUpdateSerializer(serializers.ModelSerializer):
+class PropertyUpdateSerializer(
+    InstrumentedSerializerMixin, serializers.ModelSerializer
+):
     """For PUT/PATCH requests - updating existing properties."""
 
     # Optional list of new image files to add
@@ -174,13 +202,11 @@ class PropertyUpdateSerializer(serializers.ModelSerializer):
         allow_empty=True,
     )
 
-    amenities = serializers.PrimaryKeyRelatedField(
-        queryset=Amenity.objects.all(), many=True, required=False
+    amenities = CachedPrimaryKeyRelatedField(
+        table=lookups.amenities, many=True, required=False
     )
 
-    category = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(), required=False
-    )
+    category = CachedPrimaryKeyRelatedField(table=lookups.categories, required=False)
 
     class Meta:
         model = Property
@@ -191,6 +217,8 @@ class PropertyUpdateSerializer(serializers.ModelSerializer):
             "city",
             "country",
             "price_per_night",
+            "weekend_price",
+            "min_nights",
             "cleaning_fee",
             "service_fee_percent",
             "num_guests",
@@ -236,7 +264,7 @@ class PropertyUpdateSerializer(serializers.ModelSerializer):
         instance = self.instance
         request = self.context.get("request")
 
-        if instance and request and instance.owner != request.user:
+        if instance and request and instance.owner_id != request.user.id:
             raise serializers.ValidationError(
                 "You do not have permission to update this property."
             )
@@ -248,8 +276,103 @@ class PropertyUpdateSerializer(serializers.ModelSerializer):
         return PropertyDetailSerializer(instance, context=self.context).data
 
 
+# --- Price Rule Serializer ---
+class PriceRuleSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = PriceRule
+        fields = [
+            "id",
+            "property",
+            "name",
+            "start_date",
+            "end_date",
+            "price_per_night",
+            "weekend_price",
+            "min_nights",
+            "priority",
+        ]
+
+    def validate_property(self, value):
+        request = self.context.get("request")
+        if request and value.owner_id != request.user.id:
+            raise serializers.ValidationError("You can only price your own properties.")
+        return value
+
+    def validate(self, data):
+        start = data.get("start_date", getattr(self.instance, "start_date", None))
+        end = data.get("end_date", getattr(self.instance, "end_date", None))
+        if start and end and start >= end:
+            raise serializers.ValidationError("End date must be after start date.")
+        return data
+
+
+# --- Stay Quote Serializer ---
+class QuoteSegmentSerializer(serializers.Serializer):
+    start_date = serializers.DateField(source="start")
+    end_date = serializers.DateField(source="end")
+    nights = serializers.IntegerField()
+    price_per_night = serializers.DecimalField(max_digits=10, decimal_places=2)
+    weekend_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class QuoteSerializer(serializers.Serializer):
+    start_date = serializers.DateField(source="start")
+    end_date = serializers.DateField(source="end")
+    nights = serializers.IntegerField()
+    min_nights = serializers.IntegerField()
+    meets_min_nights = serializers.BooleanField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    segments = QuoteSegmentSerializer(many=True)
+
+
+# --- Property Import Row Serializer ---
+class PropertyImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk import (see property/imports.py). Category slugs,
+    amenity names and owner usernames are resolved in bulk afterwards, so
+    nothing here touches the database.
+    """
+
+    owner = serializers.CharField(max_length=150, required=False)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, required=False, default="")
+    address = serializers.CharField(max_length=255)
+    city = serializers.CharField(max_length=100)
+    country = serializers.CharField(max_length=100)
+    price_per_night = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0
+    )
+    cleaning_fee = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, default=0
+    )
+    service_fee_percent = serializers.IntegerField(min_value=0, default=10)
+    num_guests = serializers.IntegerField(min_value=1, default=1)
+    num_bedrooms = serializers.IntegerField(min_value=0, default=1)
+    num_bathrooms = serializers.IntegerField(min_value=0, default=1)
+    category = serializers.SlugField(max_length=50)
+    amenities = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, default=list
+    )
+    # A path in media storage; images themselves aren't uploaded in bulk.
+    # That it isn't another listing's image is checked against the table.
+    main_image = serializers.CharField(max_length=100)
+    is_active = serializers.BooleanField(default=True)
+
+    def validate_main_image(self, value):
+        """Only files directly in the listing images' upload directory."""
+        upload_to = Property._meta.get_field("main_image").upload_to
+        if posixpath.normpath(value) != value or posixpath.dirname(
+            value
+        ) != upload_to.rstrip("/"):
+            raise serializers.ValidationError(
+                f"Must be an image path in {upload_to}, e.g. {upload_to}cabin.jpg."
+            )
+        return value
+
+
 # --- Booking Serializer ---
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     guest = serializers.ReadOnlyField(source="guest.username")
     property_title = serializers.ReadOnlyField(source="property.title")
     property_id = serializers.PrimaryKeyRelatedField(
@@ -265,8 +388,12 @@ class BookingSerializer(serializers.ModelSerializer):
             "start_date",
             "end_date",
             "total_price",
+            "is_block",
             "property_id",
         ]
+        # Computed from the nightly price in Booking.save(); blocks are
+        # created through the bulk endpoint.
+        read_only_fields = ["total_price", "is_block"]
 
     def validate(self, data):
         """Validate that start < end and that the property is not already booked."""
@@ -290,4 +417,60 @@ class BookingSerializer(serializers.ModelSerializer):
                 "This property is already booked for the selected dates."
             )
 
+        quote = quote_stay(property_instance, start_date, end_date)
+        if not quote.meets_min_nights:
+            raise serializers.ValidationError(
+                f"This property requires at least {quote.min_nights} nights "
+                "for these dates."
+            )
+
         return data
+
+
+# --- Bulk Booking Serializers ---
+class BulkBookingItemSerializer(serializers.Serializer):
+    property_id = serializers.IntegerField(source="property")
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    block = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data["start_date"] >= data["end_date"]:
+            raise serializers.ValidationError("End date must be after start date.")
+        return data
+
+
+class BulkBookingSerializer(serializers.Serializer):
+    """Payload of the bulk endpoint; see property/bulk_bookings.py."""
+
+    items = BulkBookingItemSerializer(many=True, allow_empty=False, max_length=500)
+
+
+# --- Calendar Feed Serializer ---
+class CalendarFeedSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = CalendarFeed
+        fields = [
+            "id",
+            "property",
+            "name",
+            "url",
+            "is_active",
+            "last_synced_at",
+            "last_error",
+        ]
+        read_only_fields = ["last_synced_at", "last_error"]
+
+    def validate_property(self, value):
+        request = self.context.get("request")
+        if request and value.owner_id != request.user.id:
+            raise serializers.ValidationError("You can only sync your own properties.")
+        return value
+
+    def validate_url(self, value):
+        # file:// feeds are for local tooling; staff set those in the admin.
+        try:
+            check_feed_url(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc)) from None
+        return value
@@ -1,9 +1,25 @@
 # In property/signals.py
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.postgres.search import SearchVector
-from .models import Property
+from .ical import bump_calendar_versions
+from . import lookups
+from .models import Amenity, Booking, Category, Property, Review
+from .reviews import recount_ratings
+
+
+def property_search_vector():
+    """The weighted search vector expression shared by every writer."""
+    return (
+        # THE CHANGE IS HERE: City and Country are now 'A', Title is 'B'
+        SearchVector("title", weight="B")
+        + SearchVector("city", weight="A")
+        + SearchVector("country", weight="A")
+        + SearchVector("address", weight="C")
+        + SearchVector("description", weight="D")
+    )
 
 
 @receiver(post_save, sender=Property)
@@ -13,12 +29,37 @@ def update_property_search_vector(sender, instance, **kwargs):
     whenever it is saved.
     """
     Property.objects.filter(id=instance.id).update(
-        search_vector=(
-            # THE CHANGE IS HERE: City and Country are now 'A', Title is 'B'
-            SearchVector("title", weight="B")
-            + SearchVector("city", weight="A")
-            + SearchVector("country", weight="A")
-            + SearchVector("address", weight="C")
-            + SearchVector("description", weight="D")
-        )
+        search_vector=property_search_vector()
     )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_property_calendar(sender, instance, **kwargs):
+    """
+    Bookings changed, so the cached .ics feed is stale. The bump waits for
+    the commit, or a concurrent request could cache the old bookings under
+    the new version.
+    """
+    property_id = instance.property_id
+    transaction.on_commit(lambda: bump_calendar_versions([property_id]))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def recount_property_ratings(sender, instance, **kwargs):
+    """
+    A review changed through the ORM (the API's update and delete, the
+    admin, cascades). upsert_review keeps the aggregates itself.
+    """
+    recount_ratings([instance.property_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_lookup_table(sender, instance, **kwargs):
+    """Reload the cached table everywhere once the change is committed."""
+    table = lookups.categories if sender is Category else lookups.amenities
+    transaction.on_commit(table.bump)
@@ -1,3 +1,925 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import async_views, lookups
+from .bulk_bookings import create_bookings
+from .dashboard import owner_dashboard
+from .filters import filter_stay
+from .ical import apply_events, parse_ical
+from .models import (
+    Amenity,
+    Booking,
+    CalendarFeed,
+    Category,
+    DailyOccupancy,
+    PriceRule,
+    Property,
+    Review,
+    RollupWatermark,
+)
+from .pricing import count_weekend_nights, quote_stay
+from .reviews import recount_ratings, upsert_review
+from .rollups import OVERLAP, daily_totals, rollup_bookings, rollup_watermark
+from .serializers import CategorySerializer
+from .views import AmenityViewSet, CategoryViewSet, PropertyViewSet
+
+MONDAY = date(2030, 1, 7)
+
+# Tests clear the cache, so keep them off a shared one.
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def make_user(username, **kwargs):
+    return get_user_model().objects.create_user(
+        username=username, email=f"{username}@example.com", password="x", **kwargs
+    )
+
+
+def make_property(owner, **kwargs):
+    kwargs.setdefault("price_per_night", Decimal(100))
+    kwargs.setdefault("title", "Cabin")
+    return Property.objects.create(
+        owner=owner,
+        address="1 Lake Rd",
+        city="Oslo",
+        country="Norway",
+        main_image="property_images/cabin.jpg",
+        **kwargs,
+    )
+
+
+def render(response):
+    if hasattr(response, "render"):
+        response.render()
+    return response.status_code, json.loads(response.content)
+
+
+# ------------------------------
+# Async views
+# ------------------------------
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.guest = make_user("guest")
+        cls.category = Category.objects.create(name="Cabins")
+        cls.prop = make_property(
+            cls.owner, title="Lakeside cabin", category=cls.category
+        )
+        cls.prop.amenities.add(Amenity.objects.create(name="Sauna"))
+        make_property(cls.owner, title="City flat")
+        Booking.objects.create(
+            property=cls.prop,
+            guest=cls.guest,
+            start_date=MONDAY,
+            end_date=MONDAY + timedelta(days=2),
+            total_price=200,
+        )
+        Review.objects.create(property=cls.prop, author=cls.guest, rating=4)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    async def assertSameAsSync(self, async_view, sync_view, path, **kwargs):
+        async_response = await async_view(self.factory.get(path), **kwargs)
+        sync_response = await sync_to_async(sync_view)(self.factory.get(path), **kwargs)
+        self.assertEqual(render(async_response), render(sync_response))
+        return render(async_response)
+
+    async def test_list(self):
+        view = PropertyViewSet.as_view({"get": "list"})
+        await self.assertSameAsSync(async_views.property_list, view, "/?page=2")
+        _status, data = await self.assertSameAsSync(
+            async_views.property_list, view, "/"
+        )
+        self.assertEqual(data["count"], 2)
+
+    async def test_detail(self):
+        view = PropertyViewSet.as_view({"get": "retrieve"})
+        _status, data = await self.assertSameAsSync(
+            async_views.property_detail, view, "/", pk=self.prop.pk
+        )
+        self.assertEqual(
+            data["booked_dates"], [str(MONDAY), str(MONDAY + timedelta(days=1))]
+        )
+        response = await async_views.property_detail(self.factory.get("/"), pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    def test_detail_queries(self):
+        # The property and its four prefetches, as in PropertyViewSet.retrieve.
+        with self.assertNumQueries(5):
+            async_to_sync(async_views.property_detail)(
+                self.factory.get("/"), pk=self.prop.pk
+            )
+
+    async def test_search(self):
+        view = PropertyViewSet.as_view({"get": "search"})
+        _status, data = await self.assertSameAsSync(
+            async_views.property_search, view, "/?q=lakeside"
+        )
+        self.assertEqual([row["id"] for row in data], [self.prop.pk])
+        response = await async_views.property_search(self.factory.get("/"))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_check_availability(self):
+        view = PropertyViewSet.as_view({"get": "check_availability"})
+        for offset, available in [(1, False), (2, True)]:
+            start = MONDAY + timedelta(days=offset)
+            _status, data = await self.assertSameAsSync(
+                async_views.property_check_availability,
+                view,
+                f"/?start_date={start}&end_date={start + timedelta(days=2)}",
+                pk=self.prop.pk,
+            )
+            self.assertIs(data["is_available"], available)
+
+    async def test_lookup_lists(self):
+        await self.assertSameAsSync(
+            async_views.category_list, CategoryViewSet.as_view({"get": "list"}), "/"
+        )
+        await self.assertSameAsSync(
+            async_views.amenity_list, AmenityViewSet.as_view({"get": "list"}), "/"
+        )
+
+    @override_settings(
+        REST_FRAMEWORK={
+            "DEFAULT_THROTTLE_RATES": {"search.user": "3/min", "search.anon": "1/min"},
+            "DEFAULT_AUTHENTICATION_CLASSES": (
+                "useraccount.authentication.JWTCookieTokenUserAuthentication",
+            ),
+        }
+    )
+    async def test_search_throttle_authenticates(self):
+        token = str(AccessToken.for_user(self.guest))
+
+        async def search(cookie=None):
+            request = self.factory.get("/?q=cabin")
+            if cookie:
+                request.COOKIES["jwt-access-token"] = cookie
+            return (await async_views.property_search(request)).status_code
+
+        self.assertEqual([await search(token) for _ in range(4)], [200] * 3 + [429])
+        self.assertEqual([await search() for _ in range(2)], [200, 429])
+        # A bad token is counted against the client IP.
+        self.assertEqual(await search("garbage"), 429)
+
+
+# ------------------------------
+# Exports
+# ------------------------------
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.other = make_user("other")
+        cls.staff = make_user("staff", is_staff=True)
+        cls.prop = make_property(cls.owner, title='Cabin, "by the lake"')
+        make_property(cls.other, title="Flat")
+        for offset in (0, 40):
+            Booking.objects.create(
+                property=cls.prop,
+                guest=cls.other,
+                start_date=MONDAY + timedelta(days=offset),
+                end_date=MONDAY + timedelta(days=offset + 2),
+                total_price=0,
+            )
+
+    def export(self, user, path, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        kind, fmt = path.split(".")
+        response = client.get(reverse("export", args=[kind, fmt]), params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_is_owner_scoped(self):
+        response, body = self.export(self.owner, "properties.csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row["title"] for row in rows], ['Cabin, "by the lake"'])
+        self.assertEqual(rows[0]["owner"], "owner")
+
+    def test_ndjson_with_dates(self):
+        _response, body = self.export(
+            self.owner, "bookings.ndjson", since=str(MONDAY + timedelta(days=1))
+        )
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["start_date"], str(MONDAY + timedelta(days=40)))
+        self.assertEqual(rows[0]["total_price"], 200.0)
+        self.assertEqual(rows[0]["guest"], "other")
+
+    def test_staff_exports_everything_or_one_owner(self):
+        _response, body = self.export(self.staff, "properties.ndjson")
+        self.assertEqual(len(body.splitlines()), 2)
+        _response, body = self.export(
+            self.staff, "properties.ndjson", owner=self.other.pk
+        )
+        self.assertEqual(json.loads(body)["title"], "Flat")
+
+    def test_bad_requests(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        url = reverse("export", args=["bookings", "csv"])
+        self.assertEqual(client.get(url, {"since": "soon"}).status_code, 400)
+        url = reverse("export", args=["users", "csv"])
+        self.assertEqual(client.get(url).status_code, 404)
+        self.assertEqual(APIClient().get(url).status_code, 401)
+
+
+# ------------------------------
+# Imports
+# ------------------------------
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.staff = make_user("staff", is_staff=True)
+        Category.objects.create(name="Cabins", slug="cabins")
+        Amenity.objects.create(name="Sauna")
+        # Claims property_images/cabin.jpg
+        make_property(cls.staff)
+
+    def row(self, image, **kwargs):
+        return {
+            "title": "Lake house",
+            "address": "2 Lake Rd",
+            "city": "Oslo",
+            "country": "Norway",
+            "price_per_night": "120.00",
+            "category": "cabins",
+            "main_image": f"property_images/{image}",
+            **kwargs,
+        }
+
+    def post(self, user, data, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("property-bulk-import")
+        if params:
+            url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+        return client.post(url, data, format="json")
+
+    def test_import(self):
+        response = self.post(
+            self.owner,
+            [
+                self.row("a.jpg", amenities=["sauna"], owner="staff"),
+                self.row("b.jpg", category="castles"),
+            ],
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 2)
+        prop = Property.objects.get(main_image="property_images/a.jpg")
+        # Only staff may name another owner.
+        self.assertEqual(prop.owner, self.owner)
+        self.assertEqual([a.name for a in prop.amenities.all()], ["Sauna"])
+        self.assertTrue(Property.objects.filter(search_vector="lake").exists())
+
+    def test_staff_owner_column_and_dry_run(self):
+        self.post(self.staff, [self.row("a.jpg", owner="owner")])
+        self.assertEqual(Property.objects.get(owner=self.owner).title, "Lake house")
+        response = self.post(self.staff, [self.row("b.jpg")], dry_run="true")
+        self.assertEqual((response.status_code, response.data["created"]), (200, 1))
+        self.assertFalse(Property.objects.filter(main_image__endswith="b.jpg").exists())
+
+    def test_csv_upload(self):
+        upload = io.BytesIO(
+            b"title,address,city,country,price_per_night,category,main_image,"
+            b"amenities\nLake house,2 Lake Rd,Oslo,Norway,120,cabins,"
+            b"property_images/a.jpg,Sauna|sauna\n"
+        )
+        upload.name = "listings.csv"
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post(
+            reverse("property-bulk-import"), {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.data["created"], 1)
+
+    def test_main_image_must_be_an_unclaimed_listing_image(self):
+        paths = [
+            "../django_backend/settings.py",
+            "/etc/passwd",
+            "property_images/../manage.py",
+            "property_images/gallery/x.jpg",
+            "property_images/cabin.jpg",  # another owner's listing
+        ]
+        rows = [dict(self.row(""), main_image=path) for path in paths]
+        rows += [self.row("a.jpg"), self.row("a.jpg")]
+        response = self.post(self.owner, rows)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            [
+                (error["row"], list(error["errors"]))
+                for error in response.data["errors"]
+            ],
+            [(number, ["main_image"]) for number in (1, 2, 3, 4, 5, 7)],
+        )
+
+
+# ------------------------------
+# Bulk bookings
+# ------------------------------
+class BulkBookingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.guest = make_user("guest")
+        cls.prop = make_property(cls.owner)
+        cls.existing = Booking.objects.create(
+            property=cls.prop,
+            guest=cls.guest,
+            start_date=MONDAY,
+            end_date=MONDAY + timedelta(days=3),
+            total_price=300,
+        )
+
+    def item(self, start, nights, block=False):
+        return {
+            "property": self.prop.pk,
+            "start_date": start,
+            "end_date": start + timedelta(days=nights),
+            "block": block,
+        }
+
+    def test_creates_every_item(self):
+        result = create_bookings(
+            self.guest,
+            [
+                self.item(MONDAY + timedelta(days=3), 2),
+                self.item(MONDAY + timedelta(days=5), 1),
+            ],
+        )
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.conflicts, {})
+        self.assertEqual([b.total_price for b in result.bookings], [200, 100])
+
+    def test_conflicts_write_nothing(self):
+        result = create_bookings(
+            self.guest,
+            [
+                self.item(MONDAY + timedelta(days=2), 2),  # overlaps the booking
+                self.item(MONDAY + timedelta(days=10), 3),
+                self.item(MONDAY + timedelta(days=12), 2),  # overlaps the item above
+            ],
+        )
+        self.assertEqual(result.bookings, [])
+        self.assertEqual(result.conflicts[0][0]["booking"], self.existing.pk)
+        self.assertEqual(result.conflicts[1], [{"item": 2}])
+        self.assertEqual(result.conflicts[2], [{"item": 1}])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_only_the_owner_blocks(self):
+        result = create_bookings(
+            self.guest, [self.item(MONDAY + timedelta(days=20), 2, block=True)]
+        )
+        self.assertIn("block", result.errors[0])
+        result = create_bookings(
+            self.owner, [self.item(MONDAY + timedelta(days=20), 2, block=True)]
+        )
+        self.assertTrue(result.bookings[0].is_block)
+        self.assertEqual(result.bookings[0].total_price, 0)
+
+    def test_endpoint_queries_do_not_grow_with_items(self):
+        client = APIClient()
+        client.force_authenticate(self.guest)
+        url = reverse("booking-bulk")
+        queries = []
+        for offset, count in [(10, 1), (20, 4)]:
+            items = [
+                {
+                    "property_id": self.prop.pk,
+                    "start_date": str(MONDAY + timedelta(days=offset + 2 * n)),
+                    "end_date": str(MONDAY + timedelta(days=offset + 2 * n + 1)),
+                }
+                for n in range(count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(url, {"items": items}, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.data[-1]["guest"], "guest")
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+
+# ------------------------------
+# iCal
+# ------------------------------
+FEED = """BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+UID:keep\r
+DTSTART;VALUE=DATE:20300107\r
+DTEND;VALUE=DATE:20300110\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:mo\r
+ ve\r
+DTSTART:20300115T140000Z\r
+DTEND:20300115T180000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:cancelled\r
+DTSTART;VALUE=DATE:20300120\r
+STATUS:CANCELLED\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ICalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = make_property(make_user("owner"))
+        cls.feed = CalendarFeed.objects.create(
+            property=cls.prop, url="file:///feed.ics"
+        )
+
+    def test_parse_ical(self):
+        self.assertEqual(
+            parse_ical(FEED),
+            {
+                "keep": (date(2030, 1, 7), date(2030, 1, 10)),
+                # Folded UID; a timed event ending the same day lasts a day.
+                "move": (date(2030, 1, 15), date(2030, 1, 16)),
+            },
+        )
+        with self.assertRaises(ValueError):
+            parse_ical("<html>Not found</html>")
+
+    def test_apply_events_writes_the_difference(self):
+        events = parse_ical(FEED)
+        result = apply_events(self.feed, {**events, "gone": events["keep"]})
+        self.assertEqual((result.created, result.updated, result.deleted), (3, 0, 0))
+        self.assertTrue(Booking.objects.get(external_uid="gone").is_block)
+
+        events["move"] = (date(2030, 2, 1), date(2030, 2, 3))
+        result = apply_events(self.feed, events)
+        self.assertEqual((result.created, result.updated, result.deleted), (0, 1, 1))
+        self.assertEqual(
+            set(self.feed.bookings.values_list("external_uid", "start_date")),
+            {("keep", date(2030, 1, 7)), ("move", date(2030, 2, 1))},
+        )
+
+        self.assertFalse(apply_events(self.feed, events).changed)
+
+    def test_calendar_export_revalidates(self):
+        cache.clear()
+        url = reverse("property-calendar", args=[self.prop.pk])
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertNotIn(b"BEGIN:VEVENT", response.content)
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get(url, headers={"if-none-match": etag}).status_code, 304
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                property=self.prop,
+                guest=self.prop.owner,
+                start_date=date.today() + timedelta(days=1),
+                end_date=date.today() + timedelta(days=3),
+                total_price=0,
+            )
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.content.count(b"BEGIN:VEVENT"), 1)
+
+
+# ------------------------------
+# Owner dashboard
+# ------------------------------
+class DashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        cls.owner = make_user("owner")
+        cls.guest = make_user("guest")
+        cls.staff = make_user("staff", is_staff=True)
+        cls.prop = make_property(cls.owner, title="Cabin")
+        make_property(cls.owner, title="Flat")
+        make_property(cls.owner, title="Closed", is_active=False)
+        make_property(cls.guest, title="Elsewhere")
+        cls.stays = [
+            Booking.objects.create(
+                property=cls.prop,
+                guest=cls.guest,
+                start_date=today + timedelta(days=start),
+                end_date=today + timedelta(days=end),
+                total_price=0,
+                is_block=block,
+            )
+            for start, end, block in [(-5, -2, False), (-10, -8, True), (3, 5, False)]
+        ]
+        Review.objects.create(property=cls.prop, author=cls.guest, rating=4)
+        Review.objects.create(property=cls.prop, author=cls.staff, rating=5)
+
+    def get(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(reverse("owner-dashboard"), params)
+
+    def test_dashboard(self):
+        data = self.get(self.owner).data
+        self.assertEqual(data["properties"], {"total": 3, "active": 2})
+        occupancy = data["occupancy"]
+        self.assertEqual(
+            (
+                occupancy["booked_nights"],
+                occupancy["blocked_nights"],
+                occupancy["available_nights"],
+            ),
+            (3, 2, 58),
+        )
+        self.assertEqual(occupancy["rate"], round(3 / 58, 4))
+        self.assertEqual(data["rating"], {"average": 4.5, "count": 2})
+
+        revenue = {}
+        for stay in (self.stays[0], self.stays[2]):
+            revenue[f"{stay.start_date:%Y-%m}"] = (
+                revenue.get(f"{stay.start_date:%Y-%m}", 0) + stay.total_price
+            )
+        self.assertEqual(
+            {row["month"]: row["revenue"] for row in data["revenue_by_month"]},
+            revenue,
+        )
+        [upcoming] = data["upcoming_check_ins"]
+        self.assertEqual(upcoming["id"], self.stays[2].pk)
+        self.assertEqual(upcoming["guest_username"], "guest")
+        self.assertEqual(upcoming["property_title"], "Cabin")
+
+    def test_queries_do_not_grow_with_listings(self):
+        with self.assertNumQueries(5):
+            owner_dashboard(self.owner.pk)
+        make_property(self.owner, title="Barn")
+        with self.assertNumQueries(5):
+            owner_dashboard(self.owner.pk)
+
+    def test_owner_param(self):
+        self.assertEqual(
+            self.get(self.guest, owner=self.owner.pk).data["owner"], self.guest.pk
+        )
+        self.assertEqual(
+            self.get(self.staff, owner=self.owner.pk).data["owner"], self.owner.pk
+        )
+        self.assertEqual(self.get(self.staff, owner="me").status_code, 400)
+        self.assertEqual(self.get(self.owner, days=0).status_code, 400)
+        self.assertEqual(self.get(self.owner, months="x").status_code, 400)
+
+
+# ------------------------------
+# Analytics rollup
+# ------------------------------
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.guest = make_user("guest")
+        cls.prop = make_property(cls.owner)
+        cls.stay = Booking.objects.create(
+            property=cls.prop,
+            guest=cls.guest,
+            start_date=MONDAY,
+            end_date=MONDAY + timedelta(days=3),
+            total_price=0,
+        )
+        Booking.objects.create(
+            property=cls.prop,
+            guest=cls.owner,
+            start_date=MONDAY + timedelta(days=5),
+            end_date=MONDAY + timedelta(days=6),
+            total_price=0,
+            is_block=True,
+        )
+        # Doesn't divide into whole cents per night
+        Booking.objects.filter(pk=cls.stay.pk).update(total_price=Decimal(100))
+
+    def nights(self):
+        return list(
+            DailyOccupancy.objects.order_by("date").values_list(
+                "date", "is_block", "revenue"
+            )
+        )
+
+    def test_full_rollup(self):
+        result = rollup_bookings()
+        self.assertEqual((result.full, result.bookings, result.nights), (True, 2, 4))
+        self.assertEqual(
+            self.nights(),
+            [
+                (MONDAY, False, Decimal("33.34")),
+                (MONDAY + timedelta(days=1), False, Decimal("33.33")),
+                (MONDAY + timedelta(days=2), False, Decimal("33.33")),
+                (MONDAY + timedelta(days=5), True, Decimal(0)),
+            ],
+        )
+        self.assertIsNotNone(rollup_watermark())
+
+    def test_incremental_rollup_follows_changes(self):
+        rollup_bookings()
+        RollupWatermark.objects.update(watermark=timezone.now() + OVERLAP)
+        self.assertEqual(rollup_bookings().bookings, 0)
+
+        # Only the moved booking is newer than the watermark's overlap.
+        Booking.objects.update(updated_at=timezone.now() - 2 * OVERLAP)
+        RollupWatermark.objects.update(watermark=timezone.now())
+        self.stay.start_date = MONDAY + timedelta(days=1)
+        self.stay.save()
+        result = rollup_bookings()
+        self.assertEqual((result.full, result.bookings, result.nights), (False, 1, 2))
+        self.assertEqual(
+            [night[0] for night in self.nights()],
+            [MONDAY + timedelta(days=n) for n in (1, 2, 5)],
+        )
+
+        self.stay.delete()
+        self.assertEqual(len(self.nights()), 1)
+
+    def test_daily_totals_and_view(self):
+        rollup_bookings()
+        make_property(self.guest, title="Flat")
+        days = list(daily_totals(MONDAY, MONDAY + timedelta(days=6)))
+        self.assertEqual(
+            [(day["date"], day["booked"], day["blocked"]) for day in days],
+            [
+                (MONDAY, 1, 0),
+                (MONDAY + timedelta(days=1), 1, 0),
+                (MONDAY + timedelta(days=2), 1, 0),
+                (MONDAY + timedelta(days=5), 0, 1),
+            ],
+        )
+
+        client = APIClient()
+        url = reverse("analytics-daily")
+        params = {"start": str(MONDAY), "end": str(MONDAY + timedelta(days=7))}
+        client.force_authenticate(self.owner)
+        totals = client.get(url, params).data["totals"]
+        self.assertEqual(
+            totals, {"booked_nights": 3, "blocked_nights": 1, "revenue": Decimal(100)}
+        )
+        client.force_authenticate(self.guest)
+        self.assertEqual(client.get(url, params).data["days"], [])
+        self.assertEqual(client.get(url, {"start": "soon"}).status_code, 400)
+        self.assertEqual(
+            client.get(url, {**params, "end": params["start"]}).status_code, 400
+        )
+
+
+# ------------------------------
+# Pricing
+# ------------------------------
+class PricingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = make_property(
+            make_user("owner"), weekend_price=Decimal(150), min_nights=2
+        )
+
+    def rule(self, start, nights, price, **kwargs):
+        return PriceRule(
+            property=self.prop,
+            start_date=start,
+            end_date=start + timedelta(days=nights),
+            price_per_night=Decimal(price),
+            **kwargs,
+        )
+
+    def test_count_weekend_nights(self):
+        self.assertEqual(count_weekend_nights(MONDAY, MONDAY + timedelta(days=7)), 2)
+        self.assertEqual(count_weekend_nights(MONDAY, MONDAY + timedelta(days=4)), 0)
+        friday = MONDAY + timedelta(days=4)
+        self.assertEqual(count_weekend_nights(friday, friday + timedelta(days=16)), 6)
+
+    def test_base_rates(self):
+        quote = quote_stay(self.prop, MONDAY, MONDAY + timedelta(days=7), [])
+        self.assertEqual(len(quote.segments), 1)
+        self.assertEqual(quote.total, 5 * 100 + 2 * 150)
+        self.assertTrue(quote.meets_min_nights)
+
+    def test_rules_split_the_stay(self):
+        season = self.rule(MONDAY + timedelta(days=2), 10, "80", pk=1)
+        holiday = self.rule(MONDAY + timedelta(days=3), 1, "300", pk=2, priority=1)
+        quote = quote_stay(
+            self.prop, MONDAY, MONDAY + timedelta(days=5), [season, holiday]
+        )
+        self.assertEqual(
+            [(s.nights, s.rule_id) for s in quote.segments],
+            [(2, None), (1, 1), (1, 2), (1, 1)],
+        )
+        # Rules without a weekend rate charge their nightly rate on Fridays.
+        self.assertEqual(quote.total, 2 * 100 + 80 + 300 + 80)
+
+    def test_check_in_rule_sets_min_nights(self):
+        rule = self.rule(MONDAY, 7, "90", pk=1, min_nights=5)
+        quote = quote_stay(self.prop, MONDAY, MONDAY + timedelta(days=3), [rule])
+        self.assertEqual(quote.min_nights, 5)
+        self.assertFalse(quote.meets_min_nights)
+
+    def test_queries_the_rules_when_not_given(self):
+        self.rule(MONDAY, 7, "90").save()
+        quote = quote_stay(self.prop, MONDAY, MONDAY + timedelta(days=2))
+        self.assertEqual(quote.total, 180)
+
+
+class StayFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = make_user("owner")
+        cls.plain = make_property(owner, title="Plain", weekend_price=Decimal(150))
+        cls.ruled = make_property(owner, title="Ruled", min_nights=2)
+        rules = [
+            (MONDAY + timedelta(days=2), 10, "80", 0, None),
+            (MONDAY + timedelta(days=4), 1, "300", 1, None),
+            (MONDAY + timedelta(days=20), 7, "60", 0, 5),
+        ]
+        for start, nights, price, priority, min_nights in rules:
+            PriceRule.objects.create(
+                property=cls.ruled,
+                start_date=start,
+                end_date=start + timedelta(days=nights),
+                price_per_night=Decimal(price),
+                weekend_price=Decimal(price) + 20 if priority == 0 else None,
+                priority=priority,
+                min_nights=min_nights,
+            )
+
+    def titles(self, start, nights, low=None, high=None):
+        return sorted(
+            filter_stay(
+                Property.objects.all(), start, start + timedelta(days=nights), low, high
+            ).values_list("title", flat=True)
+        )
+
+    def test_matches_quote_stay(self):
+        listings = list(Property.objects.prefetch_related("price_rules"))
+        rng = random.Random(38)
+        for _ in range(40):
+            start = MONDAY + timedelta(days=rng.randrange(30))
+            nights = rng.randrange(2, 12)
+            end = start + timedelta(days=nights)
+            low, high = sorted(Decimal(rng.randrange(60, 200)) for _ in range(2))
+            expected = [
+                prop.title
+                for prop in listings
+                if (quote := quote_stay(prop, start, end, prop.price_rules.all()))
+                and quote.meets_min_nights
+                and low <= quote.total / nights <= high
+            ]
+            self.assertEqual(self.titles(start, nights, low, high), sorted(expected))
+
+    def test_min_nights(self):
+        self.assertEqual(self.titles(MONDAY, 1), ["Plain"])
+        self.assertEqual(self.titles(MONDAY, 2), ["Plain", "Ruled"])
+        # The check-in night's rule asks for five.
+        self.assertEqual(self.titles(MONDAY + timedelta(days=20), 4), ["Plain"])
+        self.assertEqual(
+            self.titles(MONDAY + timedelta(days=19), 4), ["Plain", "Ruled"]
+        )
+
+    def test_list_endpoint(self):
+        url = reverse("property-list")
+        params = {"check_in": str(MONDAY + timedelta(days=4)), "max_price": 150}
+        params["check_out"] = str(MONDAY + timedelta(days=6))
+        with self.assertNumQueries(2):  # the count and the page
+            response = self.client.get(url, params)
+        # Friday at the holiday rate, Saturday at the season's weekend rate
+        self.assertEqual(
+            [row["title"] for row in response.json()["results"]], ["Plain"]
+        )
+        params["max_price"] = 200
+        response = self.client.get(url, params)
+        self.assertEqual(
+            sorted(row["title"] for row in response.json()["results"]),
+            ["Plain", "Ruled"],
+        )
+
+        params["check_out"] = params["check_in"]
+        self.assertEqual(self.client.get(url, params).status_code, 400)
+        params["check_out"] = str(MONDAY + timedelta(days=400))
+        self.assertEqual(self.client.get(url, params).status_code, 400)
+
+
+# ------------------------------
+# Reviews
+# ------------------------------
+class ReviewAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = make_property(make_user("owner"))
+        cls.alice = make_user("alice")
+        cls.bob = make_user("bob")
+
+    def aggregates(self):
+        self.prop.refresh_from_db()
+        return self.prop.review_count, self.prop.rating_sum
+
+    def test_upsert_adjusts_the_aggregates(self):
+        _, created = upsert_review(self.prop.pk, self.alice.pk, 4)
+        self.assertTrue(created)
+        upsert_review(self.prop.pk, self.bob.pk, 2)
+        self.assertEqual(self.aggregates(), (2, 6))
+
+        _, created = upsert_review(self.prop.pk, self.alice.pk, 5, "Even better")
+        self.assertFalse(created)
+        self.assertEqual(self.aggregates(), (2, 7))
+        self.assertEqual(Review.objects.get(author=self.alice).comment, "Even better")
+
+    def test_recount_matches_the_reviews(self):
+        upsert_review(self.prop.pk, self.alice.pk, 4)
+        Property.objects.filter(pk=self.prop.pk).update(review_count=9, rating_sum=1)
+        recount_ratings([self.prop.pk])
+        self.assertEqual(self.aggregates(), (1, 4))
+
+
+# ------------------------------
+# Lookup tables
+# ------------------------------
+@override_settings(CACHES=LOCMEM_CACHE)
+class LookupTableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cabins = Category.objects.create(name="Cabins", slug="cabins")
+
+    def setUp(self):
+        cache.clear()
+        self.table = lookups.LookupTable(Category)
+
+    def test_rows_and_serialized_load_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.table.get(self.cabins.pk), self.cabins)
+            self.assertIsNone(self.table.get(0))
+            data = self.table.serialized(CategorySerializer)
+        self.assertEqual(
+            data, [{"id": self.cabins.pk, "name": "Cabins", "slug": "cabins"}]
+        )
+        with self.assertNumQueries(0):
+            self.assertIs(self.table.serialized(CategorySerializer), data)
+
+    def test_bump_reloads_here_and_elsewhere(self):
+        elsewhere = lookups.LookupTable(Category)
+        elsewhere.get(self.cabins.pk)
+        self.table.get(self.cabins.pk)
+        flats = Category.objects.create(name="Flats", slug="flats")
+        self.assertIsNone(self.table.get(flats.pk))
+
+        self.table.bump()
+        self.assertEqual(self.table.get(flats.pk), flats)
+        # Other processes notice at their next check of the stamp.
+        self.assertIsNone(elsewhere.get(flats.pk))
+        elsewhere.checked_at -= lookups.CHECK_INTERVAL
+        self.assertEqual(elsewhere.get(flats.pk), flats)
+
+    def test_reloads_at_max_age_without_a_new_stamp(self):
+        self.table.get(self.cabins.pk)
+        flats = Category.objects.create(name="Flats", slug="flats")
+        self.table.snapshot.loaded_at -= lookups.MAX_AGE
+        self.assertEqual(self.table.get(flats.pk), flats)
+
+    def test_a_concurrent_bump_keeps_the_callers_snapshot(self):
+        sync = self.table._sync
+
+        def sync_then_bump():
+            snapshot = sync()
+            self.table.bump()
+            return snapshot
+
+        with mock.patch.object(self.table, "_sync", sync_then_bump):
+            self.assertEqual(self.table.get(self.cabins.pk), self.cabins)
+            self.assertEqual(len(self.table.serialized(CategorySerializer)), 1)
+
+    def test_saves_bump_the_table(self):
+        lookups.categories.get(self.cabins.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            flats = Category.objects.create(name="Flats", slug="flats")
+        self.assertEqual(lookups.categories.get(flats.pk), flats)
+
+    def test_cached_primary_key_field(self):
+        field = lookups.CachedPrimaryKeyRelatedField(table=self.table)
+        self.table.get(self.cabins.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(field.to_internal_value(str(self.cabins.pk)), self.cabins)
+            for value in (0, True, "x"):
+                with self.assertRaises(serializers.ValidationError):
+                    field.to_internal_value(value)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -6,6 +7,11 @@ from .views import (
     AmenityViewSet,
     BookingViewSet,
     ReviewViewSet,
+    CalendarFeedViewSet,
+    PriceRuleViewSet,
+    ExportView,
+    DashboardView,
+    DailyAnalyticsView,
 )
 
 # The router automatically generates the URLs for our ViewSets
@@ -15,8 +21,24 @@ router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"amenities", AmenityViewSet, basename="amenity")
 router.register(r"bookings", BookingViewSet, basename="booking")
 router.register(r"reviews", ReviewViewSet, basename="review")
+router.register(r"calendar-feeds", CalendarFeedViewSet, basename="calendar-feed")
+router.register(r"price-rules", PriceRuleViewSet, basename="price-rule")
 
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     path("", include(router.urls)),
+    path("exports/<slug:kind>.<slug:fmt>", ExportView.as_view(), name="export"),
+    path("dashboard/", DashboardView.as_view(), name="owner-dashboard"),
+    path("analytics/daily/", DailyAnalyticsView.as_view(), name="analytics-daily"),
+    path(
+        "properties/<int:pk>/calendar.ics",
+        PropertyViewSet.as_view({"get": "calendar"}),
+        name="property-calendar",
+    ),
 ]
+
+# Under ASGI, the hot read endpoints can be served by native async views.
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import urlpatterns as async_urlpatterns
+
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,10 +1,40 @@
-from datetime import date
-from django.db.models import F
+import codecs
+import csv
+from dataclasses import asdict
+from datetime import date, timedelta
+from itertools import islice
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Prefetch
+from django.utils import timezone
+from django.http import HttpResponse
 from django.contrib.postgres.search import SearchQuery, SearchRank
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from .models import Property, Category, Amenity, Booking, Review
+from rest_framework.views import APIView
+from django_backend.db_routers import ReadReplicaMixin, read_from_replica
+from django_backend.streaming import StreamingChunksResponse, StreamingListMixin
+from . import lookups
+from .exports import EXPORTS, FORMATS, export_queryset, iter_export
+from .imports import import_properties
+from .bulk_bookings import create_bookings
+from .dashboard import owner_dashboard
+from .filters import PropertyFilter
+from .pricing import quote_stay
+from .reviews import has_completed_stay, upsert_review
+from .rollups import daily_totals, rollup_watermark
+from .ical import property_calendar, sync_feed
+from .models import (
+    Property,
+    Category,
+    Amenity,
+    Booking,
+    Review,
+    CalendarFeed,
+    PriceRule,
+)
 from .serializers import (
     PropertyListSerializer,
     PropertyDetailSerializer,
@@ -13,6 +43,10 @@ from .serializers import (
     CategorySerializer,
     AmenitySerializer,
     BookingSerializer,
+    BulkBookingSerializer,
+    CalendarFeedSerializer,
+    PriceRuleSerializer,
+    QuoteSerializer,
     ReviewSerializer,
 )
 from .pagination import SmallResultsSetPagination
@@ -24,7 +58,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.owner == request.user
+        return obj.owner_id == request.user.id
 
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -33,15 +67,20 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user
+        return obj.author_id == request.user.id
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(ReadReplicaMixin, StreamingListMixin, viewsets.ModelViewSet):
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         IsOwnerOrReadOnly,
     ]
     pagination_class = SmallResultsSetPagination
+    filterset_class = PropertyFilter
+    import_max_rows = 5000
+    replica_actions = ReadReplicaMixin.replica_actions + ("calendar", "quote")
+    throttle_scopes = {"search": "search", "check_availability": "availability"}
+    owner_field = "owner"
 
     def get_queryset(self):
         """Optimize queries for list vs detail views."""
@@ -54,16 +93,27 @@ class PropertyViewSet(viewsets.ModelViewSet):
             ).prefetch_related(  # single FK relations
                 "images",  # reverse FK
                 "amenities",  # M2M
-                "reviews__author",  # reviews + user in one prefetch
+                # reviews joined with their authors, in one query
+                Prefetch("reviews", Review.objects.select_related("author")),
                 "bookings",  # needed for booked dates
             )
 
         if self.action == "list":
-            # Keep it lighter: list usually doesn’t need deep prefetch
-            return base_qs.select_related("owner", "category")
+            # Keep it lighter: list usually doesn’t need deep prefetch.
+            # Newest first, a stable order for pagination (property_created_idx)
+            return base_qs.select_related("owner", "category").order_by(
+                "-created_at", "-id"
+            )
 
         return base_qs
 
+    def perform_content_negotiation(self, request, force=False):
+        # Calendar clients ask for text/calendar, which no renderer offers.
+        # The feed isn't rendered by DRF anyway; only its errors are.
+        if self.action == "calendar":
+            force = True
+        return super().perform_content_negotiation(request, force=force)
+
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action == "retrieve":
@@ -76,12 +126,11 @@ class PropertyViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Set the owner when creating a property."""
-        serializer.save(owner=self.request.user)
+        serializer.save(owner_id=self.request.user.id)
 
     def perform_update(self, serializer):
         """Ensure user owns the property before updating."""
-        property_instance = self.get_object()
-        if property_instance.owner != self.request.user:
+        if serializer.instance.owner_id != self.request.user.id:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied(
@@ -91,7 +140,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         """Delete all related images (main + gallery) before deleting the property."""
-        if instance.owner != self.request.user:
+        if instance.owner_id != self.request.user.id:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied(
@@ -142,6 +191,65 @@ class PropertyViewSet(viewsets.ModelViewSet):
 
         return Response({"is_available": True, "message": "Dates are available!"})
 
+    # --- Price a stay ---
+    @action(detail=True, methods=["get"])
+    def quote(self, request, pk=None):
+        """Total for ``?start_date=&end_date=``, split by the rates applied."""
+        property_instance = self.get_object()
+        try:
+            start_date = date.fromisoformat(request.query_params.get("start_date", ""))
+            end_date = date.fromisoformat(request.query_params.get("end_date", ""))
+        except ValueError:
+            return Response(
+                {"error": "start_date and end_date are required, as YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 < (end_date - start_date).days <= 366:
+            return Response(
+                {"error": "A stay is 1 to 366 nights."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        quote = quote_stay(property_instance, start_date, end_date)
+        return Response(QuoteSerializer(quote).data)
+
+    # --- The user's review of this property ---
+    @action(
+        detail=True,
+        methods=["put"],
+        url_path="review",
+        url_name="review",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def review(self, request, pk=None):
+        """
+        Create or replace the user's review (``rating``, ``comment``) of this
+        property. Only guests with a completed stay here may review it.
+        """
+        # Not get_object(): writes there are scoped to the owner's listings.
+        property_instance = get_object_or_404(
+            Property.objects.filter(is_active=True).only("id"), pk=pk
+        )
+        serializer = ReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return save_review(request.user, property_instance, serializer.validated_data)
+
+    # --- iCal feed of booked dates (routed in urls.py as calendar.ics) ---
+    def calendar(self, request, pk=None):
+        property_instance = self.get_object()
+        version, content = property_calendar(property_instance)
+        etag = f'"{version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(
+                content, content_type="text/calendar; charset=utf-8"
+            )
+        response["ETag"] = etag
+        # Always revalidate; an unchanged calendar costs a 304.
+        response["Cache-Control"] = "no-cache"
+        return response
+
     # --- Full-text search for properties ---
     @action(detail=False, methods=["get"])
     def search(self, request):
@@ -157,33 +265,194 @@ class PropertyViewSet(viewsets.ModelViewSet):
         queryset = (
             Property.objects.annotate(rank=SearchRank(F("search_vector"), search_query))
             .filter(search_vector=search_query, is_active=True)
+            .select_related("owner")
             .order_by("-rank")[:20]
         )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    # --- Bulk import of listings ---
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Import many listings at once from a JSON list of rows, or a CSV file
+        uploaded as ``file``. Staff may name an ``owner`` username per row.
+        ``?dry_run=true`` validates everything without saving.
+        """
+        upload = request.FILES.get("file")
+        if upload is not None:
+            rows = csv.DictReader(codecs.iterdecode(upload, "utf-8-sig"))
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {"error": "Send a JSON list of rows, or a CSV file as 'file'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-# --- No changes to CategoryViewSet or AmenityViewSet ---
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+        try:
+            rows = list(islice(rows, self.import_max_rows + 1))
+        except (UnicodeDecodeError, csv.Error):
+            return Response(
+                {"error": "The file must be UTF-8 encoded CSV."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.import_max_rows:
+            return Response(
+                {"error": f"At most {self.import_max_rows} rows per import."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true")
+        result = import_properties(
+            rows,
+            owner_id=request.user.id,
+            allow_owner_column=request.user.is_staff,
+            dry_run=dry_run,
+        )
+        if dry_run:
+            response_status = status.HTTP_200_OK
+        elif result.created:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {
+                "created": result.created,
+                "dry_run": dry_run,
+                "errors": result.error_list(),
+            },
+            status=response_status,
+        )
+
+
+# --- Categories and amenities, served from the cached tables ---
+class LookupTableViewSet(viewsets.ReadOnlyModelViewSet):
+    """Lists and retrieves the rows of ``lookup_table`` without a query."""
+
+    lookup_table = None
+
+    def list(self, request, *args, **kwargs):
+        data = self.lookup_table.serialized(self.get_serializer_class())
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = self.queryset.model._meta.pk.to_python(kwargs[self.lookup_field])
+        except DjangoValidationError:
+            pk = None
+        row = self.lookup_table.get(pk)
+        if row is None:
+            raise NotFound()
+        return Response(self.get_serializer(row).data)
+
+
+class CategoryViewSet(LookupTableViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    lookup_table = lookups.categories
 
 
-class AmenityViewSet(viewsets.ReadOnlyModelViewSet):
+class AmenityViewSet(LookupTableViewSet):
     queryset = Amenity.objects.all()
     serializer_class = AmenitySerializer
+    lookup_table = lookups.amenities
 
 
 # --- No changes to BookingViewSet ---
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scopes = {"create": "booking", "bulk": "booking"}
 
     def get_queryset(self):
-        return Booking.objects.filter(guest=self.request.user)
+        return Booking.objects.filter(guest_id=self.request.user.id)
 
     def perform_create(self, serializer):
-        serializer.save(guest=self.request.user)
+        serializer.save(guest_id=self.request.user.id)
+
+    # --- Many bookings or calendar blocks at once ---
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create up to 500 bookings, or owner blocks (``"block": true``), in
+        one request. All of them are created, or none are: overlaps with
+        existing bookings or within the request come back as 409 with the
+        conflicts per item.
+        """
+        serializer = BulkBookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["items"]
+
+        result = create_bookings(request.user, items)
+        if result.errors:
+            return Response(
+                # Keyed by index, like DRF's own errors for a list field
+                {"items": result.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if result.conflicts:
+            return Response(
+                {"conflicts": result.conflict_list()},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            BookingSerializer(result.bookings, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class PriceRuleViewSet(viewsets.ModelViewSet):
+    """Seasonal and per-date rates on the user's properties."""
+
+    serializer_class = PriceRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ["property"]
+
+    def get_queryset(self):
+        return PriceRule.objects.filter(
+            property__owner_id=self.request.user.id
+        ).order_by("property_id", "start_date")
+
+
+class CalendarFeedViewSet(viewsets.ModelViewSet):
+    """External iCal feeds that block dates on the user's properties."""
+
+    serializer_class = CalendarFeedSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return CalendarFeed.objects.filter(property__owner_id=self.request.user.id)
+
+    @action(detail=True, methods=["post"])
+    def sync(self, request, pk=None):
+        """Sync the feed now rather than on the next scheduled run."""
+        feed = self.get_object()
+        try:
+            result = sync_feed(feed)
+        except (OSError, ValueError) as exc:
+            return Response(
+                {"error": f"Could not sync the feed: {exc}"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        return Response(asdict(result))
+
+
+def save_review(user, property_instance, data):
+    """Upsert a validated review; 201 if it is new, else 200."""
+    if not has_completed_stay(user.id, property_instance.pk):
+        raise PermissionDenied("Only guests who have stayed here can review it.")
+    review_id, created = upsert_review(
+        property_instance.pk, user.id, data["rating"], data.get("comment", "")
+    )
+    review = Review.objects.select_related("author").get(pk=review_id)
+    return Response(
+        ReviewSerializer(review).data,
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+    )
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -193,6 +462,174 @@ class ReviewViewSet(viewsets.ModelViewSet):
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorOrReadOnly,
     ]
+    owner_field = "author"
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create the user's review of ``property_id``, or replace the one they
+        already wrote; as ``PUT properties/<id>/review/``.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        property_instance = serializer.validated_data.get("property")
+        if property_instance is None:
+            raise ValidationError({"property_id": ["This field is required."]})
+        return save_review(request.user, property_instance, serializer.validated_data)
+
+
+class ExportView(APIView):
+    """
+    Streams a full dump of properties, bookings or reviews as CSV or NDJSON,
+    e.g. ``exports/bookings.csv?since=2025-01-01&until=2025-12-31``. Owners
+    get the rows for their own listings; staff get everything, or one
+    owner's rows with ``?owner=<user id>``.
+    """
 
-    def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The export itself isn't rendered by DRF, so an Accept header asking
+        # for text/csv mustn't fail negotiation; errors still render as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, kind, fmt):
+        export = EXPORTS.get(kind)
+        if export is None or fmt not in FORMATS:
+            raise NotFound()
+
+        try:
+            since, until = (
+                date.fromisoformat(value) if value else None
+                for value in (
+                    request.query_params.get("since"),
+                    request.query_params.get("until"),
+                )
+            )
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owner_id = request.user.id
+        if request.user.is_staff:
+            owner_id = request.query_params.get("owner") or None
+            if owner_id is not None and not owner_id.isdigit():
+                return Response(
+                    {"error": "owner must be a user id."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        with read_from_replica():
+            queryset = export_queryset(export, owner_id, since, until)
+            chunks = iter_export(export, queryset, fmt)
+        return StreamingChunksResponse(
+            request,
+            chunks,
+            content_type=FORMATS[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{kind}.{fmt}"'},
+        )
+
+
+class DashboardView(APIView):
+    """
+    Occupancy, monthly revenue, average rating and upcoming check-ins across
+    all of the user's listings. ``?days=`` sets the occupancy window (default
+    30) and ``?months=`` the revenue history (default 12). Staff can pass
+    ``?owner=<user id>`` to see another owner's dashboard.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get("days", 30))
+            months = int(request.query_params.get("months", 12))
+        except ValueError:
+            days = months = 0
+        if not (1 <= days <= 366 and 1 <= months <= 36):
+            return Response(
+                {"error": "days must be 1-366 and months 1-36."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owner_id = request.user.id
+        if request.user.is_staff and request.query_params.get("owner"):
+            owner_id = request.query_params["owner"]
+            if not owner_id.isdigit():
+                return Response(
+                    {"error": "owner must be a user id."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            owner_id = int(owner_id)
+
+        with read_from_replica():
+            return Response(owner_dashboard(owner_id, days=days, months=months))
+
+
+class DailyAnalyticsView(APIView):
+    """
+    Booked nights, blocked nights and revenue per day across the user's
+    listings, read from the ``DailyOccupancy`` rollup. ``?start=`` and
+    ``?end=`` bound the half-open day range (default: the last 30 days).
+    ``?property=`` narrows it to one listing, and staff may pass
+    ``?owner=<user id>``. The rollup is as fresh as ``watermark``.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_days = 731
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            start, end = (
+                date.fromisoformat(value) if value else default
+                for value, default in (
+                    (request.query_params.get("start"), today - timedelta(days=30)),
+                    (request.query_params.get("end"), today),
+                )
+            )
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 < (end - start).days <= self.max_days:
+            return Response(
+                {"error": f"end must be after start, at most {self.max_days} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        owner_id = request.user.id
+        if request.user.is_staff:
+            owner_id = request.query_params.get("owner") or None
+        property_id = request.query_params.get("property")
+        if not all(str(value).isdigit() for value in (owner_id, property_id) if value):
+            return Response(
+                {"error": "owner and property must be ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with read_from_replica():
+            days = list(
+                daily_totals(
+                    start,
+                    end,
+                    property_ids=[property_id] if property_id else None,
+                    owner_id=owner_id,
+                )
+            )
+            watermark = rollup_watermark()
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "watermark": watermark,
+                "totals": {
+                    "booked_nights": sum(day["booked"] for day in days),
+                    "blocked_nights": sum(day["blocked"] for day in days),
+                    "revenue": sum(day["revenue"] for day in days),
+                },
+                "days": days,
+            }
+        )
@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from django.utils.html import format_html
+from django_backend.thumbnails import admin_thumbnail
 from .models import UserProfile, Useraccount
 
 
@@ -64,11 +64,7 @@ class UseraccountAdmin(admin.ModelAdmin):
     )
 
     def avatar_preview(self, obj):
-        if obj.avatar:
-            return format_html(
-                '<img src="{}" width="50" height="50" style="object-fit:cover; border-radius:5px;" />',
-                obj.avatar.url,
-            )
-        return "No Image"
+        # A cached thumbnail, not the original upload of up to 2 MB
+        return admin_thumbnail(obj.avatar)
 
     avatar_preview.short_description = "Avatar Preview"
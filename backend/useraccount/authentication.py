@@ -0,0 +1,200 @@
+"""
+JWT authentication without a user query per request.
+
+With ``JWT_TOKEN_USER`` on, safe requests get a ``LazyTokenUser`` built
+from the access token's signed claims as ``request.user``: the user id,
+``username`` and ``is_staff``. That is all most reads need, since ownership
+is checked by comparing ids. Any other attribute, and every permission
+check, loads the real user, once per request. Unsafe requests get the real
+user up front, as views may change and save ``request.user`` itself.
+
+The claims are written at login and re-read from the database at every
+refresh, so a change to them takes effect within one access token lifetime.
+Deactivating a user likewise only takes effect at the next refresh.
+"""
+
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer, JWTCookieAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .token_blacklist import is_blacklisted
+
+CLAIMS = ("username", "is_staff")
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    A refresh token carrying ``CLAIMS``, which its access tokens copy. Its
+    blacklist check goes through the Bloom filter in token_blacklist.py,
+    and rotating it doesn't load the user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    @property
+    def access_token(self):
+        # Minted on refresh: bring the claims up to date first, which also
+        # updates the rotated refresh token.
+        current = (
+            get_user_model()
+            ._default_manager.filter(pk=self[api_settings.USER_ID_CLAIM])
+            .values(*CLAIMS)
+            .first()
+        )
+        if current:
+            self.payload.update(current)
+        return super().access_token
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        # As simplejwt's, but only checking that the token's user still
+        # exists, and rejecting the token if not rather than saving it
+        # without a user.
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if not get_user_model()._default_manager.filter(pk=user_id).exists():
+            raise TokenError(_("User not found"))
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                "user_id": user_id,
+                "created_at": self.current_time,
+                "token": str(self),
+                "expires_at": datetime_from_epoch(self.payload["exp"]),
+            },
+        )
+
+    def blacklist(self):
+        token, _created = self.outstand()
+        return BlacklistedToken.objects.get_or_create(token=token)
+
+
+class TokenClaimsSerializer(TokenObtainPairSerializer):
+    """``JWT_TOKEN_CLAIMS_SERIALIZER``: issues ``ClaimsRefreshToken``s at login."""
+
+    token_class = ClaimsRefreshToken
+
+
+class TokenClaimsRefreshSerializer(CookieTokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        # simplejwt's looks the user up with get(), so a deleted user's
+        # token would be a server error rather than a 401.
+        try:
+            return super().validate(attrs)
+        except get_user_model().DoesNotExist:
+            raise InvalidToken(_("User not found"))
+
+
+class LazyTokenUser(TokenUser):
+    """
+    A user made from token claims. Equal to the model user with the same
+    id; anything beyond the claims comes from the model user, loaded on
+    first use. So do writes and permissions, which ``TokenUser`` stubs out.
+    """
+
+    @cached_property
+    def id(self):
+        return get_user_model()._meta.pk.to_python(
+            self.token[api_settings.USER_ID_CLAIM]
+        )
+
+    @cached_property
+    def user(self):
+        return get_user_model()._default_manager.get(pk=self.id)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name == "token":
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    @property
+    def is_superuser(self):
+        return self.user.is_superuser
+
+    @property
+    def groups(self):
+        return self.user.groups
+
+    @property
+    def user_permissions(self):
+        return self.user.user_permissions
+
+    def save(self, *args, **kwargs):
+        return self.user.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.user.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        return self.user.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.user.check_password(raw_password)
+
+    def get_group_permissions(self, obj=None):
+        return self.user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, app_label):
+        return self.user.has_module_perms(app_label)
+
+    def __eq__(self, other):
+        if isinstance(other, get_user_model()):
+            return self.id == other.pk
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class JWTCookieTokenUserAuthentication(JWTCookieAuthentication):
+    """
+    ``JWTCookieAuthentication`` that returns a ``LazyTokenUser`` for safe
+    requests if enabled.
+    """
+
+    def authenticate(self, request):
+        self.safe_request = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        # Tokens issued before the claims were added load the user as before.
+        if (
+            not settings.JWT_TOKEN_USER
+            or not getattr(self, "safe_request", False)
+            or "username" not in validated_token
+        ):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return LazyTokenUser(validated_token)
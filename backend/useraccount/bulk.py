@@ -0,0 +1,184 @@
+"""
+Bulk create, update and delete of useraccounts.
+
+Items are validated one by one with ``UseraccountBulkItemSerializer``, then
+every ``useraccount_id`` in the request is checked against the table and
+against the other items with one query. Valid items are written with
+``bulk_create`` / ``bulk_update`` in chunks of ``BATCH_SIZE``, one
+transaction per chunk. Invalid items are reported by index and skipped;
+the rest are applied.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import batched
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Useraccount
+from .serializers import UseraccountBulkItemSerializer
+
+BATCH_SIZE = 1000
+DUPLICATE = "A useraccount with this useraccount_id already exists."
+
+
+@dataclass
+class BulkResult:
+    done: dict = field(default_factory=dict)  # item index -> useraccount id
+    errors: dict = field(default_factory=dict)  # item index -> field errors
+
+    def item_list(self, status):
+        items = [
+            {"index": index, "id": pk, "status": status}
+            for index, pk in self.done.items()
+        ]
+        items += [
+            {"index": index, "errors": errors} for index, errors in self.errors.items()
+        ]
+        return sorted(items, key=lambda item: item["index"])
+
+    def error(self, index, name, message):
+        self.errors.setdefault(index, {}).setdefault(name, []).append(message)
+
+
+def _validate(items, result, partial=False):
+    """Map index -> validated data for the items that pass the serializer."""
+    serializer = UseraccountBulkItemSerializer(partial=partial)
+    valid = {}
+    for index, item in enumerate(items):
+        try:
+            valid[index] = serializer.run_validation(item)
+        except ValidationError as exc:
+            result.errors[index] = exc.detail
+    return valid
+
+
+def _check_unique(valid, result, own=None):
+    """
+    Drop items whose ``useraccount_id`` is taken, by another item or by a
+    row in the table other than the item's own (``own`` maps index -> pk).
+    """
+    own = own or {}
+    wanted = Counter(
+        data["useraccount_id"] for data in valid.values() if "useraccount_id" in data
+    )
+    taken = dict(
+        Useraccount.objects.filter(useraccount_id__in=wanted).values_list(
+            "useraccount_id", "pk"
+        )
+    )
+    for index, data in list(valid.items()):
+        useraccount_id = data.get("useraccount_id")
+        if useraccount_id is None:
+            continue
+        if wanted[useraccount_id] > 1:
+            result.error(index, "useraccount_id", "Repeated within this request.")
+        elif taken.get(useraccount_id, own.get(index)) != own.get(index):
+            result.error(index, "useraccount_id", DUPLICATE)
+        else:
+            continue
+        del valid[index]
+
+
+def _write(chunk, write, result, own=None):
+    """
+    Run ``write`` on a chunk (index -> data) in one transaction. If another
+    request took one of its ids since the check, report those and write the
+    rest. Returns the chunk as written and what ``write`` returned.
+    """
+    chunk = dict(chunk)
+    try:
+        with transaction.atomic():
+            return chunk, write(chunk)
+    except IntegrityError:
+        _check_unique(chunk, result, own)
+        with transaction.atomic():
+            return chunk, write(chunk)
+
+
+def create_useraccounts(user, items, batch_size=BATCH_SIZE):
+    """Create the valid ``items`` as useraccounts of ``user``."""
+    result = BulkResult()
+    valid = _validate(items, result)
+    _check_unique(valid, result)
+
+    def write(chunk):
+        return Useraccount.objects.bulk_create(
+            Useraccount(
+                useraccount_id=data["useraccount_id"],
+                name=data.get("name", ""),
+                creator_id=user.id,
+            )
+            for data in chunk.values()
+        )
+
+    for chunk in batched(valid.items(), batch_size):
+        chunk, created = _write(chunk, write, result)
+        for index, account in zip(chunk, created, strict=True):
+            result.done[index] = account.pk
+    return result
+
+
+def update_useraccounts(user, items, batch_size=BATCH_SIZE):
+    """
+    Apply partial updates, each naming the ``id`` of one of ``user``'s
+    useraccounts.
+    """
+    result = BulkResult()
+    valid = _validate(items, result, partial=True)
+    for index, data in list(valid.items()):
+        if "id" not in data:
+            result.error(index, "id", "This field is required.")
+            del valid[index]
+
+    accounts = Useraccount.objects.filter(
+        creator_id=user.id, pk__in=[data["id"] for data in valid.values()]
+    ).in_bulk()
+    repeated = Counter(data["id"] for data in valid.values())
+    for index, data in list(valid.items()):
+        if data["id"] not in accounts:
+            result.error(index, "id", "Not found.")
+        elif repeated[data["id"]] > 1:
+            result.error(index, "id", "Repeated within this request.")
+        else:
+            continue
+        del valid[index]
+    own = {index: data["id"] for index, data in valid.items()}
+    _check_unique(valid, result, own)
+
+    def write(chunk):
+        changed = set()
+        for data in chunk.values():
+            account = accounts[data["id"]]
+            for name in ("useraccount_id", "name"):
+                if name in data:
+                    setattr(account, name, data[name])
+                    changed.add(name)
+        if changed:
+            Useraccount.objects.bulk_update(
+                [accounts[data["id"]] for data in chunk.values()], sorted(changed)
+            )
+
+    for chunk in batched(valid.items(), batch_size):
+        chunk, _ = _write(chunk, write, result, own)
+        for index, data in chunk.items():
+            result.done[index] = data["id"]
+    return result
+
+
+def delete_useraccounts(user, ids, batch_size=BATCH_SIZE):
+    """Delete those of ``ids`` that are ``user``'s useraccounts."""
+    result = BulkResult()
+    deleted = set()
+    for chunk in batched(dict.fromkeys(ids), batch_size):
+        with transaction.atomic():
+            accounts = Useraccount.objects.filter(creator_id=user.id, pk__in=chunk)
+            deleted.update(accounts.values_list("pk", flat=True))
+            accounts.delete()
+    for index, pk in enumerate(ids):
+        if pk in deleted:
+            result.done[index] = pk
+        else:
+            result.error(index, "id", "Not found.")
+    return result
@@ -1,6 +1,31 @@
+import operator
+import re
+from functools import reduce
+
 import django_filters
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from rest_framework import filters
 from useraccount.models import Useraccount  # Or whatever your model is
 
+MAX_INLINED_CREATORS = 1000
+
+
+def creator_username_contains(value):
+    """
+    Match creators by username. The user ids are looked up first (through
+    the username trigram index) and inlined, so the condition is a plain
+    ``creator_id IN (...)`` that can join a bitmap OR with the other
+    indexed columns; a subquery or a join would force a sequential scan.
+    A fragment matching more than ``MAX_INLINED_CREATORS`` users matches
+    most accounts anyway, so it stays a subquery.
+    """
+    users = get_user_model()._default_manager.filter(username__icontains=value)
+    ids = list(users.values_list("pk", flat=True)[: MAX_INLINED_CREATORS + 1])
+    if len(ids) > MAX_INLINED_CREATORS:
+        return Q(creator_id__in=users.values("pk"))
+    return Q(creator_id__in=ids)
+
 
 class UseraccountFilter(django_filters.FilterSet):
     # This filter allows case-insensitive partial matching for the branch.
@@ -10,9 +35,7 @@ class UseraccountFilter(django_filters.FilterSet):
     # This filter maps a 'username' URL parameter to the related creator's username.
     # It also uses case-insensitive partial matching.
     # The URL parameter will be ?username=...
-    username = django_filters.CharFilter(
-        field_name="creator__username", lookup_expr="icontains"
-    )
+    username = django_filters.CharFilter(method="filter_username")
 
     class Meta:
         model = Useraccount
@@ -20,3 +43,44 @@ class UseraccountFilter(django_filters.FilterSet):
         # The ones defined above will use the custom behavior.
         # Any other fields listed here would get default (exact match) behavior.
         fields = ["name", "username"]
+
+    def filter_username(self, queryset, name, value):
+        return queryset.filter(creator_username_contains(value))
+
+
+class UseraccountSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` over the account id, useraccount_id, name and creator
+    username, served by indexes:
+
+    - A term that is a whole useraccount_id returns that account through
+      the unique index, and a number matches the primary key exactly,
+      not as a substring of its digits.
+    - Substring matches use the trigram GIN indexes on ``UPPER(...)`` of
+      each column (migration 0002), which is what ``icontains`` compiles to.
+
+    Every term must match one of the columns, as with ``SearchFilter``.
+    """
+
+    useraccount_id_re = re.compile(r"^[\w-]{1,10}$")
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if len(terms) == 1 and self.useraccount_id_re.match(terms[0]):
+            exact = queryset.filter(useraccount_id=terms[0])
+            if exact.exists():
+                return exact
+
+        for term in terms:
+            conditions = [
+                Q(name__icontains=term),
+                Q(useraccount_id__icontains=term),
+                creator_username_contains(term),
+            ]
+            if term.isascii() and term.isdecimal():
+                conditions.append(Q(pk=int(term)))
+            queryset = queryset.filter(reduce(operator.or_, conditions))
+        return queryset
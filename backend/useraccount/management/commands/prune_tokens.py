@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from useraccount.token_blacklist import BATCH_SIZE, prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted JWT refresh tokens in "
+        "batches (run hourly or daily)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        outstanding, blacklisted = prune_expired_tokens(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {outstanding} expired tokens ({blacklisted} blacklisted) "
+                f"in {time.perf_counter() - started:.1f}s."
+            )
+        )
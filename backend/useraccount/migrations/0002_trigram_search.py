@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("useraccount", "0001_initial"),
+    ]
+
+    operations = [
+        # Normally already created by property/0003; harmless if so.
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="useraccount",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="useraccount_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="useraccount",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("useraccount_id"),
+                    name="gin_trgm_ops",
+                ),
+                name="useraccount_id_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="userprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("username"),
+                    name="gin_trgm_ops",
+                ),
+                name="userprofile_username_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:47
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("useraccount", "0002_trigram_search"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="useraccount",
+            index=models.Index(
+                fields=["creator", "-created_at"],
+                include=("id", "useraccount_id", "name", "avatar"),
+                name="useraccount_creator_created",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="useraccount",
+            index=models.Index(
+                fields=["creator", "name"],
+                include=("id", "useraccount_id", "avatar", "created_at"),
+                name="useraccount_creator_name",
+            ),
+        ),
+    ]
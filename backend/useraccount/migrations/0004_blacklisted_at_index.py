@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The blacklist filter syncs by blacklisted_at (useraccount/token_blacklist.py)
+    atomic = False
+
+    dependencies = [
+        ("useraccount", "0003_creator_listing_indexes"),
+        ("token_blacklist", "0013_alter_blacklistedtoken_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS blacklistedtoken_at_idx "
+            "ON token_blacklist_blacklistedtoken (blacklisted_at)",
+            "DROP INDEX CONCURRENTLY IF EXISTS blacklistedtoken_at_idx",
+        ),
+    ]
@@ -2,9 +2,15 @@ import io
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
-from PIL import Image
+from django.db.models.functions import Upper
+
+
+def trigram_index(field, name):
+    """GIN trigram index on ``UPPER(field)``, which ``icontains`` filters on."""
+    return GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=name)
 
 
 # ------------------------------
@@ -17,6 +23,8 @@ def validate_avatar(image):
             "The image file is too large. Maximum size allowed is 2 MB."
         )
 
+    from PIL import Image  # slow to import; only uploads need it
+
     try:
         img = Image.open(image)
         if img.format not in ["JPEG", "PNG"]:
@@ -36,6 +44,9 @@ class UserProfile(AbstractUser):
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
+    class Meta(AbstractUser.Meta):
+        indexes = [trigram_index("username", "userprofile_username_trgm")]
+
     def __str__(self):
         return f"{self.username} ({self.email})"
 
@@ -68,5 +79,25 @@ class Useraccount(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Columns a listing reads. The per-creator indexes carry them, so a
+    # creator's accounts are listed from the index alone.
+    LISTING_FIELDS = ("id", "useraccount_id", "name", "avatar", "created_at")
+
+    class Meta:
+        indexes = [
+            trigram_index("name", "useraccount_name_trgm"),
+            trigram_index("useraccount_id", "useraccount_id_trgm"),
+            models.Index(
+                fields=["creator", "-created_at"],
+                include=["id", "useraccount_id", "name", "avatar"],
+                name="useraccount_creator_created",
+            ),
+            models.Index(
+                fields=["creator", "name"],
+                include=["id", "useraccount_id", "avatar", "created_at"],
+                name="useraccount_creator_name",
+            ),
+        ]
+
     def __str__(self):
         return self.name if self.name else self.useraccount_id
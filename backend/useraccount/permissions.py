@@ -14,4 +14,4 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions only allowed to creator
-        return obj.creator == request.user
+        return obj.creator_id == request.user.id
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from django_backend.metrics import InstrumentedSerializerMixin
 from useraccount.models import Useraccount
 
 
-class UseraccountSerializer(serializers.ModelSerializer):
+class UseraccountSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     creator_username = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -18,4 +19,23 @@ class UseraccountSerializer(serializers.ModelSerializer):
         read_only_fields = ["creator_username", "created_at"]
 
     def get_creator_username(self, obj):
+        request = self.context.get("request")
+        if request is not None and obj.creator_id == request.user.id:
+            return request.user.username  # without loading the creator
         return obj.creator.username if obj.creator else None
+
+
+class UseraccountBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk create or update (see useraccount/bulk.py). The
+    uniqueness of ``useraccount_id`` is checked for the whole batch in one
+    query afterwards, so nothing here touches the database. Avatars aren't
+    uploaded in bulk.
+    """
+
+    id = serializers.IntegerField(required=False)
+    useraccount_id = serializers.CharField(max_length=10)
+
+    class Meta:
+        model = Useraccount
+        fields = ["id", "useraccount_id", "name"]
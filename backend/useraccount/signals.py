@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .token_blacklist import token_blacklisted
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def sync_token_blacklist(sender, instance, created, **kwargs):
+    """Keep the blacklist filters in step, however the token was blacklisted."""
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: token_blacklisted(jti))
@@ -1,3 +1,227 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import (
+    ClaimsRefreshToken,
+    JWTCookieTokenUserAuthentication,
+    LazyTokenUser,
+)
+from .filters import UseraccountSearchFilter
+from .models import Useraccount
+from .token_blacklist import VERSION_KEY, BlacklistFilter, BloomFilter
+
+# Tests clear the cache, so keep them off a shared one.
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def make_user(username, **kwargs):
+    return get_user_model().objects.create_user(
+        username=username, email=f"{username}@example.com", password="x", **kwargs
+    )
+
+
+# ------------------------------
+# Token claims
+# ------------------------------
+@override_settings(CACHES=LOCMEM_CACHE)
+class ClaimsRefreshTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user("guest")
+        self.refresh = ClaimsRefreshToken.for_user(self.user)
+
+    def post_refresh(self):
+        return APIClient().post(
+            reverse("token_refresh"), {"refresh": str(self.refresh)}, format="json"
+        )
+
+    def test_refresh_rereads_claims_and_rotates(self):
+        self.user.username = "renamed"
+        self.user.is_staff = True
+        self.user.save()
+        response = self.post_refresh()
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data["access"])
+        self.assertEqual((access["username"], access["is_staff"]), ("renamed", True))
+        self.assertTrue(
+            BlacklistedToken.objects.filter(token__jti=self.refresh["jti"]).exists()
+        )
+        self.assertEqual(
+            set(OutstandingToken.objects.values_list("user_id", flat=True)),
+            {self.user.pk},
+        )
+
+    def test_deleted_user_is_rejected(self):
+        self.user.delete()
+        self.assertEqual(self.post_refresh().status_code, 401)
+        with self.assertRaises(TokenError):
+            self.refresh.outstand()
+        # Only the token issued at login, now without its user
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", "user_id")),
+            [(self.refresh["jti"], None)],
+        )
+
+
+# ------------------------------
+# Search
+# ------------------------------
+class UseraccountSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("searcher")
+        cls.accounts = {
+            uid: Useraccount.objects.create(
+                useraccount_id=uid, name=name, creator=cls.user
+            )
+            for uid, name in [("A-100", "North"), ("B-200", "South"), ("100", "East")]
+        }
+
+    def search(self, term):
+        request = Request(RequestFactory().get("/", {"search": term}))
+        queryset = UseraccountSearchFilter().filter_queryset(
+            request, Useraccount.objects.filter(creator=self.user), None
+        )
+        return set(queryset.values_list("useraccount_id", flat=True))
+
+    def test_exact_useraccount_id(self):
+        self.assertEqual(self.search("A-100"), {"A-100"})
+        self.assertEqual(self.search("100"), {"100"})
+
+    def test_substrings(self):
+        self.assertEqual(self.search("outh"), {"B-200"})
+        self.assertEqual(self.search("00"), {"A-100", "B-200", "100"})
+        self.assertEqual(self.search("searc"), {"A-100", "B-200", "100"})
+
+    def test_numbers_match_the_primary_key(self):
+        account = self.accounts["B-200"]
+        self.assertIn("B-200", self.search(str(account.pk)))
+
+    def test_other_digits_are_not_a_primary_key(self):
+        self.assertEqual(self.search("²"), set())
+
+
+# ------------------------------
+# Token users
+# ------------------------------
+class LazyTokenUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("lazy")
+
+    def setUp(self):
+        self.token = ClaimsRefreshToken.for_user(self.user).access_token
+
+    def test_claims_need_no_query(self):
+        with self.assertNumQueries(0):
+            user = LazyTokenUser(self.token)
+            self.assertEqual(user.id, self.user.pk)
+            self.assertEqual(user.username, "lazy")
+            self.assertFalse(user.is_staff)
+            self.assertEqual(user, self.user)
+
+    def test_the_rest_loads_the_user_once(self):
+        user = LazyTokenUser(self.token)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "lazy@example.com")
+            self.assertFalse(user.is_superuser)
+        self.assertFalse(user.has_perm("property.add_property"))
+
+    def test_writes_go_to_the_user(self):
+        user = LazyTokenUser(self.token)
+        user.user.first_name = "Lazy"
+        user.set_password("new password")
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Lazy")
+        self.assertTrue(self.user.check_password("new password"))
+        self.assertTrue(user.check_password("new password"))
+
+    def authenticate(self, method):
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES["jwt-access-token"] = str(self.token)
+        user, _token = JWTCookieTokenUserAuthentication().authenticate(Request(request))
+        return user
+
+    @override_settings(JWT_TOKEN_USER=True)
+    def test_safe_requests_get_the_token_user(self):
+        self.assertIsInstance(self.authenticate("get"), LazyTokenUser)
+        self.assertIsInstance(self.authenticate("post"), get_user_model())
+
+    @override_settings(JWT_TOKEN_USER=False)
+    def test_disabled(self):
+        self.assertIsInstance(self.authenticate("get"), get_user_model())
+
+
+# ------------------------------
+# Token blacklist
+# ------------------------------
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BlacklistFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("holder")
+
+    def setUp(self):
+        cache.clear()
+
+    def blacklist(self, jti, blacklisted_at=None):
+        token = OutstandingToken.objects.create(
+            user=self.user,
+            jti=jti,
+            token=jti,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+        row = BlacklistedToken.objects.create(token=token)
+        if blacklisted_at is not None:
+            BlacklistedToken.objects.filter(pk=row.pk).update(
+                blacklisted_at=blacklisted_at
+            )
+        cache.set(VERSION_KEY, jti)
+
+    def test_rebuild_and_lookup(self):
+        self.blacklist("old")
+        blacklist = BlacklistFilter()
+        self.assertTrue(blacklist.is_blacklisted("old"))
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist.is_blacklisted("fresh"))
+
+    def test_sync_reads_rows_committed_after_the_last_sync(self):
+        blacklist = BlacklistFilter()
+        blacklist.sync()
+        # Stamped before the sync started, but only visible after it.
+        self.blacklist(
+            "late", blacklisted_at=blacklist.sync_started - timedelta(seconds=30)
+        )
+        self.assertTrue(blacklist.is_blacklisted("late"))
+
+    def test_add_counts_each_jti_once(self):
+        blacklist = BlacklistFilter()
+        blacklist.sync()
+        for _ in range(3):
+            blacklist.add("twice")
+        self.assertEqual(blacklist.bloom.count, 1)
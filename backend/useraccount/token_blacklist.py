@@ -0,0 +1,190 @@
+"""
+Refresh-token blacklist checks without a query per check.
+
+Refresh tokens rotate every access token lifetime, and each refresh asks
+whether the token was blacklisted, a join over two tables that only grow.
+Here each process keeps a Bloom filter of the blacklisted jtis: a jti it
+doesn't contain is certainly not blacklisted, which is nearly every
+check. Only the rest go to the cache, then the database.
+
+The filter is kept in step with ``BlacklistedToken`` by reading the rows
+blacklisted since its last sync began, less ``SYNC_OVERLAP``: a row becomes
+visible at commit, which can be later than its ``blacklisted_at``. A sync
+runs when the shared version key changes, which every blacklisting does, or
+else after ``SYNC_INTERVAL`` seconds. Every ``REBUILD_INTERVAL`` the filter
+is rebuilt from scratch, which also catches rows that took longer than the
+overlap to commit.
+
+``prune_expired_tokens`` deletes expired tokens in batches, so the tables
+stay the size of a refresh token lifetime.
+"""
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+VERSION_KEY = "token-blacklist:version"
+SYNC_INTERVAL = 1.0  # seconds
+SYNC_OVERLAP = timedelta(minutes=1)
+REBUILD_INTERVAL = 10 * 60  # seconds
+MIN_CAPACITY = 10_000
+ERROR_RATE = 0.001
+BATCH_SIZE = 5000
+
+
+class BloomFilter:
+    """A fixed-size set of strings that may report false positives only."""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from one 128-bit digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8])
+        b = int.from_bytes(digest[8:]) | 1
+        return ((a + i * b) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class BlacklistFilter:
+    """The process's view of the blacklist; see the module docstring."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.version = None
+        self.synced_at = 0.0
+        self.sync_started = None  # wall clock, compared with blacklisted_at
+        self.rebuilt_at = 0.0
+
+    def sync(self):
+        version = cache.get(VERSION_KEY)
+        now = time.monotonic()
+        if (
+            self.bloom is not None
+            and version == self.version
+            and now - self.synced_at < SYNC_INTERVAL
+        ):
+            return
+        with self.lock:
+            started = timezone.now()
+            if (
+                self.bloom is None
+                or now - self.rebuilt_at >= REBUILD_INTERVAL
+                or self.bloom.count > self.bloom.capacity
+            ):
+                self._rebuild()
+            else:
+                for jti in BlacklistedToken.objects.filter(
+                    blacklisted_at__gte=self.sync_started - SYNC_OVERLAP
+                ).values_list("token__jti", flat=True):
+                    self._add(jti)
+            self.version = version
+            self.sync_started = started
+            self.synced_at = time.monotonic()
+
+    def _rebuild(self):
+        jtis = list(
+            BlacklistedToken.objects.filter(
+                token__expires_at__gt=timezone.now()
+            ).values_list("token__jti", flat=True)
+        )
+        self.bloom = BloomFilter(max(MIN_CAPACITY, 2 * len(jtis)))
+        for jti in jtis:
+            self._add(jti)
+        self.rebuilt_at = time.monotonic()
+
+    def _add(self, jti):
+        # Syncs re-read the overlap; count each jti once towards capacity.
+        if jti not in self.bloom:
+            self.bloom.add(jti)
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self._add(jti)
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        if jti not in self.bloom:
+            return False
+        key = f"token-blacklist:{jti}"
+        if cache.get(key):
+            return True
+        found = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if found:
+            # Blacklisting is permanent; expired tokens fail anyway.
+            cache.set(key, True, 24 * 60 * 60)
+        return found
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def is_blacklisted(jti):
+    return blacklist_filter.is_blacklisted(jti)
+
+
+def token_blacklisted(jti):
+    """Record a new blacklist row here and tell other processes to sync."""
+    blacklist_filter.add(jti)
+    cache.set(f"token-blacklist:{jti}", True, 24 * 60 * 60)
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+PRUNE_SQL = f"""
+    WITH batch AS (
+        SELECT id FROM {OutstandingToken._meta.db_table}
+        WHERE expires_at <= %s ORDER BY id LIMIT %s
+    ), blacklisted AS (
+        DELETE FROM {BlacklistedToken._meta.db_table} b
+        USING batch WHERE b.token_id = batch.id RETURNING 1
+    ), outstanding AS (
+        DELETE FROM {OutstandingToken._meta.db_table} o
+        USING batch WHERE o.id = batch.id RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM outstanding), (SELECT count(*) FROM blacklisted)
+"""
+
+
+def prune_expired_tokens(batch_size=BATCH_SIZE):
+    """
+    Delete expired outstanding tokens and their blacklist rows, a batch per
+    statement. Returns the numbers of each deleted.
+    """
+    cutoff = timezone.now()
+    outstanding = blacklisted = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(PRUNE_SQL, [cutoff, batch_size])
+            batch_outstanding, batch_blacklisted = cursor.fetchone()
+            outstanding += batch_outstanding
+            blacklisted += batch_blacklisted
+            if batch_outstanding < batch_size:
+                return outstanding, blacklisted
@@ -1,6 +1,5 @@
 # useraccount/validators.py
 from django.core.exceptions import ValidationError
-import filetype
 
 
 def validate_image(image):
@@ -15,6 +14,8 @@ def validate_image(image):
             "The image file is too large. Maximum size allowed is 2 MB."
         )
 
+    import filetype  # only needed on upload
+
     # Detect file type
     kind = filetype.guess(image)
     if kind is None:
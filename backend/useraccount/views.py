@@ -1,13 +1,19 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from useraccount.models import Useraccount
 from .serializers import UseraccountSerializer
 from .pagination import SmallResultsSetPagination
-from .filters import UseraccountFilter
+from .filters import UseraccountFilter, UseraccountSearchFilter
+from .bulk import create_useraccounts, delete_useraccounts, update_useraccounts
+from django_backend.permissions import OwnerWritesFilter
+from django_backend.streaming import StreamingListMixin
 from .permissions import IsOwnerOrReadOnly  # 👈 Import your custom permission
-import warnings
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
+from dj_rest_auth.jwt_auth import get_refresh_view
+from .authentication import TokenClaimsRefreshSerializer
 
 # useraccount/views.py
 # from dj_rest_auth.views import LogoutView
@@ -16,10 +22,7 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 # from rest_framework import status
 
 
-warnings.filterwarnings("ignore")
-
-
-class UseraccountViewSet(viewsets.ModelViewSet):
+class UseraccountViewSet(StreamingListMixin, viewsets.ModelViewSet):
     """
     A secure and feature-rich ViewSet for Useraccount that combines advanced
     filtering, global search, and object-level permissions.
@@ -35,10 +38,13 @@ class UseraccountViewSet(viewsets.ModelViewSet):
     # --- Full-featured filtering, search, and ordering ---
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        UseraccountSearchFilter,
         filters.OrderingFilter,
+        OwnerWritesFilter,
     ]
+    owner_field = "creator"
     filterset_class = UseraccountFilter
+    # Searched by UseraccountSearchFilter; listed for the browsable API
     search_fields = [
         "id",
         "useraccount_id",
@@ -59,11 +65,64 @@ class UseraccountViewSet(viewsets.ModelViewSet):
         if user.is_staff:
             return base_qs
 
-        return base_qs.filter(creator=user)
+        # Only the serialized columns, no join: the serializer takes the
+        # creator's username from the request user, and the per-creator
+        # indexes cover the rest.
+        return Useraccount.objects.filter(creator_id=user.id).only(
+            *Useraccount.LISTING_FIELDS, "creator"
+        )
 
     def perform_create(self, serializer):
         """Securely assigns the creator on record creation."""
-        serializer.save(creator=self.request.user)
+        serializer.save(creator_id=self.request.user.id)
+
+    # --- Bulk create, update and delete ---
+    bulk_max_items = 10000
+
+    @action(
+        detail=False,
+        methods=["post", "patch", "delete"],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk(self, request):
+        """
+        Many of the user's useraccounts at once: POST a list of new ones,
+        PATCH a list of changes that each carry an ``id``, or DELETE a list
+        of ids. Each item is applied or rejected on its own, and the
+        response reports every item by its index in the request.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Send a non-empty JSON list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} items per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.method == "POST":
+            result = create_useraccounts(request.user, items)
+            done, success = "created", status.HTTP_201_CREATED
+        elif request.method == "PATCH":
+            result = update_useraccounts(request.user, items)
+            done, success = "updated", status.HTTP_200_OK
+        else:
+            ids = serializers.ListField(child=serializers.IntegerField())
+            result = delete_useraccounts(request.user, ids.run_validation(items))
+            done, success = "deleted", status.HTTP_200_OK
+        return Response(
+            {"items": result.item_list(done)},
+            status=success if result.done else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class TokenClaimsRefreshView(get_refresh_view()):
+    """dj-rest-auth's refresh view, re-reading the token claims."""
+
+    serializer_class = TokenClaimsRefreshSerializer
 
 
 @ensure_csrf_cookie